@@ -0,0 +1,315 @@
+import argparse
+import io
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from inference import load_predictor
+from lead_fields import CATEGORIES, NUMERIC_RANGES
+from model_registry import FEATURE_COLUMNS_FILE, MODEL_FILE, ModelRegistry
+from reranker import LLMReranker
+
+DEFAULT_MODEL_DIR = os.getenv("MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), '../model'))
+
+# Rows per chunk handed to a worker and written as one output part
+DEFAULT_CHUNK_ROWS = 100000
+
+# Rows per model call inside a worker, which bounds the tree-walk temporaries
+PREDICT_BATCH_ROWS = 10000
+
+# Bytes read from a CSV input at a time while looking for chunk boundaries
+READ_BLOCK_BYTES = 16 << 20
+
+MANIFEST_NAME = '_manifest.json'
+SUCCESS_NAME = '_SUCCESS'
+
+INPUT_FORMATS = {'.csv': 'csv', '.parquet': 'parquet', '.pq': 'parquet'}
+
+# Model, feature lists and reranker held by each worker process
+_worker: Dict[str, Any] = {}
+
+def _init_worker(model_path: str, feature_columns_path: str, use_compiled: bool):
+    feature_columns = joblib.load(feature_columns_path)
+    _worker['predict'] = load_predictor(model_path, use_compiled)
+    _worker['numerical'] = feature_columns['numerical_features']
+    _worker['categorical'] = feature_columns['categorical_features']
+    _worker['reranker'] = LLMReranker()
+
+def input_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in INPUT_FORMATS:
+        raise ValueError(f"Unsupported input file {path}; expected one of {sorted(INPUT_FORMATS)}")
+    return INPUT_FORMATS[extension]
+
+def _record_ends(data: bytes) -> np.ndarray:
+    """Offsets just past each newline that ends a CSV record rather than a quoted field."""
+    array = np.frombuffer(data, dtype=np.uint8)
+    newlines = np.flatnonzero(array == ord('\n'))
+    quotes = np.flatnonzero(array == ord('"'))
+    # Quotes inside a field are doubled, so an even count before a newline closes the record
+    closed = np.searchsorted(quotes, newlines) % 2 == 0
+    return newlines[closed] + 1
+
+def iter_csv_chunks(path: str, chunk_rows: int) -> Iterator[Tuple[bytes, bytes]]:
+    """
+    Split a CSV file into (header, records) byte chunks of ``chunk_rows`` records.
+
+    Only record boundaries are located here; parsing happens in the
+    workers, so the reading process does not limit throughput.
+    """
+    with open(path, 'rb') as f:
+        header = f.readline()
+        pending = b''
+        for block in iter(lambda: f.read(READ_BLOCK_BYTES), b''):
+            pending += block
+            ends = _record_ends(pending)
+            consumed = 0
+            for stop in ends[chunk_rows - 1::chunk_rows].tolist():
+                yield header, pending[consumed:stop]
+                consumed = stop
+            pending = pending[consumed:]
+        if pending.strip():
+            yield header, pending
+
+def iter_parquet_chunks(path: str, chunk_rows: int) -> Iterator[Any]:
+    import pyarrow.parquet as pq
+
+    yield from pq.ParquetFile(path).iter_batches(batch_size=chunk_rows)
+
+def score_frame(frame: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return initial and reranked scores; rows with missing or invalid features get NaN.
+
+    A row is valid only if the API would accept its features: integers
+    within NUMERIC_RANGES and categories listed in CATEGORIES.
+    """
+    numerical, categorical = _worker['numerical'], _worker['categorical']
+    features = frame.reindex(columns=numerical + categorical)
+    valid = np.ones(len(frame), dtype=bool)
+    for name in numerical:
+        values = pd.to_numeric(features[name], errors='coerce')
+        features[name] = values
+        # NaN fails every comparison, so missing and non-numeric values are rejected too
+        checks = values % 1 == 0
+        low, high = NUMERIC_RANGES.get(name, (None, None))
+        if low is not None:
+            checks &= values >= low
+        if high is not None:
+            checks &= values <= high
+        valid &= checks.to_numpy()
+    for name in categorical:
+        if name in CATEGORIES:
+            valid &= features[name].isin(CATEGORIES[name]).to_numpy()
+        else:
+            valid &= features[name].notna().to_numpy()
+
+    initial = np.full(len(frame), np.nan)
+    rows = np.flatnonzero(valid)
+    for start in range(0, len(rows), PREDICT_BATCH_ROWS):
+        batch = rows[start:start + PREDICT_BATCH_ROWS]
+        initial[batch] = _worker['predict'](features.iloc[batch])
+
+    # Lead dumps repeat comments heavily, so each distinct comment is matched only once
+    comments = frame['comments'] if 'comments' in frame else pd.Series([''] * len(frame))
+    codes, distinct = pd.factorize(comments.fillna('').astype(str))
+    adjustment = _worker['reranker'].adjustment
+    adjustments = np.array([adjustment(comment) for comment in distinct], dtype=np.float64)
+    # Same result as LLMReranker.rerank: the adjusted score clipped to 0-100
+    reranked = np.clip(initial + adjustments[codes], 0, 100)
+    return initial, reranked
+
+def part_path(output_dir: str, index: int, output_format: str) -> str:
+    return os.path.join(output_dir, f'part-{index:06d}.{output_format}')
+
+def score_chunk(index: int, chunk: Any, output_dir: str, output_format: str) -> Tuple[int, int, int, float]:
+    """Score one chunk and write it as an output part; returns (index, rows, unscored rows, seconds)."""
+    start = time.perf_counter()
+    if isinstance(chunk, tuple):
+        header, records = chunk
+        # Read every column as text so non-feature values are written back unchanged
+        frame = pd.read_csv(io.BytesIO(header + records), dtype=str, keep_default_na=False)
+    else:
+        frame = chunk.to_pandas()
+
+    initial, reranked = score_frame(frame)
+    frame['initial_score'] = initial.round(2)
+    frame['reranked_score'] = reranked.round(2)
+
+    # Write to a temporary name first so an interrupted run never leaves a partial part
+    path = part_path(output_dir, index, output_format)
+    temporary = path + '.tmp'
+    if output_format == 'csv':
+        frame.to_csv(temporary, index=False)
+    else:
+        frame.to_parquet(temporary, index=False)
+    os.replace(temporary, path)
+    return index, len(frame), int(np.isnan(initial).sum()), time.perf_counter() - start
+
+def prepare_output(input_path: str, output_dir: str, chunk_rows: int, output_format: str, restart: bool,
+                   model_version: str) -> set:
+    """Create or validate the output directory and return the chunk indices already written."""
+    stat = os.stat(input_path)
+    manifest = {
+        "input": os.path.abspath(input_path),
+        "input_bytes": stat.st_size,
+        "input_mtime_ns": stat.st_mtime_ns,
+        "chunk_rows": chunk_rows,
+        "output_format": output_format,
+        # Parts scored by another model must not be mixed into a resumed run
+        "model_version": model_version,
+    }
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+
+    if restart and os.path.isdir(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            previous = json.load(f)
+        if previous != manifest:
+            print(f"Error: {output_dir} holds a run with different input or settings:")
+            print(f"  {previous}")
+            print("Use --restart to discard it or choose another --output directory.")
+            sys.exit(1)
+    else:
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+    done = set()
+    suffix = f'.{output_format}'
+    for name in os.listdir(output_dir):
+        if name.startswith('part-') and name.endswith(suffix):
+            done.add(int(name[len('part-'):-len(suffix)]))
+        elif name.endswith('.tmp'):
+            os.remove(os.path.join(output_dir, name))
+    return done
+
+def merge_parts(output_dir: str, output_format: str, merged_path: str):
+    """Concatenate the output parts, in input order, into one file."""
+    parts = sorted(name for name in os.listdir(output_dir)
+                   if name.startswith('part-') and name.endswith(f'.{output_format}'))
+    if output_format == 'csv':
+        with open(merged_path, 'wb') as merged:
+            for i, name in enumerate(parts):
+                with open(os.path.join(output_dir, name), 'rb') as part:
+                    header = part.readline()
+                    if i == 0:
+                        merged.write(header)
+                    shutil.copyfileobj(part, merged)
+    else:
+        import pyarrow.parquet as pq
+
+        writer = None
+        for name in parts:
+            table = pq.read_table(os.path.join(output_dir, name))
+            if writer is None:
+                writer = pq.ParquetWriter(merged_path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+        if writer is not None:
+            writer.close()
+
+def batch_score(input_path: str, output_dir: str, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                workers: int = 0, output_format: str = None, use_compiled: bool = True,
+                restart: bool = False, merged_path: str = None, model_dir: str = DEFAULT_MODEL_DIR,
+                version: str = None) -> Dict[str, Any]:
+    """
+    Score every row of a CSV or Parquet file on a process pool, writing one part per chunk.
+
+    The model is the one published in ``model_dir``, or its archived
+    ``version``, resolved through the model registry as the API does.
+    """
+
+    if not os.path.exists(input_path):
+        print(f"Error: Input file not found at {input_path}")
+        sys.exit(1)
+    try:
+        model_version, model_directory = ModelRegistry(model_dir).resolve(version)
+    except (FileNotFoundError, LookupError) as e:
+        print(f"Model not found: {e}")
+        if version is None:
+            print("Please run setup_model.py first.")
+        sys.exit(1)
+
+    source_format = input_format(input_path)
+    output_format = output_format or source_format
+    workers = workers or os.cpu_count() or 1
+    done = prepare_output(input_path, output_dir, chunk_rows, output_format, restart, model_version)
+    if done:
+        print(f"Resuming: {len(done)} chunks already scored in {output_dir}")
+
+    chunks = iter_csv_chunks if source_format == 'csv' else iter_parquet_chunks
+    rows = unscored = 0
+    chunk_seconds = []
+    start = time.perf_counter()
+
+    def collect(futures):
+        nonlocal rows, unscored
+        for future in futures:
+            index, n_rows, n_unscored, seconds = future.result()
+            rows += n_rows
+            unscored += n_unscored
+            chunk_seconds.append(seconds)
+            elapsed = time.perf_counter() - start
+            print(f"chunk {index}: {n_rows:,} rows ({rows:,} total, {rows / elapsed:,.0f} rows/s)")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(os.path.join(model_directory, MODEL_FILE),
+                                       os.path.join(model_directory, FEATURE_COLUMNS_FILE), use_compiled)) as pool:
+        in_flight = set()
+        for index, chunk in enumerate(chunks(input_path, chunk_rows)):
+            if index in done:
+                continue
+            # Bound the chunks held in memory to a couple per worker
+            if len(in_flight) >= 2 * workers:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(finished)
+            in_flight.add(pool.submit(score_chunk, index, chunk, output_dir, output_format))
+        collect(wait(in_flight).done)
+
+    elapsed = time.perf_counter() - start
+    with open(os.path.join(output_dir, SUCCESS_NAME), 'w') as f:
+        f.write('')
+    if merged_path:
+        merge_parts(output_dir, output_format, merged_path)
+        print(f"Merged output written to {merged_path}")
+
+    print(f"\nScored {rows:,} rows in {elapsed:.1f}s with {workers} workers and model {model_version} "
+          f"({rows / elapsed if elapsed else 0:,.0f} rows/s); {unscored:,} rows had invalid features")
+    return {"rows": rows, "unscored": unscored, "seconds": elapsed, "workers": workers,
+            "model_version": model_version, "chunk_seconds": chunk_seconds}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a CSV or Parquet file of leads offline")
+    parser.add_argument("input", help="CSV or Parquet file with the lead columns of data/leads_data.csv")
+    parser.add_argument("--output", help="Directory for the scored parts (default: <input file>.scored)")
+    parser.add_argument("--format", choices=["csv", "parquet"], help="Output format (default: the input format)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (default: one per core)")
+    parser.add_argument("--merge", metavar="FILE", help="Also concatenate the parts into FILE")
+    parser.add_argument("--model-dir", default=DEFAULT_MODEL_DIR,
+                        help="Model directory the API serves from (default: MODEL_DIR or ../model)")
+    parser.add_argument("--version", help="Archived model version to score with (default: the published model)")
+    parser.add_argument("--sklearn", action="store_true", help="Score with the sklearn pipeline instead of the compiled model")
+    parser.add_argument("--restart", action="store_true", help="Discard a previous run in the output directory")
+    args = parser.parse_args()
+    batch_score(
+        args.input,
+        args.output or args.input + '.scored',
+        chunk_rows=args.chunk_rows,
+        workers=args.workers,
+        output_format=args.format,
+        use_compiled=not args.sklearn,
+        restart=args.restart,
+        merged_path=args.merge,
+        model_dir=args.model_dir,
+        version=args.version
+    )
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from metrics import Histogram
+
+# Buckets for the number of requests coalesced into one prediction
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+# Buckets (seconds) for the time a request waits before its batch runs
+QUEUE_WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1)
+
+class ScoreBatcher:
+    """
+    Coalesces concurrent single-lead predictions into vectorized batches.
+
+    The first request of a batch starts a timer of ``window_ms``; requests
+    arriving before it fires join the same batch, which is flushed early
+    once it reaches ``max_batch_size``. Each caller awaits a future that
+    resolves to its own score, so callers see the same result as an
+    unbatched prediction. ``predict`` is awaited, so while one batch runs
+    on an inference executor the next one is already being collected.
+
+    A batch only holds requests submitted with the same ``model``, which
+    is passed on to ``predict``; a request for another model flushes the
+    pending batch first.
+    """
+
+    def __init__(self, predict: Callable[[List[Dict[str, Any]], Any], Awaitable[Sequence[float]]],
+                 window_ms: float = 2.0, max_batch_size: int = 64):
+        self.predict = predict
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait_seconds = Histogram(QUEUE_WAIT_BUCKETS)
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future, float]] = []
+        self._model: Any = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: Set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.window_ms > 0 and self.max_batch_size > 1
+
+    async def submit(self, features: Dict[str, Any], model: Any = None) -> float:
+        """Queue one lead's model features and wait for its initial score from ``model``."""
+        if self._pending and model is not self._model:
+            self._flush()
+        self._model = model
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((features, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        started = time.perf_counter()
+        self.batch_sizes.observe(len(batch))
+        for _, _, enqueued in batch:
+            self.queue_wait_seconds.observe(started - enqueued)
+
+        task = asyncio.get_running_loop().create_task(self._run(batch, self._model))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[Dict[str, Any], asyncio.Future, float]], model: Any):
+        try:
+            scores = np.asarray(await self.predict([features for features, _, _ in batch], model)).tolist()
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), score in zip(batch, scores):
+            # A caller may have been cancelled (client disconnect) while waiting
+            if not future.done():
+                future.set_result(score)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "window_ms": self.window_ms,
+            "max_batch_size": self.max_batch_size,
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_wait_seconds": self.queue_wait_seconds.snapshot(),
+        }
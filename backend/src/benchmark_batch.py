@@ -0,0 +1,67 @@
+import asyncio
+import time
+import os
+import sys
+import pandas as pd
+
+import main
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../data/leads_data.csv')
+BATCH_SIZES = [1, 100, 10000]
+
+def load_leads(n):
+    """Load n lead payloads from the synthetic dataset, repeating rows if needed."""
+    try:
+        df = pd.read_csv(DATA_PATH)
+    except FileNotFoundError:
+        print(f"Error: Data file not found at {DATA_PATH}")
+        print("Please run generate_data.py first to create the dataset.")
+        sys.exit(1)
+
+    df = df.drop(columns=['high_intent'])
+    df['consent'] = True
+    df['comments'] = df['comments'].fillna('')
+    records = df.to_dict(orient='records')
+    return [records[i % len(records)] for i in range(n)]
+
+async def score_one_by_one(payloads, model_version):
+    for payload in payloads:
+        await main.score_lead(main.LeadInput(**payload), model_version)
+
+async def score_as_batch(payloads, model_version):
+    await main.score_batch(payloads, model_version)
+
+def run_benchmark():
+    """Compare leads/sec of /score called per lead against /score/batch."""
+
+    if main.model_registry.current is None:
+        print("Model not loaded. Please run setup_model.py first.")
+        sys.exit(1)
+
+    model_version = main.model_registry.current
+
+    # Warm up the model so the first measurement is not skewed
+    asyncio.run(score_as_batch(load_leads(10), model_version))
+
+    print(f"{'batch size':>10} | {'per-lead leads/s':>16} | {'batch leads/s':>13} | {'speedup':>7}")
+    print("-" * 58)
+
+    for size in BATCH_SIZES:
+        payloads = load_leads(size)
+
+        main.reset_leads()
+        start = time.perf_counter()
+        asyncio.run(score_one_by_one(payloads, model_version))
+        single_rate = size / (time.perf_counter() - start)
+
+        main.reset_leads()
+        start = time.perf_counter()
+        asyncio.run(score_as_batch(payloads, model_version))
+        batch_rate = size / (time.perf_counter() - start)
+
+        print(f"{size:>10} | {single_rate:>16,.0f} | {batch_rate:>13,.0f} | {batch_rate / single_rate:>6.1f}x")
+
+    main.reset_leads()
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,57 @@
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import pandas as pd
+
+from batch_score import DEFAULT_MODEL_DIR, batch_score
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../data/leads_data.csv')
+
+def run_benchmark(n_rows, worker_counts, chunk_rows, input_format, model_dir=DEFAULT_MODEL_DIR):
+    """Measure batch_score rows/sec for each worker count on a synthetic dump of ``n_rows`` leads."""
+
+    try:
+        df = pd.read_csv(DATA_PATH)
+    except FileNotFoundError:
+        print(f"Error: Data file not found at {DATA_PATH}")
+        print("Please run generate_data.py first to create the dataset.")
+        sys.exit(1)
+
+    directory = tempfile.mkdtemp(prefix='batch-score-')
+    try:
+        dump = pd.concat([df] * (n_rows // len(df) + 1), ignore_index=True).head(n_rows)
+        input_path = os.path.join(directory, f'leads.{input_format}')
+        if input_format == 'csv':
+            dump.to_csv(input_path, index=False)
+        else:
+            dump.to_parquet(input_path, index=False)
+        del dump
+
+        print(f"{n_rows:,} rows of {input_format}, {chunk_rows:,} rows per chunk, {os.cpu_count()} cores\n")
+        print(f"{'workers':>7} | {'rows/s':>9} | {'speedup':>7}")
+        print("-" * 31)
+
+        baseline = None
+        for workers in worker_counts:
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = batch_score(input_path, os.path.join(directory, f'out-{workers}'),
+                                     chunk_rows=chunk_rows, workers=workers, model_dir=model_dir)
+            rate = result["rows"] / result["seconds"]
+            baseline = baseline or rate
+            print(f"{workers:>7} | {rate:>9,.0f} | {rate / baseline:>6.2f}x")
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline batch scoring scalability benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--model-dir", default=DEFAULT_MODEL_DIR)
+    args = parser.parse_args()
+    run_benchmark(args.rows, args.workers, args.chunk_rows, args.format, args.model_dir)
@@ -0,0 +1,102 @@
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(SRC_DIR, '../model')
+
+# Run in a fresh interpreter: import the app, then time /health and the first /score
+CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter() - start
+from benchmark_event_loop import LEAD
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    client.get('/health')
+    health = time.perf_counter() - start
+    while client.get('/health').json()['model_loading']:
+        time.sleep(0.001)
+    status = client.post('/score', json=LEAD).status_code
+    scored = time.perf_counter() - start
+print(json.dumps({'import': imported, 'health': health, 'score': scored, 'status': status,
+                  'sklearn': 'sklearn' in sys.modules, 'pandas': 'pandas' in sys.modules}))
+"""
+
+def start_server(model_dir, environment, importtime=False):
+    env = {**os.environ, "MODEL_DIR": model_dir, "MODEL_WATCH_SECONDS": "0", "LEAD_PERSISTENCE": "none",
+           "PYTHONWARNINGS": "ignore", **environment}
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", CHILD]
+    result = subprocess.run(command, cwd=SRC_DIR, env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+def import_breakdown(stderr, top=8):
+    """Self time of ``-X importtime`` summed per top-level package, largest first."""
+    totals = defaultdict(int)
+    for match in re.finditer(r'import time:\s+(\d+) \|\s+\d+ \|\s+(\S+)', stderr):
+        totals[match.group(2).lstrip('.').split('.')[0]] += int(match.group(1))
+    return sorted(totals.items(), key=lambda item: -item[1])[:top]
+
+def run_benchmark(runs):
+    """Time server start-up from a pickled model, from the compiled artifact, and with background loading."""
+
+    if not os.path.exists(os.path.join(MODEL_DIR, 'lead_scoring_model.pkl')):
+        print("Model not found. Please run setup_model.py first.")
+        sys.exit(1)
+
+    directory = tempfile.mkdtemp(prefix='cold-start-')
+    try:
+        for name in ('lead_scoring_model.pkl', 'feature_columns.pkl'):
+            shutil.copy(os.path.join(MODEL_DIR, name), directory)
+        versions = os.path.join(directory, 'versions')
+
+        def fresh():
+            shutil.rmtree(versions, ignore_errors=True)
+
+        def compiled():
+            # The compiled artifact is written by the first start (or setup_model.py)
+            if not os.path.isdir(versions):
+                start_server(directory, {})
+
+        modes = [
+            ("pickle, first start", fresh, {}),
+            ("sklearn pipeline", compiled, {"USE_COMPILED_MODEL": "0"}),
+            ("compiled artifact", compiled, {}),
+            ("artifact, background", compiled, {"MODEL_LOAD_MODE": "background"}),
+        ]
+        print(f"Median of {runs} fresh interpreters per mode\n")
+        print(f"{'mode':>22} | {'import main':>11} | {'/health':>8} | {'first /score':>12} | {'sklearn':>7} | {'pandas':>6}")
+        print("-" * 84)
+        breakdowns = {}
+        for label, prepare, environment in modes:
+            samples = []
+            for _ in range(runs):
+                prepare()
+                samples.append(start_server(directory, environment)[0])
+            assert all(sample['status'] == 200 for sample in samples), f"{label}: /score failed"
+            median = {key: sorted(sample[key] for sample in samples)[runs // 2] for key in ('import', 'health', 'score')}
+            print(f"{label:>22} | {median['import']:>10.2f}s | {median['health']:>7.2f}s | {median['score']:>11.2f}s | "
+                  f"{'yes' if samples[0]['sklearn'] else 'no':>7} | {'yes' if samples[0]['pandas'] else 'no':>6}")
+            if label in ("pickle, first start", "compiled artifact"):
+                prepare()
+                breakdowns[label] = import_breakdown(start_server(directory, environment, importtime=True)[1])
+
+        for label, packages in breakdowns.items():
+            print(f"\nImport time by package, {label}:")
+            for package, microseconds in packages:
+                print(f"  {package:>20} {microseconds / 1e6:6.2f}s")
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Server cold start with and without the compiled model artifact")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per mode")
+    args = parser.parse_args()
+    run_benchmark(args.runs)
@@ -0,0 +1,69 @@
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("LEAD_PERSISTENCE", "none")
+
+import main
+from benchmark_suite import stored_leads, synthetic_leads
+from contact_index import normalize_email
+
+def submissions(n, repeat, seed=11):
+    """n lead submissions of which a ``repeat`` fraction resubmit an earlier contact with new scores."""
+    rng = random.Random(seed)
+    unique = stored_leads(synthetic_leads(n - int(n * repeat)))
+    leads = list(unique)
+    for _ in range(n - len(unique)):
+        lead = dict(rng.choice(unique))
+        lead['email'] = lead['email'].upper() if rng.random() < 0.5 else lead['email']
+        lead['reranked_score'] = round(rng.uniform(0, 100), 2)
+        leads.append(lead)
+    rng.shuffle(leads)
+    return leads
+
+def scan(email):
+    """The lookup without an index: compare every stored email."""
+    key = normalize_email(email)
+    return [lead_id for lead_id, stored in enumerate(main.lead_store.column('email'), 1)
+            if normalize_email(stored) == key]
+
+def run_benchmark(n, repeat, batch, lookups):
+    """Storing resubmitted leads under each DEDUP_POLICY, and contact lookups with and without the index."""
+
+    leads = submissions(n, repeat)
+    print(f"{n:,} submissions in batches of {batch}, {repeat:.0%} of them resubmitting a stored contact\n")
+    print(f"{'policy':>8} | {'stored leads':>12} | {'store us/lead':>13} | {'avg reranked':>12} | {'store MB':>8}")
+    print("-" * 66)
+    for policy in ('append', 'replace', 'max'):
+        main.DEDUP_POLICY = policy
+        main.reset_leads()
+        start = time.perf_counter()
+        for i in range(0, n, batch):
+            main.store_leads(leads[i:i + batch])
+        elapsed = time.perf_counter() - start
+        stats = main.lead_aggregates.summary()
+        print(f"{policy:>8} | {len(main.lead_store):>12,} | {elapsed / n * 1e6:>13.1f} | "
+              f"{stats['avg_reranked_score']:>12.2f} | {main.lead_store.nbytes / 1e6:>8.1f}")
+
+    emails = random.Random(3).sample([lead['email'] for lead in leads], lookups)
+    start = time.perf_counter()
+    indexed = [main.contact_index.find(email=email) for email in emails]
+    index_seconds = (time.perf_counter() - start) / lookups
+    start = time.perf_counter()
+    scanned = [scan(email) for email in emails[:10]]
+    scan_seconds = (time.perf_counter() - start) / 10
+    assert indexed[:10] == scanned, "index and scan disagree"
+    print(f"\n/leads/by-contact lookup over {len(main.lead_store):,} leads: index {index_seconds * 1e6:.1f} us, "
+          f"scan {scan_seconds * 1e3:.1f} ms ({scan_seconds / index_seconds:,.0f}x)")
+    main.reset_leads()
+    main.inference_executor.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lead deduplication policies and the contact index")
+    parser.add_argument("--leads", type=int, default=200000)
+    parser.add_argument("--repeat", type=float, default=0.5, help="Fraction of submissions that repeat a contact")
+    parser.add_argument("--batch", type=int, default=64, help="Leads stored per call, like a coalesced /score batch")
+    parser.add_argument("--lookups", type=int, default=10000)
+    args = parser.parse_args()
+    run_benchmark(args.leads, args.repeat, args.batch, args.lookups)
@@ -0,0 +1,97 @@
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("LEAD_PERSISTENCE", "none")
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+import main
+from benchmark_suite import stored_leads, synthetic_leads
+from score_distribution import DISTRIBUTION_FIELDS, KLLSketch, RANK_ERROR, signed_quantiles
+
+# Quantiles whose rank error is measured
+CHECKED = (0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+
+def rank_error(sorted_values, estimate, q):
+    """How far the estimate's rank is from q, zero if a tie spans q."""
+    low = np.searchsorted(sorted_values, estimate, 'left') / len(sorted_values)
+    high = np.searchsorted(sorted_values, estimate, 'right') / len(sorted_values)
+    return 0.0 if low <= q <= high else min(abs(low - q), abs(high - q))
+
+def measure_rank_error(n, runs):
+    """Worst rank error over CHECKED quantiles of sketches fed uniform and skewed scores."""
+    errors = []
+    for seed in range(runs):
+        rng = np.random.default_rng(seed)
+        scores = np.round(rng.beta(2, 5, n) * 100 if seed % 2 else rng.uniform(0, 100, n), 2)
+        sketch = KLLSketch(rng=random.Random(seed))
+        for score in scores.tolist():
+            sketch.update(score)
+        ordered = np.sort(scores)
+        estimates = signed_quantiles(sketch, None, CHECKED)
+        errors.append(max(rank_error(ordered, e, q) for q, e in zip(CHECKED, estimates)))
+    return np.array(errors), sketch.retained
+
+def exact_distribution():
+    """The /leads/distribution percentiles without sketches: sort every stored score."""
+    return {field: np.percentile(main.lead_store.column(field), [50, 90, 99]) for field in DISTRIBUTION_FIELDS}
+
+def timed(func, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat
+
+def run_benchmark(sizes, runs, repeat):
+    """Sketch rank error, then /leads/distribution reads against exact percentiles, and insert overhead."""
+
+    errors, retained = measure_rank_error(200000, runs)
+    print(f"Rank error over {runs} runs of 200,000 scores, quantiles {', '.join(map(str, CHECKED))}:")
+    print(f"  mean worst {errors.mean():.4f}, max {errors.max():.4f} "
+          f"(documented bound {RANK_ERROR} at 99%), {retained} values retained per sketch\n")
+
+    leads = stored_leads(synthetic_leads(max(sizes)))
+    client = TestClient(main.app)
+    print(f"{'leads':>9} | {'/leads/distribution':>19} | {'insert+read':>11} | {'exact percentiles':>17} | {'p90 exact/sketch':>16}")
+    print("-" * 84)
+    for size in sizes:
+        main.reset_leads()
+        main.lead_store.extend(leads[:size])
+        main.rebuild_derived_state()
+        _, route_seconds = timed(lambda: client.get("/leads/distribution"), repeat)
+        # A read after an insert re-sorts the values retained by the sketches it touched
+        read = lambda: (main.lead_distributions.add(leads[0]), main.lead_distributions.summary())[1]
+        summary, read_seconds = timed(read, repeat)
+        exact, exact_seconds = timed(exact_distribution, max(1, repeat // 10))
+        print(f"{size:>9,} | {route_seconds * 1000:>16.2f} ms | {read_seconds * 1000:>8.2f} ms | "
+              f"{exact_seconds * 1000:>14.1f} ms | {exact['reranked_score'][1]:>7.2f}/{summary['reranked_score']['p90']:<8.2f}")
+
+    groups = 1 + sum(len(by_value) for by_value in main.lead_distributions.segments.values())
+    values = sum(d.added.retained for group in [main.lead_distributions.overall] +
+                 [g for by_value in main.lead_distributions.segments.values() for g in by_value.values()]
+                 for d in group.values())
+    print(f"\n{groups} groups x {len(DISTRIBUTION_FIELDS)} scores hold {values:,} retained values "
+          f"(~{values * 32 / 1e3:.0f} KB as Python floats) regardless of lead count")
+
+    batch = leads[:20000]
+    main.reset_leads()
+    _, with_seconds = timed(lambda: [main.store_leads(batch[i:i + 64]) for i in range(0, len(batch), 64)])
+    main.reset_leads()
+    add, main.lead_distributions.add = main.lead_distributions.add, lambda lead: None
+    _, without_seconds = timed(lambda: [main.store_leads(batch[i:i + 64]) for i in range(0, len(batch), 64)])
+    main.lead_distributions.add = add
+    main.reset_leads()
+    print(f"Storing a lead: {with_seconds / len(batch) * 1e6:.1f} us with sketch updates, "
+          f"{without_seconds / len(batch) * 1e6:.1f} us without")
+    main.inference_executor.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score-distribution sketches for /leads/distribution vs exact percentiles")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--runs", type=int, default=20, help="Sketches built to measure the rank error")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed reads per size")
+    args = parser.parse_args()
+    run_benchmark(args.sizes, args.runs, args.repeat)
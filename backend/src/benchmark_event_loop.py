@@ -0,0 +1,104 @@
+import argparse
+import asyncio
+import time
+import sys
+import httpx
+import numpy as np
+
+import main
+from inference import INFERENCE_BACKENDS, InferenceExecutor
+
+LEAD = {
+    "phone_number": "+91-9876543210",
+    "email": "test@example.com",
+    "credit_score": 750,
+    "age_group": "36-50",
+    "family_background": "Married with Kids",
+    "income": 500000,
+    "property_type": "House",
+    "budget": 2500000,
+    "location": "Suburban",
+    "previous_inquiries": 2,
+    "time_on_market": 15,
+    "response_time_minutes": 30,
+    "comments": "Looking for a house in suburban area. Ready to purchase immediately.",
+    "consent": True
+}
+
+async def score_worker(client, deadline, counter):
+    while time.perf_counter() < deadline:
+        response = await client.post("/score", json=LEAD)
+        counter[response.status_code] = counter.get(response.status_code, 0) + 1
+
+async def health_probe(client, deadline, interval, latencies):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+
+async def run_load(concurrency, duration, probe_interval):
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        # Idle /health baseline
+        idle = []
+        await health_probe(client, time.perf_counter() + 0.5, probe_interval, idle)
+
+        deadline = time.perf_counter() + duration
+        counter = {}
+        loaded = []
+        await asyncio.gather(
+            health_probe(client, deadline, probe_interval, loaded),
+            *[score_worker(client, deadline, counter) for _ in range(concurrency)]
+        )
+    return idle, loaded, counter
+
+def ms(samples, q):
+    return np.percentile(np.array(samples) * 1000, q) if samples else float('nan')
+
+def run_benchmark(engine, backends, concurrency, duration, probe_interval):
+    """Measure /health latency while /score is saturated, for each inference backend."""
+
+    if main.model_registry.current is None:
+        print("Model not loaded. Please run setup_model.py first.")
+        sys.exit(1)
+
+    use_compiled = engine == "compiled"
+    if not use_compiled:
+        main.model_registry.current.compiled = None
+
+    print(f"engine={engine}, {concurrency} concurrent /score clients for {duration:.0f}s per backend\n")
+    print(f"{'backend':>8} | {'score/s':>8} | {'idle health p50':>15} | {'loaded health p50':>17} | {'loaded health p99':>17}")
+    print("-" * 79)
+
+    for backend in backends:
+        main.reset_leads()
+        main.inference_executor.shutdown()
+        main.inference_executor = InferenceExecutor(
+            lambda records: main.model_registry.current.predict(records),
+            backend=backend,
+            model_path=main.model_registry.current.path,
+            use_compiled=use_compiled
+        )
+        # Start process workers before measuring
+        if backend != "inline":
+            asyncio.run(main.inference_executor.run([main.lead_features(main.LeadInput(**LEAD))]))
+
+        idle, loaded, counter = asyncio.run(run_load(concurrency, duration, probe_interval))
+        throughput = counter.get(200, 0) / duration
+        print(f"{backend:>8} | {throughput:>8,.0f} | {ms(idle, 50):>12.2f} ms | "
+              f"{ms(loaded, 50):>14.2f} ms | {ms(loaded, 99):>14.2f} ms")
+
+    main.inference_executor.shutdown()
+    main.reset_leads()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Event loop responsiveness under /score load")
+    parser.add_argument("--engine", choices=["sklearn", "compiled"], default="sklearn",
+                        help="Model engine; the sklearn pipeline makes blocking easiest to see")
+    parser.add_argument("--backends", nargs="+", choices=INFERENCE_BACKENDS, default=list(INFERENCE_BACKENDS))
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--probe-interval", type=float, default=0.01)
+    args = parser.parse_args()
+    run_benchmark(args.engine, args.backends, args.concurrency, args.duration, args.probe_interval)
@@ -0,0 +1,82 @@
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+import main
+from benchmark_store import load_leads, make_lead
+from export import EXPORT_FORMATS
+
+async def download(export_format):
+    """
+    Call /leads/export on the ASGI app and return the number of bytes received.
+
+    The app is driven directly because httpx's ASGI transport collects
+    the whole response body, which would hide whether the server streams.
+    """
+    received = 0
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/leads/export", "raw_path": b"/leads/export",
+        "query_string": f"format={export_format}".encode(), "headers": [(b"host", b"benchmark")],
+        "client": ("127.0.0.1", 0), "server": ("benchmark", 80), "root_path": "",
+    }
+
+    requested = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # The server polls for a client disconnect while streaming
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal received
+        if message["type"] == "http.response.body":
+            received += len(message.get("body", b""))
+
+    await main.app(scope, receive, send)
+    finished.set()
+    return received
+
+def run_benchmark(n_leads, formats, trace_memory):
+    """Measure /leads/export throughput (MB/s) per format, and optionally peak memory."""
+
+    templates = load_leads()
+    main.reset_leads()
+    for start in range(0, n_leads, 100_000):
+        main.lead_store.extend([
+            make_lead(templates[i % len(templates)], i)
+            for i in range(start, min(start + 100_000, n_leads))
+        ])
+    print(f"{n_leads:,} stored leads ({main.lead_store.nbytes / 1e6:.0f} MB in the store)\n")
+    print(f"{'format':>7} | {'MB':>7} | {'MB/s':>7} | {'leads/s':>10} | {'peak memory':>11}")
+    print("-" * 56)
+
+    for export_format in formats:
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        received = asyncio.run(download(export_format))
+        elapsed = time.perf_counter() - start
+        memory = "-"
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            memory = f"{peak / 1e6:.1f} MB"
+        print(f"{export_format:>7} | {received / 1e6:>7.1f} | {received / 1e6 / elapsed:>7.1f} | "
+              f"{n_leads / elapsed:>10,.0f} | {memory:>11}")
+
+    main.reset_leads()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming lead export benchmark")
+    parser.add_argument("--leads", type=int, default=1_000_000)
+    parser.add_argument("--formats", nargs="+", choices=EXPORT_FORMATS, default=list(EXPORT_FORMATS))
+    parser.add_argument("--memory", action="store_true", help="Trace peak memory with tracemalloc")
+    args = parser.parse_args()
+    run_benchmark(args.leads, args.formats, args.memory)
@@ -0,0 +1,86 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+import httpx
+
+import main
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../data/leads_data.csv')
+
+# Size of each body piece sent to the endpoint, like a network read
+UPLOAD_PIECE_BYTES = 64 * 1024
+
+def csv_body(n_rows):
+    """Yield a CSV body of ``n_rows`` leads by repeating the dataset, one piece at a time."""
+    with open(DATA_PATH, 'rb') as f:
+        header = f.readline()
+        rows = f.read().splitlines(keepends=True)
+
+    yield header
+    piece, sent = [], 0
+    while sent < n_rows:
+        for row in rows[:n_rows - sent]:
+            piece.append(row)
+            if len(piece) * len(row) >= UPLOAD_PIECE_BYTES:
+                yield b''.join(piece)
+                piece = []
+        sent += min(len(rows), n_rows - sent)
+    if piece:
+        yield b''.join(piece)
+
+async def upload(n_rows):
+    async def body():
+        for piece in csv_body(n_rows):
+            yield piece
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        response = await client.post("/leads/import", params={"consent": "true"}, content=body(),
+                                     headers={"content-type": "text/csv"})
+    return response.json()
+
+def run_benchmark(sizes, trace_memory):
+    """Measure /leads/import throughput, and optionally peak memory, for growing CSV uploads."""
+
+    if main.model_registry.current is None:
+        print("Model not loaded. Please run setup_model.py first.")
+        sys.exit(1)
+    if not os.path.exists(DATA_PATH):
+        print(f"Error: Data file not found at {DATA_PATH}")
+        print("Please run generate_data.py first to create the dataset.")
+        sys.exit(1)
+
+    print(f"chunk size {main.IMPORT_CHUNK_SIZE} rows\n")
+    print(f"{'rows':>9} | {'MB':>7} | {'rows/s':>8} | {'peak import memory':>18}")
+    print("-" * 52)
+    if trace_memory:
+        print("(tracemalloc is on, which slows imports several times)")
+
+    for n_rows in sizes:
+        main.reset_leads()
+        store_bytes = main.lead_store.nbytes
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        job = asyncio.run(upload(n_rows))
+        elapsed = time.perf_counter() - start
+        assert job["scored"] == n_rows, job
+        memory = "-"
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            # Memory beyond what the stored leads themselves occupy
+            memory = f"{(peak - (main.lead_store.nbytes - store_bytes)) / 1e6:.1f} MB"
+        print(f"{n_rows:>9,} | {job['bytes_read'] / 1e6:>7.1f} | {n_rows / elapsed:>8,.0f} | {memory:>18}")
+
+    main.reset_leads()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming bulk import benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 300_000])
+    parser.add_argument("--memory", action="store_true", help="Trace peak memory with tracemalloc")
+    args = parser.parse_args()
+    run_benchmark(args.sizes, args.memory)
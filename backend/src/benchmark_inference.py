@@ -0,0 +1,68 @@
+import time
+import os
+import sys
+import joblib
+import numpy as np
+import pandas as pd
+
+from compiled_model import PROBABILITY_TOLERANCE, compile_pipeline
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../model/lead_scoring_model.pkl')
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../data/leads_data.csv')
+N_LEADS = 2000
+
+def percentiles(samples):
+    samples_us = np.array(samples) * 1e6
+    return np.percentile(samples_us, 50), np.percentile(samples_us, 99)
+
+def run_benchmark():
+    """Compare single-lead latency of the sklearn pipeline and the compiled model."""
+
+    try:
+        pipeline = joblib.load(MODEL_PATH)
+        df = pd.read_csv(DATA_PATH)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        print("Please run setup_model.py first.")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    compiled = compile_pipeline(pipeline)
+    print(f"Compiled {compiled.n_trees} trees in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    features = df.drop(['high_intent', 'phone_number', 'email', 'comments'], axis=1)
+    records = features.to_dict(orient='records')
+
+    # Accuracy over the whole dataset
+    expected = pipeline.predict_proba(features)[:, 1]
+    actual = compiled.predict_proba(records)[:, 1]
+    difference = np.max(np.abs(expected - actual))
+    print(f"Max probability difference over {len(records)} leads: {difference:.2e} "
+          f"(tolerance {PROBABILITY_TOLERANCE:.0e})")
+
+    # Single-lead latency, the way /score calls the model
+    sample = records[:N_LEADS]
+    pipeline_times = []
+    for record in sample:
+        start = time.perf_counter()
+        pipeline.predict_proba(pd.DataFrame([record]))
+        pipeline_times.append(time.perf_counter() - start)
+
+    compiled_times = []
+    for record in sample:
+        start = time.perf_counter()
+        compiled.predict_proba([record])
+        compiled_times.append(time.perf_counter() - start)
+
+    pipeline_p50, pipeline_p99 = percentiles(pipeline_times)
+    compiled_p50, compiled_p99 = percentiles(compiled_times)
+
+    print(f"\nSingle-lead latency over {len(sample)} leads (microseconds):")
+    print(f"{'engine':>10} | {'p50':>9} | {'p99':>9}")
+    print("-" * 34)
+    print(f"{'sklearn':>10} | {pipeline_p50:>9.1f} | {pipeline_p99:>9.1f}")
+    print(f"{'compiled':>10} | {compiled_p50:>9.1f} | {compiled_p99:>9.1f}")
+    print(f"\nSpeedup: {pipeline_p50 / compiled_p50:.1f}x at p50, {pipeline_p99 / compiled_p99:.1f}x at p99")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+import numpy as np
+
+import main
+from benchmark_event_loop import LEAD
+from metrics import STAGES, MetricsMiddleware, RequestMetrics
+
+async def call(app, scope, body):
+    """Send one request straight to an ASGI app and return the response status."""
+    status = 0
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+def request_scope(path, body):
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "headers": [(b"host", b"benchmark"), (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 0), "server": ("benchmark", 80), "root_path": "",
+    }
+
+async def per_call_seconds(app, path, body, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        await call(app, request_scope(path, body), body)
+    return (time.perf_counter() - start) / n
+
+def instrumentation_overhead(n):
+    """Cost of the middleware plus one timer per stage, around an app that does nothing."""
+
+    async def empty_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    metrics = RequestMetrics()
+    wrapped = MetricsMiddleware(empty_app, metrics)
+
+    async def instrumented(scope, receive, send):
+        await wrapped(scope, receive, send)
+        for stage in STAGES:
+            metrics.stage(stage, time.perf_counter())
+
+    results = {}
+    results["bare"] = asyncio.run(per_call_seconds(empty_app, "/score", b"", n))
+    for enabled in (False, True):
+        metrics.enabled = enabled
+        results[enabled] = asyncio.run(per_call_seconds(instrumented, "/score", b"", n))
+    return results
+
+def run_benchmark(n_overhead, n_requests, rounds):
+    """Measure what request and stage instrumentation adds to each request."""
+
+    overhead = instrumentation_overhead(n_overhead)
+    print(f"Instrumentation alone (middleware + {len(STAGES)} stage timers, {n_overhead:,} calls):")
+    print(f"  disabled: {(overhead[False] - overhead['bare']) * 1e6:6.2f} us per request")
+    print(f"  enabled:  {(overhead[True] - overhead['bare']) * 1e6:6.2f} us per request\n")
+
+    if main.model_registry.current is None:
+        print("Model not loaded. Please run setup_model.py first.")
+        sys.exit(1)
+    # Score every request on its own and skip the cache so each one runs every stage
+    main.score_batcher.window_ms = 0
+    main.prediction_cache.max_size = 0
+    body = json.dumps(LEAD).encode()
+
+    # Alternate rounds so drift affects both settings alike
+    timings = {False: [], True: []}
+    for _ in range(rounds):
+        for enabled in (False, True):
+            main.request_metrics.enabled = enabled
+            main.reset_leads()
+            timings[enabled].append(asyncio.run(per_call_seconds(main.app, "/score", body, n_requests)))
+
+    print(f"/score end to end ({rounds} rounds of {n_requests:,} requests, median per request):")
+    off, on = np.median(timings[False]), np.median(timings[True])
+    print(f"  metrics disabled: {off * 1e6:8.1f} us")
+    print(f"  metrics enabled:  {on * 1e6:8.1f} us ({(on - off) * 1e6:+.1f} us)")
+    main.inference_executor.shutdown()
+    main.reset_leads()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Overhead of request and stage metrics")
+    parser.add_argument("--calls", type=int, default=100_000, help="Calls for the isolated overhead")
+    parser.add_argument("--requests", type=int, default=2000, help="/score requests per round")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    run_benchmark(args.calls, args.requests, args.rounds)
@@ -0,0 +1,101 @@
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../model')
+
+# Serve a copy of the model directory so publishing benchmark models leaves ../model untouched
+directory = tempfile.mkdtemp(prefix='model-reload-')
+for name in ('lead_scoring_model.pkl', 'feature_columns.pkl'):
+    if not os.path.exists(os.path.join(MODEL_DIR, name)):
+        print("Model not found. Please run setup_model.py first.")
+        sys.exit(1)
+    shutil.copy(os.path.join(MODEL_DIR, name), directory)
+os.environ["MODEL_DIR"] = directory
+
+import httpx
+import joblib
+
+import main
+from benchmark_event_loop import LEAD
+from train_model import build_pipeline, load_training_data
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../data/leads_data.csv')
+
+async def score_worker(client, deadline, latencies, counter):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.post("/score", json=LEAD)
+        latencies.append(time.perf_counter() - start)
+        counter[response.status_code] = counter.get(response.status_code, 0) + 1
+
+async def reloader(client, deadline, interval, versions, reloads):
+    """Alternately publish each model file and ask the server to reload it."""
+    i = 0
+    while time.perf_counter() + interval < deadline:
+        await asyncio.sleep(interval)
+        shutil.copy(versions[i % len(versions)], main.MODEL_PATH)
+        start = time.perf_counter()
+        response = await client.post("/model/reload")
+        reloads.append((time.perf_counter() - start, response.json()["changed"]))
+        i += 1
+
+async def run_load(concurrency, duration, interval, versions):
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        latencies, counter, reloads = [], {}, []
+        deadline = time.perf_counter() + duration
+        tasks = [score_worker(client, deadline, latencies, counter) for _ in range(concurrency)]
+        if interval:
+            tasks.append(reloader(client, deadline, interval, versions, reloads))
+        await asyncio.gather(*tasks)
+    return latencies, counter, reloads
+
+def ms(samples, q):
+    return np.percentile(np.array(samples) * 1000, q) if samples else float('nan')
+
+def run_benchmark(concurrency, duration, interval):
+    """Compare /score latency with and without model reloads every ``interval`` seconds."""
+
+    # A second model version to alternate with the published one
+    df = load_training_data(DATA_PATH)
+    alternate = os.path.join(directory, 'alternate.pkl')
+    joblib.dump(build_pipeline('hgb').fit(df.drop(columns='high_intent'), df['high_intent']), alternate)
+    original = os.path.join(directory, 'original.pkl')
+    shutil.copy(main.MODEL_PATH, original)
+    # Forget replaced versions so every reload unpickles, compiles and warms a model
+    main.model_registry.keep = 0
+
+    print(f"{concurrency} concurrent /score clients for {duration:.0f}s, "
+          f"inference backend {main.inference_executor.backend}\n")
+    print(f"{'reloads':>14} | {'score/s':>8} | {'p50':>8} | {'p99':>8} | {'max':>8} | {'errors':>6} | {'reload time':>11}")
+    print("-" * 84)
+
+    for label, every in (("none", 0), (f"every {interval:g}s", interval)):
+        main.reset_leads()
+        latencies, counter, reloads = asyncio.run(run_load(concurrency, duration, every, [alternate, original]))
+        errors = sum(count for status, count in counter.items() if status != 200)
+        swapped = [seconds for seconds, changed in reloads if changed]
+        reload_time = f"{np.mean(swapped):.2f}s x{len(swapped)}" if swapped else "-"
+        print(f"{label:>14} | {counter.get(200, 0) / duration:>8,.0f} | {ms(latencies, 50):>5.2f} ms | "
+              f"{ms(latencies, 99):>5.2f} ms | {ms(latencies, 100):>5.2f} ms | {errors:>6} | {reload_time:>11}")
+
+    main.inference_executor.shutdown()
+    main.reset_leads()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="/score latency while models are hot-reloaded")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between reloads")
+    args = parser.parse_args()
+    try:
+        run_benchmark(args.concurrency, args.duration, args.interval)
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,83 @@
+import argparse
+import shutil
+import tempfile
+import time
+
+import main
+from benchmark_store import load_leads, make_lead
+from lead_store import LeadStore
+from persistence import PERSISTENCE_BACKENDS, open_lead_log
+
+def write_log(backend, directory, leads, snapshot_at=None):
+    """Log leads through a fresh LeadLog, optionally snapshotting after ``snapshot_at`` of them."""
+    log = open_lead_log(backend, directory)
+    log.start()
+    store = LeadStore()
+    start = time.perf_counter()
+    for lead in leads:
+        lead_id = store.append(lead)
+        log.append({"lead_id": lead_id, **lead})
+        if lead_id == snapshot_at:
+            log.snapshot(store.to_arrays())
+    enqueue = time.perf_counter() - start
+    log.flush()
+    total = time.perf_counter() - start
+    log.close()
+    return enqueue, total
+
+def time_restore(backend, directory):
+    """Start up from the log as main.py does, including the snapshot that follows a long replay."""
+    log = open_lead_log(backend, directory)
+    start = time.perf_counter()
+    restored = main.start_lead_log(log)
+    elapsed = time.perf_counter() - start
+    # Waits for that snapshot to be written
+    log.close()
+    return restored, elapsed
+
+def run_benchmark(n_leads, backends, tail_fraction):
+    """Measure append cost on the request path and startup replay time per backend."""
+
+    templates = load_leads()
+    leads = [make_lead(templates[i % len(templates)], i) for i in range(n_leads)]
+    tail = int(n_leads * tail_fraction)
+
+    print(f"{n_leads:,} leads, tail of {tail:,} leads after the snapshot\n")
+    print(f"{'backend':>7} | {'append':>10} | {'committed':>9} | {'replay log':>10} | "
+          f"{'next start':>10} | {'snapshot':>8} | {'snapshot+tail':>13}")
+    print("-" * 89)
+
+    for backend in backends:
+        results = []
+        for snapshot_at in (None, n_leads, n_leads - tail):
+            directory = tempfile.mkdtemp(prefix=f'leads-{backend}-')
+            try:
+                enqueue, total = write_log(backend, directory, leads, snapshot_at)
+                restored, elapsed = time_restore(backend, directory)
+                assert restored == n_leads, f"restored {restored} of {n_leads} leads"
+                results.append(elapsed)
+                if snapshot_at is None:
+                    # The restart after a full replay starts from the snapshot it left
+                    restored, elapsed = time_restore(backend, directory)
+                    assert restored == n_leads, f"restored {restored} of {n_leads} leads"
+                    results.append(elapsed)
+            finally:
+                shutil.rmtree(directory)
+            if snapshot_at is None:
+                append_us = enqueue / n_leads * 1e6
+                committed_rate = n_leads / total
+
+        print(f"{backend:>7} | {append_us:>7.2f} µs | {committed_rate:>7,.0f}/s | "
+              f"{results[0]:>8.2f} s | {results[1]:>8.2f} s | {results[2]:>6.2f} s | {results[3]:>11.2f} s")
+
+    main.reset_leads()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lead log append and restart replay benchmark")
+    parser.add_argument("--leads", type=int, default=1_000_000)
+    # The shared backend is appended to through sync(); benchmark_shared_store.py measures it
+    logged = [backend for backend in PERSISTENCE_BACKENDS[1:] if backend != 'shared']
+    parser.add_argument("--backends", nargs="+", choices=logged, default=logged)
+    parser.add_argument("--tail", type=float, default=0.1, help="Fraction of leads logged after the snapshot")
+    args = parser.parse_args()
+    run_benchmark(args.leads, args.backends, args.tail)
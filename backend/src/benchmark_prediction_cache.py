@@ -0,0 +1,65 @@
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+import numpy as np
+
+import main
+from benchmark_batch import load_leads
+from prediction_cache import PredictionCache
+
+COMMENTS = ['', 'Ready to buy soon', 'Just browsing', 'Need a home urgently', 'Following up on my inquiry']
+
+def resubmissions(n_requests, distinct, seed=0):
+    """Leads drawn from ``distinct`` forms, each resubmitted with varying comments, in random order."""
+    rng = random.Random(seed)
+    leads = load_leads(distinct)
+    return [main.LeadInput(**{**leads[rng.randrange(distinct)], 'comments': rng.choice(COMMENTS)})
+            for _ in range(n_requests)]
+
+async def score_all(leads, model_version):
+    latencies = []
+    for lead in leads:
+        start = time.perf_counter()
+        await main.score_lead(lead, model_version)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def run_benchmark(engine, n_requests, distinct, cache_size):
+    """Compare the cost of score_lead with and without the prediction cache on resubmitted leads."""
+
+    if main.model_registry.current is None:
+        print("Model not loaded. Please run setup_model.py first.")
+        sys.exit(1)
+    model_version = main.model_registry.current
+    if engine == "sklearn":
+        model_version.compiled = None
+    # Score each request on its own so its latency is its own prediction cost
+    main.score_batcher.window_ms = 0
+
+    leads = resubmissions(n_requests, distinct)
+    print(f"engine={engine}, {n_requests:,} /score requests for {distinct:,} distinct lead forms\n")
+    print(f"{'cache size':>10} | {'score/s':>8} | {'mean':>8} | {'p50':>8} | {'p99':>8} | {'hit rate':>8}")
+    print("-" * 65)
+
+    for size in (0, cache_size):
+        main.reset_leads()
+        main.prediction_cache = PredictionCache(max_size=size, version=model_version.version)
+        latencies = np.array(asyncio.run(score_all(leads, model_version))) * 1000
+        print(f"{size:>10,} | {1000 / latencies.mean():>8,.0f} | {latencies.mean():>5.2f} ms | "
+              f"{np.percentile(latencies, 50):>5.2f} ms | {np.percentile(latencies, 99):>5.2f} ms | "
+              f"{main.prediction_cache.stats()['hit_rate']:>8.1%}")
+
+    main.inference_executor.shutdown()
+    main.reset_leads()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prediction cache benchmark on resubmitted leads")
+    parser.add_argument("--engine", choices=["sklearn", "compiled"], default="sklearn")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--distinct", type=int, default=1000, help="Distinct lead forms among the requests")
+    parser.add_argument("--cache-size", type=int, default=10000)
+    args = parser.parse_args()
+    run_benchmark(args.engine, args.requests, args.distinct, args.cache_size)
@@ -0,0 +1,86 @@
+import time
+import os
+import sys
+import pandas as pd
+
+from reranker import SCAN_THRESHOLD_CHARS, KeywordAutomaton, LLMReranker
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../data/leads_data.csv')
+
+# Minimum lengths of the long comments built by joining dataset comments
+LONG_COMMENT_CHARS = (300, 1000, 4000)
+
+def substring_rerank(reranker, initial_score, comments):
+    """The previous re-ranker: one ``in`` scan per keyword."""
+    if not comments:
+        return initial_score
+
+    comments_lower = comments.lower()
+    score_adjustment = 0
+    for table in (reranker.positive_keywords, reranker.negative_keywords, reranker.neutral_keywords):
+        for keyword, value in table.items():
+            if keyword.lower() in comments_lower:
+                score_adjustment += value
+
+    return max(0, min(100, initial_score + score_adjustment))
+
+def automaton_rerank(automaton, values, initial_score, comments):
+    """The re-ranker with the automaton on every comment, however long."""
+    if not comments:
+        return initial_score
+    return max(0, min(100, initial_score + sum(values[index] for index in automaton.find(comments.lower()))))
+
+def long_comments(comments, min_chars):
+    """Free-text form comments can run to kilobytes: join dataset comments until each is ``min_chars`` long."""
+    joined, current = [], []
+    for comment in comments:
+        current.append(comment)
+        if sum(map(len, current)) + len(current) - 1 >= min_chars:
+            joined.append(' '.join(current))
+            current = []
+    return joined
+
+def time_per_comment(func, comments):
+    start = time.perf_counter()
+    for comment in comments:
+        func(50.0, comment)
+    return (time.perf_counter() - start) / len(comments) * 1e6
+
+def run_benchmark():
+    """Compare the re-ranker and its keyword automaton against per-keyword substring scans."""
+
+    try:
+        comments = pd.read_csv(DATA_PATH)['comments'].fillna('').tolist()
+    except FileNotFoundError:
+        print(f"Error: Data file not found at {DATA_PATH}")
+        print("Please run generate_data.py first to create the dataset.")
+        sys.exit(1)
+
+    reranker = LLMReranker()
+    compiled, values = reranker._compile()
+    automaton = KeywordAutomaton(compiled.patterns, scan_threshold=None)
+
+    workloads = [("dataset comments", comments)]
+    workloads += [(f"long comments of {min_chars}+ chars", long_comments(comments, min_chars))
+                  for min_chars in LONG_COMMENT_CHARS]
+    print(f"Comments over {SCAN_THRESHOLD_CHARS} chars are matched with substring scans")
+
+    for name, workload in workloads:
+        expected = [substring_rerank(reranker, 50.0, comment) for comment in workload]
+        # Both the re-ranker and the automaton on its own must agree with the scans
+        mismatches = sum(1 for comment, score in zip(workload, expected)
+                         if reranker.rerank(50.0, comment) != score
+                         or automaton_rerank(automaton, values, 50.0, comment) != score)
+
+        baseline = time_per_comment(lambda score, comment: substring_rerank(reranker, score, comment), workload)
+        automaton_only = time_per_comment(lambda score, comment: automaton_rerank(automaton, values, score, comment), workload)
+        reranked = time_per_comment(reranker.rerank, workload)
+
+        average = sum(map(len, workload)) / len(workload)
+        print(f"\n{name} (avg {average:.0f} chars), {len(workload)} comments, {mismatches} mismatches")
+        print(f"  substring scans: {baseline:8.2f} us/comment")
+        print(f"  automaton only:  {automaton_only:8.2f} us/comment ({baseline / automaton_only:.2f}x)")
+        print(f"  re-ranker:       {reranked:8.2f} us/comment ({baseline / reranked:.2f}x)")
+
+if __name__ == "__main__":
+    run_benchmark()
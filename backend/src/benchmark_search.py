@@ -0,0 +1,64 @@
+import argparse
+import os
+import time
+
+os.environ.setdefault("LEAD_PERSISTENCE", "none")
+
+from fastapi.testclient import TestClient
+
+import main
+from benchmark_suite import stored_leads, synthetic_leads
+from text_index import contains_phrase, parse_query, tokenize
+
+QUERIES = ('"pre-approved loan"', 'good schools', '"good schools" OR urgent', 'villa pool')
+
+def scan(query):
+    """The search without an index: tokenize every stored comment."""
+    groups = parse_query(query)
+    return [
+        lead_id for lead_id, comment in enumerate(main.lead_store.column('comments'), 1)
+        if any(all(contains_phrase(tokens, phrase) for phrase in group)
+               for tokens in [tokenize(comment)] for group in groups)
+    ]
+
+def timed(func, *args, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(*args)
+    return result, (time.perf_counter() - start) / repeat
+
+def run_benchmark(sizes, repeat):
+    """Query latency of /leads/search against a full scan, and the index's size and upkeep, per store size."""
+
+    leads = stored_leads(synthetic_leads(max(sizes)))
+    client = TestClient(main.app)
+    for size in sizes:
+        main.reset_leads()
+        main.lead_store.extend(leads[:size])
+        _, build_seconds = timed(main.rebuild_derived_state)
+        stats = main.comment_index.stats()
+        print(f"\n{size:,} leads: {stats['terms']:,} terms, {stats['postings']:,} postings, "
+              f"{stats['bytes'] / 1e6:.1f} MB, rebuilt with the other indexes in {build_seconds:.2f}s")
+        print(f"{'query':>26} | {'matches':>8} | {'index':>9} | {'/leads/search':>13} | {'scan':>9}")
+        print("-" * 78)
+        for query in QUERIES:
+            matches, index_seconds = timed(main.comment_index.search, query, repeat=repeat)
+            _, route_seconds = timed(lambda: client.get("/leads/search", params={"q": query}), repeat=repeat)
+            scanned, scan_seconds = timed(scan, query)
+            assert matches.tolist() == scanned, f"index and scan disagree on {query}"
+            print(f"{query:>26} | {len(matches):>8,} | {index_seconds * 1000:>6.2f} ms | "
+                  f"{route_seconds * 1000:>10.2f} ms | {scan_seconds * 1000:>6.0f} ms")
+
+    main.reset_leads()
+    _, add_seconds = timed(main.store_leads, leads[:10000])
+    main.comment_index.clear()
+    main.reset_leads()
+    print(f"\nStoring a lead, comment indexing included: {add_seconds / 10000 * 1e6:.1f} us")
+    main.inference_executor.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inverted-index /leads/search vs scanning comments")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 500000])
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per indexed query")
+    args = parser.parse_args()
+    run_benchmark(args.sizes, args.repeat)
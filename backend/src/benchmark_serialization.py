@@ -0,0 +1,51 @@
+import argparse
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse
+
+import main
+from benchmark_suite import stored_leads, synthetic_leads
+from serialization import CONTENT_CODINGS, compress, encode_leads
+
+def model_path(store):
+    """The previous /leads?all=true path: format dicts, validate and dump the response models, render JSON."""
+    adapter = TypeAdapter(List[main.LeadResponse])
+    items = [main.format_lead(lead) for lead in store.slice(fields=main.LeadResponse.__fields__)]
+    return JSONResponse(adapter.dump_python(adapter.validate_python(items), mode='json')).body
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def run_benchmark(sizes):
+    """Compare /leads?all=true encoding through the response models with the columnar encoder."""
+
+    leads = stored_leads(synthetic_leads(max(sizes)))
+    print(f"{'leads':>9} | {'models':>8} | {'columnar':>8} | {'speedup':>7} | {'MB':>6} | "
+          + " | ".join(f"{coding:>16}" for coding in CONTENT_CODINGS))
+    print("-" * (60 + 19 * len(CONTENT_CODINGS)))
+
+    for size in sizes:
+        main.reset_leads()
+        main.lead_store.extend(leads[:size])
+        before, before_seconds = timed(model_path, main.lead_store)
+        after, after_seconds = timed(encode_leads, main.lead_store)
+        assert before == after, "encoded bytes differ from the response model path"
+        compressed = []
+        for coding in CONTENT_CODINGS:
+            body, seconds = timed(compress, after, coding)
+            compressed.append(f"{len(body) / 1e6:5.2f} MB {seconds:6.3f}s")
+        print(f"{size:>9,} | {before_seconds:>7.3f}s | {after_seconds:>7.3f}s | {before_seconds / after_seconds:>6.1f}x | "
+              f"{len(after) / 1e6:>6.1f} | " + " | ".join(f"{c:>16}" for c in compressed))
+
+    main.inference_executor.shutdown()
+    main.reset_leads()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="/leads response encoding and compression benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 300000])
+    args = parser.parse_args()
+    run_benchmark(args.sizes)
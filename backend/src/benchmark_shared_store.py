@@ -0,0 +1,102 @@
+import argparse
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../model')
+
+async def worker_requests(main, leads, start_at):
+    import httpx
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        # Start every worker's requests together, as a load balancer would spread them
+        await asyncio.sleep(max(0.0, start_at - time.time()))
+        start = time.perf_counter()
+        lead_ids = []
+        for lead in leads:
+            response = await client.post("/score", json=lead)
+            lead_ids.append(response.json()["lead_id"])
+        elapsed = time.perf_counter() - start
+        return lead_ids, elapsed
+
+async def worker_view(main):
+    """What this worker serves once every worker is done: the lead count, stats and a digest of /leads."""
+    import httpx
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        stats = (await client.get("/leads/stats")).json()
+        listing = (await client.get("/leads?all=true", headers={"accept-encoding": "identity"})).content
+    return stats["total_leads"], stats["avg_reranked_score"], hashlib.sha256(listing).hexdigest()
+
+def run_worker(index, persistence, directory, n_leads, start_at, done, results):
+    """One server worker process: score leads through its own app, then report what it serves."""
+    os.environ.update({
+        "LEAD_PERSISTENCE": persistence,
+        "LEAD_DATA_DIR": directory,
+        "SCORE_BATCH_WINDOW_MS": "0",
+        "INFERENCE_BACKEND": "inline",
+    })
+    import main
+    from benchmark_suite import synthetic_leads
+
+    leads = synthetic_leads(n_leads, seed=1000 + index)
+    lead_ids, elapsed = asyncio.run(worker_requests(main, leads, start_at))
+    done.wait()
+    results.put((index, lead_ids, elapsed, asyncio.run(worker_view(main))))
+    if main.lead_log is not None:
+        main.lead_log.close()
+
+def run_workers(persistence, workers, n_leads):
+    directory = tempfile.mkdtemp(prefix='shared-store-')
+    context = multiprocessing.get_context('spawn')
+    done = context.Barrier(workers)
+    results = context.Queue()
+    # Give every process time to import the app and load the model first
+    start_at = time.time() + 10
+    processes = [
+        context.Process(target=run_worker, args=(i, persistence, directory, n_leads, start_at, done, results))
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    shutil.rmtree(directory)
+    return collected
+
+def run_benchmark(worker_counts, n_leads):
+    """Score leads from several worker processes and check that every worker serves the same leads."""
+
+    if not os.path.exists(os.path.join(MODEL_DIR, 'lead_scoring_model.pkl')):
+        print("Model not found. Please run setup_model.py first.")
+        sys.exit(1)
+
+    print(f"{n_leads:,} /score requests per worker process\n")
+    print(f"{'persistence':>11} | {'workers':>7} | {'score/s':>8} | {'unique ids':>10} | "
+          f"{'leads seen per worker':>22} | {'same /leads':>11}")
+    print("-" * 88)
+    for persistence in ('none', 'shared'):
+        for workers in worker_counts:
+            collected = run_workers(persistence, workers, n_leads)
+            lead_ids = [lead_id for _, ids, _, _ in collected for lead_id in ids]
+            views = [view for _, _, _, view in collected]
+            elapsed = max(seconds for _, _, seconds, _ in collected)
+            seen = sorted({total for total, _, _ in views})
+            print(f"{persistence:>11} | {workers:>7} | {len(lead_ids) / elapsed:>8,.0f} | "
+                  f"{f'{len(set(lead_ids)):,}/{len(lead_ids):,}':>10} | {', '.join(f'{s:,}' for s in seen):>22} | "
+                  f"{'yes' if len(set(views)) == 1 else 'no':>11}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lead storage shared by several worker processes")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--leads", type=int, default=1000, help="/score requests per worker")
+    args = parser.parse_args()
+    run_benchmark(args.workers, args.leads)
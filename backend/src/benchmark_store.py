@@ -0,0 +1,92 @@
+import argparse
+import gc
+import time
+import tracemalloc
+import os
+import sys
+import pandas as pd
+
+from lead_store import LeadStore
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../data/leads_data.csv')
+
+def load_leads():
+    """Load the dataset as scored lead records with unique contact fields."""
+    try:
+        df = pd.read_csv(DATA_PATH)
+    except FileNotFoundError:
+        print(f"Error: Data file not found at {DATA_PATH}")
+        print("Please run generate_data.py first to create the dataset.")
+        sys.exit(1)
+
+    df = df.drop(columns=['high_intent'])
+    df['comments'] = df['comments'].fillna('')
+    df['initial_score'] = 50.0
+    df['reranked_score'] = 50.0
+    return df.to_dict(orient='records')
+
+def make_lead(template, i):
+    """Copy a template lead, making strings and scores distinct like real traffic."""
+    lead = dict(template)
+    lead['email'] = f"{i}.{template['email']}"
+    lead['phone_number'] = f"+91-{7000000000 + i}"
+    lead['comments'] = f"{template['comments']} #{i}"
+    lead['initial_score'] = (i * 7919 % 10000) / 100
+    lead['reranked_score'] = (i * 104729 % 10000) / 100
+    return lead
+
+def measure(build):
+    """Return (result, traced bytes, seconds) for building a lead container."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+def run_benchmark(n_leads):
+    """Compare memory and scan cost of a list of dicts against the columnar LeadStore."""
+
+    templates = load_leads()
+
+    def build_list():
+        return [
+            {"lead_id": i + 1, **make_lead(templates[i % len(templates)], i)}
+            for i in range(n_leads)
+        ]
+
+    def build_store():
+        store = LeadStore()
+        for i in range(n_leads):
+            store.append(make_lead(templates[i % len(templates)], i))
+        return store
+
+    leads_list, list_bytes, list_seconds = measure(build_list)
+    start = time.perf_counter()
+    list_avg = sum(lead["reranked_score"] for lead in leads_list) / len(leads_list)
+    list_scan = time.perf_counter() - start
+    del leads_list
+
+    store, store_bytes, store_seconds = measure(build_store)
+    start = time.perf_counter()
+    store_avg = float(store.column("reranked_score").mean())
+    store_scan = time.perf_counter() - start
+
+    print(f"{n_leads:,} leads")
+    print(f"{'representation':>15} | {'memory MB':>9} | {'bytes/lead':>10} | {'build s':>7} | {'avg scan ms':>11}")
+    print("-" * 66)
+    print(f"{'list of dicts':>15} | {list_bytes / 1e6:>9.1f} | {list_bytes / n_leads:>10.0f} | "
+          f"{list_seconds:>7.2f} | {list_scan * 1000:>11.2f}")
+    print(f"{'LeadStore':>15} | {store_bytes / 1e6:>9.1f} | {store_bytes / n_leads:>10.0f} | "
+          f"{store_seconds:>7.2f} | {store_scan * 1000:>11.2f}")
+    print(f"\nMemory reduction: {list_bytes / store_bytes:.1f}x "
+          f"(LeadStore buffers: {store.nbytes / 1e6:.1f} MB)")
+    assert abs(list_avg - store_avg) < 1e-6
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lead store memory benchmark")
+    parser.add_argument("--leads", type=int, default=200000, help="Number of leads to store")
+    args = parser.parse_args()
+    run_benchmark(args.leads)
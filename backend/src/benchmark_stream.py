@@ -0,0 +1,126 @@
+import argparse
+import asyncio
+import os
+import time
+
+# Stay in memory and deliver each burst as soon as it is stored
+os.environ.setdefault("LEAD_PERSISTENCE", "none")
+os.environ.setdefault("STREAM_WINDOW_MS", "1")
+
+import main
+from benchmark_suite import stored_leads, synthetic_leads
+
+def http_scope(path, query=b''):
+    return {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query, 'root_path': '',
+        'headers': [(b'host', b'benchmark')], 'client': ('127.0.0.1', 1), 'server': ('benchmark', 80),
+    }
+
+async def asgi_get(path, query=b''):
+    """Call the app directly, without an HTTP client, and return the size of the response body."""
+    size = 0
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        nonlocal size
+        if message['type'] == 'http.response.body':
+            size += len(message.get('body', b''))
+
+    await main.app(http_scope(path, query), receive, send)
+    return size
+
+class StreamClient:
+    """A dashboard connected to /leads/stream, counting what it receives."""
+
+    def __init__(self):
+        self.bytes = 0
+        self.messages = 0
+        self.received = asyncio.Event()
+        self.disconnected = asyncio.Event()
+        self.task = None
+
+    async def run(self):
+        requested = False
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await self.disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.body' and message.get('body'):
+                self.bytes += len(message['body'])
+                self.messages += 1
+                self.received.set()
+
+        await main.app(http_scope('/leads/stream'), receive, send)
+
+async def polling(clients, bursts, burst):
+    """Every dashboard refetches the first /leads page and /leads/stats after each burst of leads."""
+    sent, seconds = 0, 0.0
+    for records in bursts:
+        main.store_leads(records)
+        start = time.process_time()
+        for _ in range(clients):
+            sent += await asgi_get('/leads', b'limit=50')
+            sent += await asgi_get('/leads/stats')
+        seconds += time.process_time() - start
+    return seconds, sent
+
+async def streaming(clients, bursts, burst):
+    """Every dashboard holds a /leads/stream connection and is pushed each burst of leads."""
+    dashboards = [StreamClient() for _ in range(clients)]
+    for dashboard in dashboards:
+        dashboard.task = asyncio.create_task(dashboard.run())
+    while len(main.lead_events.subscribers) < clients or not all(d.received.is_set() for d in dashboards):
+        await asyncio.sleep(0.01)
+    connected = sum(dashboard.bytes for dashboard in dashboards)
+
+    seconds = 0.0
+    for records in bursts:
+        for dashboard in dashboards:
+            dashboard.received.clear()
+        start = time.process_time()
+        main.store_leads(records)
+        for dashboard in dashboards:
+            await dashboard.received.wait()
+        seconds += time.process_time() - start
+
+    for dashboard in dashboards:
+        dashboard.disconnected.set()
+    await asyncio.gather(*[dashboard.task for dashboard in dashboards])
+    return seconds, sum(dashboard.bytes for dashboard in dashboards) - connected
+
+async def run_benchmark(clients, store_sizes, updates, burst):
+    """Server CPU and bytes per update for dashboards that poll vs dashboards on /leads/stream."""
+
+    leads = stored_leads(synthetic_leads(max(store_sizes) + updates * burst))
+    print(f"{clients} dashboards, {updates} updates of {burst} newly scored leads each\n")
+    print(f"{'stored leads':>12} | {'mode':>9} | {'CPU/update':>10} | {'KB/update':>10} | {'KB/dashboard':>12}")
+    print("-" * 66)
+    for size in store_sizes:
+        bursts = [leads[size + i * burst:size + (i + 1) * burst] for i in range(updates)]
+        for mode, run in (('polling', polling), ('streaming', streaming)):
+            main.reset_leads()
+            main.lead_store.extend(leads[:size])
+            main.rebuild_derived_state()
+            seconds, sent = await run(clients, bursts, burst)
+            print(f"{size:>12,} | {mode:>9} | {seconds / updates * 1000:>7.1f} ms | {sent / updates / 1000:>10,.1f} | "
+                  f"{sent / updates / clients / 1000:>12.2f}")
+    main.reset_leads()
+    main.inference_executor.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dashboard updates by polling vs Server-Sent Events")
+    parser.add_argument("--clients", type=int, default=500, help="Open dashboards")
+    parser.add_argument("--store-sizes", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--updates", type=int, default=10)
+    parser.add_argument("--burst", type=int, default=20, help="Leads scored between updates")
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.clients, args.store_sizes, args.updates, args.burst))
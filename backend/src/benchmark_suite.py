@@ -0,0 +1,253 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(SRC_DIR, 'benchmark_baseline.json')
+FIXTURE_ROWS = 5000
+FIXTURE_SEED = 7
+WARMUP_REQUESTS = 50
+
+# A scenario regresses when its throughput falls, or its p95 latency grows, by more than this fraction
+DEFAULT_TOLERANCE = 0.25
+
+def build_fixture_model(directory, rows=FIXTURE_ROWS, seed=FIXTURE_SEED):
+    """Train and publish a small model on synthetic leads, so the suite needs no trained artifacts."""
+    from generate_data import generate_chunk
+    from train_model import TRAINING_DTYPES, build_pipeline, categorical_features, numerical_features, publish
+
+    df = generate_chunk(rows, np.random.SeedSequence(seed)).astype(TRAINING_DTYPES)
+    pipeline = build_pipeline('gbc').fit(df[numerical_features + categorical_features], df['high_intent'])
+    publish({'categorical_features': categorical_features, 'numerical_features': numerical_features},
+            os.path.join(directory, 'feature_columns.pkl'))
+    publish(pipeline, os.path.join(directory, 'lead_scoring_model.pkl'))
+
+def synthetic_leads(n, seed=FIXTURE_SEED + 1):
+    """Lead form submissions drawn from the synthetic data generator."""
+    from generate_data import generate_chunk
+
+    df = generate_chunk(n, np.random.SeedSequence(seed)).drop(columns='high_intent')
+    df['consent'] = True
+    return df.to_dict(orient='records')
+
+def stored_leads(leads):
+    """Lead store records for form submissions, with deterministic scores."""
+    return [
+        {**{k: v for k, v in lead.items() if k != 'consent'},
+         'initial_score': (i * 7919 % 10000) / 100, 'reranked_score': (i * 104729 % 10000) / 100}
+        for i, lead in enumerate(leads)
+    ]
+
+def summarize(latencies, elapsed, errors):
+    samples = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(float(np.percentile(samples, 50)), 4),
+        "p95_ms": round(float(np.percentile(samples, 95)), 4),
+        "p99_ms": round(float(np.percentile(samples, 99)), 4),
+    }
+
+async def timed_requests(client, requests, concurrency=1):
+    """Issue ``(method, url, json)`` requests from ``concurrency`` workers; return per-request latencies."""
+    latencies, errors = [], 0
+    pending = iter(requests)
+
+    async def worker():
+        nonlocal errors
+        for method, url, body in pending:
+            start = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - start)
+            errors += response.status_code != 200
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+async def run_scenarios(main, args):
+    import httpx
+
+    n = args.score_requests
+    leads = synthetic_leads(max(2 * n + WARMUP_REQUESTS, max(args.store_sizes)))
+    # Each /score scenario sends leads no earlier request sent, so every one misses the prediction cache
+    warmup, single, concurrent = leads[2 * n:2 * n + WARMUP_REQUESTS], leads[:n], leads[n:2 * n]
+    results = {}
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        # Warm up the routes, validation and model before anything is timed
+        await timed_requests(client, [("POST", "/score", lead) for lead in warmup])
+
+        main.reset_leads()
+        results["score_single"] = await timed_requests(
+            client, [("POST", "/score", lead) for lead in single])
+        main.reset_leads()
+        results[f"score_concurrent_{args.concurrency}"] = await timed_requests(
+            client, [("POST", "/score", lead) for lead in concurrent], args.concurrency)
+
+        for size in args.store_sizes:
+            main.reset_leads()
+            main.lead_store.extend(stored_leads(leads[:size]))
+            main.rebuild_derived_state()
+            results[f"leads_page_{size}"] = await timed_requests(
+                client, [("GET", "/leads?limit=50", None)] * args.read_requests)
+            results[f"leads_stats_{size}"] = await timed_requests(
+                client, [("GET", "/leads/stats", None)] * args.read_requests)
+            if size <= args.max_unpaginated:
+                results[f"leads_all_{size}"] = await timed_requests(
+                    client, [("GET", "/leads?all=true", None)] * max(1, args.read_requests // 10))
+        main.reset_leads()
+    return results
+
+def rerank_scenario(n):
+    """The keyword re-ranker on its own, over synthetic form comments."""
+    from reranker import LLMReranker
+
+    reranker = LLMReranker()
+    comments = [lead['comments'] for lead in synthetic_leads(n)]
+    latencies = []
+    start = time.perf_counter()
+    for comment in comments:
+        call_start = time.perf_counter()
+        reranker.rerank(50.0, comment)
+        latencies.append(time.perf_counter() - call_start)
+    return summarize(latencies, time.perf_counter() - start, 0)
+
+def batch_score_scenarios(model_dir, n_rows, worker_counts, chunk_rows):
+    """
+    batch_score.py over a synthetic CSV dump with each worker count.
+
+    Rows count as requests, so throughput is rows/s; the latency
+    percentiles are those of scoring one chunk in a worker.
+    """
+    from batch_score import batch_score
+    from generate_data import generate_chunk
+
+    directory = tempfile.mkdtemp(prefix='benchmark-batch-')
+    results = {}
+    try:
+        input_path = os.path.join(directory, 'leads.csv')
+        dump = generate_chunk(n_rows, np.random.SeedSequence(FIXTURE_SEED + 2)).drop(columns='high_intent')
+        dump.to_csv(input_path, index=False)
+        for workers in worker_counts:
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = batch_score(input_path, os.path.join(directory, f'out-{workers}'),
+                                     chunk_rows=chunk_rows, workers=workers, model_dir=model_dir)
+            results[f"batch_score_{workers}w"] = {
+                **summarize(result["chunk_seconds"], result["seconds"], result["unscored"]),
+                "requests": result["rows"],
+                "throughput": round(result["rows"] / result["seconds"], 1),
+            }
+    finally:
+        shutil.rmtree(directory)
+    return results
+
+def compare(results, baseline, tolerance):
+    """Print each scenario against the baseline; return the names of those that regressed."""
+    regressions = []
+    print(f"{'scenario':>22} | {'req/s':>9} | {'p50':>9} | {'p95':>9} | {'p99':>9} | {'vs baseline':>22}")
+    print("-" * 94)
+    for name, result in results.items():
+        reference = baseline.get(name)
+        verdict = "-"
+        if reference:
+            throughput = result["throughput"] / reference["throughput"] - 1
+            p95 = result["p95_ms"] / reference["p95_ms"] - 1
+            verdict = f"{throughput:+6.1%} req/s {p95:+6.1%} p95"
+            if throughput < -tolerance or p95 > tolerance:
+                regressions.append(name)
+                verdict += " !"
+        errors = f" ({result['errors']} errors)" if result["errors"] else ""
+        print(f"{name:>22} | {result['throughput']:>9,.0f} | {result['p50_ms']:>6.3f} ms | "
+              f"{result['p95_ms']:>6.3f} ms | {result['p99_ms']:>6.3f} ms | {verdict:>22}{errors}")
+    return regressions
+
+def run_suite(args):
+    """Run every scenario in-process and compare it against the stored baseline."""
+
+    directory = None
+    if args.model_dir is None:
+        directory = tempfile.mkdtemp(prefix='benchmark-suite-')
+        print(f"Training the fixture model on {FIXTURE_ROWS:,} synthetic leads...")
+        build_fixture_model(directory)
+    # Keep the suite in memory and on the fixture model, whatever the shell environment sets
+    os.environ.update({
+        "MODEL_DIR": args.model_dir or directory,
+        "MODEL_WATCH_SECONDS": "0",
+        "LEAD_PERSISTENCE": "none",
+    })
+    try:
+        import main
+
+        if main.model_registry.current is None:
+            print(f"Model not loaded from {os.environ['MODEL_DIR']}.")
+            sys.exit(1)
+        results = asyncio.run(run_scenarios(main, args))
+        results["rerank"] = rerank_scenario(args.rerank_calls)
+        main.inference_executor.shutdown()
+        if args.batch_rows:
+            results.update(batch_score_scenarios(os.environ["MODEL_DIR"], args.batch_rows,
+                                                 args.batch_workers, args.batch_chunk_rows))
+    finally:
+        if directory is not None:
+            shutil.rmtree(directory)
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["scenarios"]
+    print()
+    regressions = compare(results, baseline, args.tolerance)
+    if args.batch_rows and len(args.batch_workers) > 1:
+        rates = [results[f"batch_score_{workers}w"]["throughput"] for workers in args.batch_workers]
+        print(f"\nbatch_score.py rows/s relative to {args.batch_workers[0]} worker(s), {os.cpu_count()} cores: " +
+              ", ".join(f"{workers} workers {rate / rates[0]:.2f}x" for workers, rate in zip(args.batch_workers, rates)))
+    if any(result["errors"] for result in results.values()):
+        print("\nSome requests failed.")
+        sys.exit(1)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "cpus": os.cpu_count(),
+                "scenarios": results,
+            }, f, indent=2)
+            f.write('\n')
+        print(f"\nBaseline saved to {args.baseline}")
+    elif not baseline:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one.")
+    elif regressions:
+        print(f"\n{len(regressions)} scenario(s) regressed by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    else:
+        print(f"\nNo scenario regressed by more than {args.tolerance:.0%}.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="In-process API benchmark suite with a baseline regression check")
+    parser.add_argument("--model-dir", help="Benchmark a trained model directory instead of the synthetic fixture")
+    parser.add_argument("--score-requests", type=int, default=1000, help="/score requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="Clients of the concurrent /score scenario")
+    parser.add_argument("--store-sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--read-requests", type=int, default=200, help="/leads and /leads/stats requests per store size")
+    parser.add_argument("--max-unpaginated", type=int, default=10000, help="Largest store size fetched with all=true")
+    parser.add_argument("--rerank-calls", type=int, default=20000)
+    parser.add_argument("--batch-rows", type=int, default=100000, help="Rows of the batch_score.py dump (0 skips it)")
+    parser.add_argument("--batch-workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts for batch_score.py")
+    parser.add_argument("--batch-chunk-rows", type=int, default=10000)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Record these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    run_suite(parser.parse_args())
@@ -0,0 +1,496 @@
+import json
+import os
+import numpy as np
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+# Largest allowed difference between compiled and sklearn probabilities
+PROBABILITY_TOLERANCE = 1e-6
+
+# Saved form of a CompiledModel: one .npy file per array plus a JSON file for everything else
+ARTIFACT_FORMAT = 1
+ARTIFACT_METADATA = 'compiled_model.json'
+ARTIFACT_ARRAYS = ('means', 'scales', 'feature', 'threshold', 'children_left', 'children_right', 'value',
+                   'missing_left', 'is_categorical', 'category_left')
+FEATURE_DTYPES = {'float32': np.float32, 'float64': np.float64}
+
+class CompilationError(Exception):
+    """Raised when a fitted pipeline cannot be flattened into arrays."""
+
+class CompiledModel:
+    """
+    Pandas-free evaluator for the fitted lead scoring pipeline.
+
+    The preprocessing steps are reduced to scaler statistics and
+    category-to-column tables, and the boosted trees are packed into
+    padded ``(n_trees, max_nodes)`` arrays so that a whole batch is
+    traversed with a handful of vectorized NumPy operations.
+
+    Histogram gradient boosting pipelines additionally carry per-node
+    missing-value directions and, for categorical splits, a table of the
+    category codes sent to the left child; their categories are encoded
+    as one ordinal column each rather than one-hot.
+    """
+
+    def __init__(self, n_features: int, numerical_features: List[str], numerical_offset: int,
+                 means: np.ndarray, scales: np.ndarray,
+                 categorical_features: List[str], category_tables: List[Dict[Any, int]],
+                 init_score: float, learning_rate: float,
+                 feature: np.ndarray, threshold: np.ndarray,
+                 children_left: np.ndarray, children_right: np.ndarray,
+                 value: np.ndarray, max_depth: int,
+                 categorical_columns: Optional[List[int]] = None,
+                 missing_left: Optional[np.ndarray] = None,
+                 is_categorical: Optional[np.ndarray] = None,
+                 category_left: Optional[np.ndarray] = None,
+                 feature_dtype: type = np.float32, classifier: Optional[str] = None):
+        self.n_features = n_features
+        self.numerical_features = numerical_features
+        self.numerical_offset = numerical_offset
+        self.means = means
+        self.scales = scales
+        self.categorical_features = categorical_features
+        self.category_tables = category_tables
+        self.init_score = init_score
+        self.learning_rate = learning_rate
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.value = value
+        self.max_depth = max_depth
+        self.categorical_columns = categorical_columns
+        self.missing_left = missing_left
+        self.is_categorical = is_categorical
+        self.category_left = category_left
+        self.feature_dtype = feature_dtype
+        self.classifier = classifier
+        self.metadata: Dict[str, Any] = {}
+        self._tree_index = np.arange(feature.shape[0])[None, :]
+
+    @property
+    def n_trees(self) -> int:
+        return self.feature.shape[0]
+
+    def save(self, directory: str, metadata: Optional[Dict[str, Any]] = None):
+        """
+        Write the model to ``directory`` as uncompressed ``.npy`` arrays and a JSON file.
+
+        ``load`` memory-maps the arrays back without unpickling anything,
+        so neither sklearn nor the pipeline is needed to serve the model.
+        ``metadata`` is stored alongside and returned by ``load``.
+        """
+        if any(not isinstance(category, str) for table in self.category_tables for category in table):
+            raise CompilationError("only string categories can be saved")
+        os.makedirs(directory, exist_ok=True)
+        for name in ARTIFACT_ARRAYS:
+            array = getattr(self, name)
+            if array is not None:
+                np.save(os.path.join(directory, name + '.npy'), np.ascontiguousarray(array), allow_pickle=False)
+        fields = {
+            'format': ARTIFACT_FORMAT,
+            'n_features': self.n_features,
+            'numerical_features': self.numerical_features,
+            'numerical_offset': self.numerical_offset,
+            'categorical_features': self.categorical_features,
+            'category_tables': [{category: int(column) for category, column in table.items()}
+                                for table in self.category_tables],
+            'init_score': float(self.init_score),
+            'learning_rate': float(self.learning_rate),
+            'max_depth': int(self.max_depth),
+            'categorical_columns': self.categorical_columns,
+            'feature_dtype': np.dtype(self.feature_dtype).name,
+            'classifier': self.classifier,
+            'arrays': [name for name in ARTIFACT_ARRAYS if getattr(self, name) is not None],
+            'metadata': metadata or {},
+        }
+        # The JSON file is written last and marks a complete artifact
+        temporary = os.path.join(directory, ARTIFACT_METADATA + '.tmp')
+        with open(temporary, 'w') as f:
+            json.dump(fields, f)
+        os.replace(temporary, os.path.join(directory, ARTIFACT_METADATA))
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> 'CompiledModel':
+        """
+        Read a model written by ``save``; its metadata is set as ``metadata``.
+
+        With ``mmap`` the arrays are mapped read-only rather than read, so
+        loading costs little more than opening the files and processes
+        serving the same artifact share its pages.
+
+        Raises:
+            FileNotFoundError: If ``directory`` holds no complete artifact
+            CompilationError: If the artifact has an unknown format
+        """
+        with open(os.path.join(directory, ARTIFACT_METADATA)) as f:
+            fields = json.load(f)
+        if fields.pop('format', None) != ARTIFACT_FORMAT:
+            raise CompilationError(f"unsupported compiled model artifact in {directory}")
+        metadata = fields.pop('metadata')
+        for name in fields.pop('arrays'):
+            array = np.load(os.path.join(directory, name + '.npy'), mmap_mode='r' if mmap else None,
+                            allow_pickle=False)
+            # A plain ndarray view of the mapping avoids np.memmap's per-operation overhead
+            fields[name] = np.asarray(array)
+        fields['feature_dtype'] = FEATURE_DTYPES[fields['feature_dtype']]
+        compiled = cls(**fields)
+        compiled.metadata = metadata
+        return compiled
+
+    def transform(self, records: List[Mapping[str, Any]]) -> np.ndarray:
+        """Encode lead records, or a DataFrame of them, into the float32 matrix seen by the trees."""
+        n = len(records)
+        X = np.zeros((n, self.n_features), dtype=np.float64)
+        is_frame = hasattr(records, 'columns')
+
+        if self.numerical_features:
+            if is_frame:
+                numeric = records[self.numerical_features].to_numpy(dtype=np.float64)
+            else:
+                numeric = np.array(
+                    [[record[name] for name in self.numerical_features] for record in records],
+                    dtype=np.float64
+                ).reshape(n, len(self.numerical_features))
+            stop = self.numerical_offset + len(self.numerical_features)
+            X[:, self.numerical_offset:stop] = (numeric - self.means) / self.scales
+
+        rows = np.arange(n)
+        for j, (name, table) in enumerate(zip(self.categorical_features, self.category_tables)):
+            if is_frame:
+                columns = records[name].map(table).fillna(-1).to_numpy(dtype=np.intp)
+            else:
+                columns = np.fromiter((table.get(record[name], -1) for record in records), dtype=np.intp, count=n)
+            known = columns >= 0
+            if self.categorical_columns is None:
+                X[rows[known], columns[known]] = 1.0
+            else:
+                # Ordinal codes; unknown categories are missing values
+                X[:, self.categorical_columns[j]] = np.where(known, columns, np.nan)
+
+        # sklearn's GradientBoosting trees compare float32 features, HistGradientBoosting float64
+        return X.astype(self.feature_dtype, copy=False)
+
+    def decision_function(self, records: List[Mapping[str, Any]]) -> np.ndarray:
+        """Return the raw log-odds for each record."""
+        return self.decision_function_transformed(self.transform(records))
+
+    def decision_function_transformed(self, X: np.ndarray) -> np.ndarray:
+        """Return the raw log-odds for each row of a matrix produced by ``transform``."""
+        rows = np.arange(X.shape[0])[:, None]
+        trees = self._tree_index
+        node = np.zeros((X.shape[0], self.n_trees), dtype=np.intp)
+
+        # Leaves point at themselves, so every tree can take max_depth steps
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[trees, node]]
+            go_left = x <= self.threshold[trees, node]
+            if self.missing_left is not None:
+                missing = np.isnan(x)
+                go_left = np.where(missing, self.missing_left[trees, node], go_left)
+                if self.category_left is not None:
+                    categorical = self.is_categorical[trees, node] & ~missing
+                    codes = np.where(categorical, x, 0).astype(np.intp)
+                    go_left = np.where(categorical, self.category_left[trees, node, codes], go_left)
+            node = np.where(go_left, self.children_left[trees, node], self.children_right[trees, node])
+
+        leaf_values = self.value[trees, node].sum(axis=1, dtype=np.float64)
+        return self.init_score + self.learning_rate * leaf_values
+
+    def predict_proba(self, records: List[Mapping[str, Any]]) -> np.ndarray:
+        """Return ``(n, 2)`` class probabilities, matching ``pipeline.predict_proba``."""
+        return self.predict_proba_transformed(self.transform(records))
+
+    def predict_proba_transformed(self, X: np.ndarray) -> np.ndarray:
+        """Return ``(n, 2)`` class probabilities for a matrix produced by ``transform``."""
+        positive = 1.0 / (1.0 + np.exp(-self.decision_function_transformed(X)))
+        return np.column_stack([1.0 - positive, positive])
+
+def _compile_preprocessor(preprocessor) -> Dict[str, Any]:
+    from sklearn.compose import ColumnTransformer
+    from sklearn.preprocessing import FunctionTransformer, OneHotEncoder, OrdinalEncoder, StandardScaler
+
+    if not isinstance(preprocessor, ColumnTransformer):
+        raise CompilationError(f"unsupported preprocessor {type(preprocessor).__name__}")
+    if getattr(preprocessor, 'sparse_output_', False):
+        raise CompilationError("sparse ColumnTransformer output is not supported")
+
+    compiled = {
+        'numerical_features': [],
+        'numerical_offset': 0,
+        'means': None,
+        'scales': None,
+        'categorical_features': [],
+        'category_tables': [],
+        'categorical_columns': None,
+    }
+    offset = 0
+    for name, transformer, columns in preprocessor.transformers_:
+        if transformer == 'drop' or len(columns) == 0:
+            continue
+        if isinstance(transformer, StandardScaler):
+            if compiled['numerical_features']:
+                raise CompilationError("only one StandardScaler is supported")
+            n_columns = len(columns)
+            compiled['numerical_features'] = list(columns)
+            compiled['numerical_offset'] = offset
+            compiled['means'] = (transformer.mean_ if transformer.mean_ is not None
+                                 else np.zeros(n_columns)).astype(np.float64)
+            compiled['scales'] = (transformer.scale_ if transformer.scale_ is not None
+                                  else np.ones(n_columns)).astype(np.float64)
+            offset += n_columns
+        # Fitted ColumnTransformers hold 'passthrough' as an identity FunctionTransformer
+        elif transformer == 'passthrough' or (isinstance(transformer, FunctionTransformer)
+                                              and transformer.func is None):
+            if compiled['numerical_features']:
+                raise CompilationError("only one numerical transformer is supported")
+            n_columns = len(columns)
+            compiled['numerical_features'] = list(columns)
+            compiled['numerical_offset'] = offset
+            compiled['means'] = np.zeros(n_columns)
+            compiled['scales'] = np.ones(n_columns)
+            offset += n_columns
+        elif isinstance(transformer, OrdinalEncoder):
+            if transformer.handle_unknown != 'use_encoded_value' or not np.isnan(transformer.unknown_value):
+                raise CompilationError("OrdinalEncoder must encode unknown categories as NaN")
+            if compiled['categorical_features']:
+                raise CompilationError("only one categorical encoder is supported")
+            compiled['categorical_columns'] = []
+            for column, categories in zip(columns, transformer.categories_):
+                compiled['categorical_features'].append(column)
+                compiled['category_tables'].append({category: i for i, category in enumerate(categories.tolist())})
+                compiled['categorical_columns'].append(offset)
+                offset += 1
+        elif isinstance(transformer, OneHotEncoder):
+            if transformer.drop is not None:
+                raise CompilationError("OneHotEncoder with drop is not supported")
+            if compiled['categorical_columns'] is not None:
+                raise CompilationError("only one categorical encoder is supported")
+            if transformer.handle_unknown != 'ignore':
+                raise CompilationError("OneHotEncoder must use handle_unknown='ignore'")
+            if any(getattr(transformer, 'infrequent_categories_', None) or []):
+                raise CompilationError("infrequent category grouping is not supported")
+            for column, categories in zip(columns, transformer.categories_):
+                compiled['categorical_features'].append(column)
+                compiled['category_tables'].append(
+                    {category: offset + i for i, category in enumerate(categories.tolist())}
+                )
+                offset += len(categories)
+        else:
+            raise CompilationError(f"unsupported transformer {name!r} ({type(transformer).__name__})")
+
+    compiled['n_features'] = offset
+    return compiled
+
+def _round_down_float32(threshold: np.ndarray) -> np.ndarray:
+    """
+    Cast thresholds to float32 without changing any float32 comparison.
+
+    For a float32 feature x, ``x <= t`` is equivalent to ``x <= r`` where r
+    is the largest float32 not above t, so rounding down keeps every split
+    decision identical to sklearn's float64 thresholds.
+    """
+    rounded = threshold.astype(np.float32)
+    too_high = rounded.astype(np.float64) > threshold
+    rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+    return rounded
+
+def _compile_hist_classifier(classifier) -> Dict[str, Any]:
+    if classifier.n_trees_per_iteration_ != 1:
+        raise CompilationError("only binary classifiers are supported")
+
+    predictors = [iteration[0] for iteration in classifier._predictors]
+    n_trees = len(predictors)
+    max_nodes = max(len(predictor.nodes) for predictor in predictors)
+    n_codes = 256
+    code_bits = np.arange(n_codes)
+
+    # Since sklearn 1.4 the classifier moves categorical columns first and
+    # re-encodes them; map tree feature indices and category codes back to
+    # the columns and codes produced by the pipeline's preprocessor
+    feature_map = np.arange(classifier.n_features_in_)
+    inner_codes = {}
+    internal = getattr(classifier, '_preprocessor', None)
+    if internal is not None:
+        order = []
+        for _, transformer, mask in internal.transformers_:
+            if isinstance(transformer, str):
+                continue
+            columns = np.flatnonzero(mask) if np.asarray(mask).dtype == bool else np.asarray(mask)
+            if hasattr(transformer, 'categories_'):
+                for column, categories in zip(columns, transformer.categories_):
+                    # Codes unseen in training are missing values inside the classifier
+                    table = np.full(n_codes, -1, dtype=np.intp)
+                    known = categories[~np.isnan(categories)].astype(np.intp)
+                    table[known] = np.arange(len(known))
+                    inner_codes[int(column)] = table
+            order.extend(columns.tolist())
+        feature_map = np.array(order)
+
+    feature = np.zeros((n_trees, max_nodes), dtype=np.int32)
+    threshold = np.zeros((n_trees, max_nodes), dtype=np.float64)
+    children_left = np.tile(np.arange(max_nodes, dtype=np.int32), (n_trees, 1))
+    children_right = children_left.copy()
+    value = np.zeros((n_trees, max_nodes), dtype=np.float64)
+    missing_left = np.zeros((n_trees, max_nodes), dtype=bool)
+    is_categorical = np.zeros((n_trees, max_nodes), dtype=bool)
+    category_left = np.zeros((n_trees, max_nodes, n_codes), dtype=bool)
+
+    for i, predictor in enumerate(predictors):
+        nodes = predictor.nodes
+        count = len(nodes)
+        split = np.nonzero(~nodes['is_leaf'].astype(bool))[0]
+        feature[i, split] = feature_map[nodes['feature_idx'][split]]
+        threshold[i, split] = nodes['num_threshold'][split]
+        children_left[i, split] = nodes['left'][split]
+        children_right[i, split] = nodes['right'][split]
+        missing_left[i, :count] = nodes['missing_go_to_left'].astype(bool)
+        value[i, :count] = nodes['value']
+
+        categorical = split[nodes['is_categorical'][split].astype(bool)]
+        if len(categorical):
+            # Bit c of a node's raw bitset is set when category code c goes left
+            bitsets = predictor.raw_left_cat_bitsets[nodes['bitset_idx'][categorical]]
+            words = bitsets[:, code_bits // 32].astype(np.int64)
+            goes_left = (words >> (code_bits % 32)) & 1 == 1
+            is_categorical[i, categorical] = True
+            for node, left in zip(categorical.tolist(), goes_left):
+                table = inner_codes.get(int(feature[i, node]))
+                if table is None:
+                    category_left[i, node] = left
+                else:
+                    category_left[i, node] = np.where(table >= 0, left[table], missing_left[i, node])
+
+    has_categorical = bool(is_categorical.any())
+    return {
+        'init_score': float(np.ravel(classifier._baseline_prediction)[0]),
+        # Leaf values already include the learning rate
+        'learning_rate': 1.0,
+        'feature': feature,
+        'threshold': threshold,
+        'children_left': children_left,
+        'children_right': children_right,
+        'value': value,
+        'max_depth': max(int(predictor.nodes['depth'].max()) for predictor in predictors),
+        'missing_left': missing_left,
+        'is_categorical': is_categorical if has_categorical else None,
+        'category_left': category_left if has_categorical else None,
+        'feature_dtype': np.float64,
+    }
+
+def _compile_classifier(classifier) -> Dict[str, Any]:
+    from sklearn.ensemble import GradientBoostingClassifier, HistGradientBoostingClassifier
+
+    if isinstance(classifier, HistGradientBoostingClassifier):
+        return _compile_hist_classifier(classifier)
+    if not isinstance(classifier, GradientBoostingClassifier):
+        raise CompilationError(f"unsupported classifier {type(classifier).__name__}")
+    if classifier.estimators_.shape[1] != 1:
+        raise CompilationError("only binary classifiers are supported")
+    if classifier.loss not in ('log_loss', 'deviance'):
+        raise CompilationError(f"unsupported loss {classifier.loss!r}")
+
+    trees = [estimator.tree_ for estimator in classifier.estimators_[:, 0]]
+    n_trees = len(trees)
+    max_nodes = max(tree.node_count for tree in trees)
+
+    feature = np.zeros((n_trees, max_nodes), dtype=np.int32)
+    threshold = np.zeros((n_trees, max_nodes), dtype=np.float32)
+    children_left = np.tile(np.arange(max_nodes, dtype=np.int32), (n_trees, 1))
+    children_right = children_left.copy()
+    value = np.zeros((n_trees, max_nodes), dtype=np.float32)
+
+    for i, tree in enumerate(trees):
+        count = tree.node_count
+        split = tree.children_left != -1
+        nodes = np.nonzero(split)[0]
+        feature[i, nodes] = tree.feature[nodes]
+        threshold[i, nodes] = _round_down_float32(tree.threshold[nodes])
+        children_left[i, nodes] = tree.children_left[nodes]
+        children_right[i, nodes] = tree.children_right[nodes]
+        value[i, :count] = tree.value[:, 0, 0]
+
+    if classifier.init_ == 'zero':
+        init_score = 0.0
+    else:
+        init_score = float(classifier._raw_predict_init(np.zeros((1, classifier.n_features_in_)))[0, 0])
+
+    return {
+        'init_score': init_score,
+        'learning_rate': float(classifier.learning_rate),
+        'feature': feature,
+        'threshold': threshold,
+        'children_left': children_left,
+        'children_right': children_right,
+        'value': value,
+        'max_depth': max(tree.max_depth for tree in trees),
+    }
+
+def _sample_records(compiled: CompiledModel, n_samples: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Draw synthetic records spanning the split thresholds of every numerical feature for self-checks."""
+    rng = np.random.default_rng(seed)
+    records = [{} for _ in range(n_samples)]
+    split = compiled.children_left != np.arange(compiled.children_left.shape[1])
+    for i, name in enumerate(compiled.numerical_features):
+        used = compiled.threshold[split & (compiled.feature == compiled.numerical_offset + i)]
+        if len(used):
+            # Thresholds are in transformed units; map them back to raw values
+            low, high = used.min() * compiled.scales[i] + compiled.means[i], used.max() * compiled.scales[i] + compiled.means[i]
+            margin = 0.1 * (high - low) + 1
+            values = rng.uniform(low - margin, high + margin, n_samples)
+        else:
+            values = compiled.means[i] + compiled.scales[i] * rng.normal(0, 1.5, n_samples)
+        for record, v in zip(records, np.round(values).tolist()):
+            record[name] = v
+    for name, table in zip(compiled.categorical_features, compiled.category_tables):
+        categories = list(table)
+        for record, j in zip(records, rng.integers(0, len(categories), n_samples).tolist()):
+            record[name] = categories[j]
+    return records
+
+def compile_pipeline(pipeline, check_samples: int = 256,
+                     tolerance: float = PROBABILITY_TOLERANCE) -> CompiledModel:
+    """
+    Flatten a fitted ``preprocessor -> GradientBoostingClassifier`` or
+    ``preprocessor -> HistGradientBoostingClassifier`` pipeline.
+
+    Args:
+        pipeline: The fitted sklearn Pipeline saved by train_model.py
+        check_samples: Number of synthetic records used to verify the result
+            against ``pipeline.predict_proba`` (0 disables the check)
+        tolerance: Largest allowed absolute difference in probability
+
+    Returns:
+        A CompiledModel producing the same probabilities as the pipeline
+
+    Raises:
+        CompilationError: If the pipeline uses unsupported steps or the
+            compiled probabilities drift beyond the tolerance
+    """
+    steps = getattr(pipeline, 'named_steps', None)
+    if steps is None or len(pipeline.steps) != 2:
+        raise CompilationError("expected a two-step preprocessor/classifier Pipeline")
+    preprocessor, classifier = (step for _, step in pipeline.steps)
+
+    preprocessing = _compile_preprocessor(preprocessor)
+    trees = _compile_classifier(classifier)
+    if trees.get('category_left') is not None:
+        if preprocessing['categorical_columns'] is None:
+            raise CompilationError("categorical splits need an OrdinalEncoder")
+        # Only codes of known categories reach the trees; unknown ones are missing values
+        n_codes = max(len(table) for table in preprocessing['category_tables'])
+        trees['category_left'] = np.ascontiguousarray(trees['category_left'][:, :, :n_codes])
+    compiled = CompiledModel(**preprocessing, **trees, classifier=type(classifier).__name__)
+    if compiled.n_features != classifier.n_features_in_:
+        raise CompilationError(
+            f"preprocessor produces {compiled.n_features} features, classifier expects {classifier.n_features_in_}"
+        )
+
+    if check_samples:
+        import pandas as pd
+        records = _sample_records(compiled, check_samples)
+        expected = pipeline.predict_proba(pd.DataFrame(records))[:, 1]
+        difference = float(np.max(np.abs(compiled.predict_proba(records)[:, 1] - expected)))
+        if difference > tolerance:
+            raise CompilationError(f"compiled probabilities differ by {difference:.2e} (tolerance {tolerance:.0e})")
+
+    return compiled
@@ -0,0 +1,95 @@
+import re
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+# What /score does with a lead whose email or phone number is already stored
+DEDUP_POLICIES = ('append', 'replace', 'max')
+
+_NON_DIGITS = re.compile(r'\D')
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+def normalize_phone(phone_number: str) -> str:
+    """Digits only, so +91-9876543210 and 919876543210 are the same number."""
+    return _NON_DIGITS.sub('', phone_number)
+
+class ContactIndex:
+    """
+    Hash index from normalized email and phone number to lead ids.
+
+    A key maps to a single lead id while it is unique, and to a list of
+    ids (oldest first) once several leads share it, so an index over
+    deduplicated leads holds no lists at all. Lookups are dict lookups,
+    independent of the number of stored leads.
+    """
+
+    def __init__(self):
+        self._emails: Dict[str, Union[int, List[int]]] = {}
+        self._phones: Dict[str, Union[int, List[int]]] = {}
+
+    @staticmethod
+    def _add(index: Dict[str, Union[int, List[int]]], key: str, lead_id: int):
+        ids = index.get(key)
+        if ids is None:
+            index[key] = lead_id
+        elif isinstance(ids, int):
+            index[key] = [ids, lead_id]
+        else:
+            ids.append(lead_id)
+
+    @staticmethod
+    def _remove(index: Dict[str, Union[int, List[int]]], key: str, lead_id: int):
+        ids = index.get(key)
+        if ids == lead_id:
+            del index[key]
+        elif isinstance(ids, list):
+            ids.remove(lead_id)
+            if len(ids) == 1:
+                index[key] = ids[0]
+
+    @staticmethod
+    def _ids(index: Dict[str, Union[int, List[int]]], key: str) -> List[int]:
+        ids = index.get(key)
+        if ids is None:
+            return []
+        return [ids] if isinstance(ids, int) else list(ids)
+
+    def add(self, lead_id: int, email: str, phone_number: str):
+        self._add(self._emails, normalize_email(email), lead_id)
+        self._add(self._phones, normalize_phone(phone_number), lead_id)
+
+    def remove(self, lead_id: int, email: str, phone_number: str):
+        self._remove(self._emails, normalize_email(email), lead_id)
+        self._remove(self._phones, normalize_phone(phone_number), lead_id)
+
+    def add_many(self, lead_ids: Iterable[int], emails: Iterable[str], phone_numbers: Iterable[str]):
+        for lead_id, email, phone_number in zip(lead_ids, emails, phone_numbers):
+            self.add(lead_id, email, phone_number)
+
+    @staticmethod
+    def _newest(index: Dict[str, Union[int, List[int]]], key: str) -> Optional[int]:
+        ids = index.get(key)
+        return ids if ids is None or isinstance(ids, int) else ids[-1]
+
+    def match(self, email: str, phone_number: str) -> Optional[int]:
+        """The newest lead with this email or, failing that, this phone number."""
+        by_email, by_phone = self.match_each(email, phone_number)
+        return by_email if by_email is not None else by_phone
+
+    def match_each(self, email: str, phone_number: str) -> Tuple[Optional[int], Optional[int]]:
+        """The newest lead with this email and the newest lead with this phone number."""
+        return (self._newest(self._emails, normalize_email(email)),
+                self._newest(self._phones, normalize_phone(phone_number)))
+
+    def find(self, email: Optional[str] = None, phone_number: Optional[str] = None) -> List[int]:
+        """Ids of the leads with this email or this phone number, in ascending order."""
+        ids = set()
+        if email is not None:
+            ids.update(self._ids(self._emails, normalize_email(email)))
+        if phone_number is not None:
+            ids.update(self._ids(self._phones, normalize_phone(phone_number)))
+        return sorted(ids)
+
+    def clear(self):
+        self._emails = {}
+        self._phones = {}
@@ -0,0 +1,105 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Dict, Iterator, Tuple
+
+import numpy as np
+
+from lead_store import CATEGORICAL_COLUMNS, LEAD_FIELDS, NUMERIC_COLUMNS, STRING_COLUMNS, LeadStore
+
+EXPORT_FORMATS = ('ndjson', 'csv', 'arrow')
+
+# Content type and file extension of each export format
+MEDIA_TYPES = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+}
+
+# Rows read from the store and encoded per chunk
+EXPORT_CHUNK_SIZE = 10000
+
+def iter_chunks(start: int, stop: int, chunk_size: int) -> Iterator[Tuple[int, int]]:
+    for begin in range(start, stop, chunk_size):
+        yield begin, min(begin + chunk_size, stop)
+
+def encode_ndjson(store: LeadStore, start: int, stop: int) -> bytes:
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    return ''.join(dumps(lead) + '\n' for lead in store.slice(start, stop)).encode('utf-8')
+
+def encode_csv(store: LeadStore, start: int, stop: int) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    columns = []
+    for name in LEAD_FIELDS:
+        values = store.column(name, start, stop)
+        columns.append(values.tolist() if isinstance(values, np.ndarray) else values)
+    writer.writerows(zip(*columns))
+    return buffer.getvalue().encode('utf-8')
+
+def arrow_schema():
+    import pyarrow as pa
+
+    fields = [pa.field('lead_id', pa.int64(), nullable=False)]
+    fields += [pa.field(name, pa.string(), nullable=False) for name in STRING_COLUMNS]
+    fields += [pa.field(name, pa.from_numpy_dtype(dtype), nullable=False) for name, dtype in NUMERIC_COLUMNS.items()]
+    fields += [pa.field(name, pa.dictionary(pa.uint8(), pa.string()), nullable=False) for name in CATEGORICAL_COLUMNS]
+    return pa.schema(fields)
+
+def arrow_batch(store: LeadStore, schema, start: int, stop: int):
+    """Build a record batch straight from the store buffers, without per-row Python objects."""
+    import pyarrow as pa
+
+    n = stop - start
+    columns = [pa.array(np.arange(start + 1, stop + 1, dtype=np.int64))]
+    for name in STRING_COLUMNS:
+        data, offsets = store.strings(name, start, stop)
+        columns.append(pa.StringArray.from_buffers(
+            n, pa.py_buffer(offsets.astype(np.int32)), pa.py_buffer(data)
+        ))
+    for name in NUMERIC_COLUMNS:
+        columns.append(pa.array(store.column(name, start, stop)))
+    for name in CATEGORICAL_COLUMNS:
+        columns.append(pa.DictionaryArray.from_arrays(
+            pa.array(store.codes(name)[start:stop]), pa.array(store.categories(name), pa.string())
+        ))
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+async def iter_export(store: LeadStore, export_format: str, start: int, stop: int,
+                      chunk_size: int = EXPORT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """
+    Encode store rows ``start:stop`` in ``export_format``, one chunk at a time.
+
+    Only one chunk of rows is materialized at once, so memory use does
+    not depend on how many leads are exported. This is an async
+    generator so chunks are read on the event loop thread, in between
+    the requests that append to the store.
+    """
+    if export_format == 'ndjson':
+        for begin, end in iter_chunks(start, stop, chunk_size):
+            yield encode_ndjson(store, begin, end)
+    elif export_format == 'csv':
+        yield (','.join(LEAD_FIELDS) + '\n').encode('utf-8')
+        for begin, end in iter_chunks(start, stop, chunk_size):
+            yield encode_csv(store, begin, end)
+    else:
+        import pyarrow as pa
+
+        schema = arrow_schema()
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            for begin, end in iter_chunks(start, stop, chunk_size):
+                writer.write_batch(arrow_batch(store, schema, begin, end))
+                yield sink.getvalue()
+                sink.seek(0)
+                sink.truncate()
+        # End-of-stream marker written on close
+        yield sink.getvalue()
+
+def export_headers(export_format: str, last_lead_id: int) -> Dict[str, str]:
+    _, extension = MEDIA_TYPES[export_format]
+    return {
+        "Content-Disposition": f'attachment; filename="leads.{extension}"',
+        # Pass as since_lead_id on the next incremental pull
+        "X-Last-Lead-Id": str(last_lead_id),
+    }
@@ -1,208 +1,308 @@
 import pandas as pd
 import numpy as np
 from faker import Faker
-import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import argparse
 import os
-
-# Set random seed for reproducibility
-np.random.seed(42)
-random.seed(42)
-fake = Faker()
-Faker.seed(42)
+import string
+import time
 
 # Number of samples
 n_samples = 10000
 
-def generate_synthetic_data():
-    """Generate synthetic lead data with meaningful relationships and patterns."""
-    
-    # Initialize data dictionary
-    data = {
-        'phone_number': [],
-        'email': [],
-        'credit_score': [],
-        'age_group': [],
-        'family_background': [],
-        'income': [],
-        'property_type': [],
-        'budget': [],
-        'location': [],
-        'previous_inquiries': [],
-        'time_on_market': [],  # Days property has been on market
-        'response_time_minutes': [],  # How quickly they respond to messages
-        'comments': [],
-        'high_intent': []  # Target variable (1 for high intent, 0 for low intent)
+# Rows generated per chunk; each chunk has its own seed derived from the run seed
+DEFAULT_CHUNK_SIZE = 100000
+
+DEFAULT_SEED = 42
+
+DEFAULT_OUTPUT = '../data/leads_data.csv'
+
+# Define possible values for categorical variables
+age_groups = ['18-25', '26-35', '36-50', '51+']
+age_group_weights = [0.15, 0.40, 0.30, 0.15]  # Younger adults more likely to be looking
+
+family_backgrounds = ['Single', 'Married', 'Married with Kids', 'Divorced', 'Widowed']
+family_weights = [0.30, 0.25, 0.30, 0.10, 0.05]
+
+property_types = ['Apartment', 'House', 'Villa', 'Penthouse', 'Studio']
+property_weights = [0.40, 0.30, 0.10, 0.05, 0.15]
+
+locations = ['Urban', 'Suburban', 'Rural']
+location_weights = [0.50, 0.40, 0.10]
+
+# Credit score offset above 300 (mean) and income multiplier (mean, std) per age group
+credit_means = np.array([200, 300, 350, 400])
+income_multipliers = np.array([[1.0, 0.2], [1.5, 0.3], [2.5, 0.5], [3.0, 0.7]])
+
+comment_templates = [
+    "Looking for a {property_type} in {location} area.",
+    "Need a {property_type} for my {family_background} family.",
+    "Interested in properties around {budget} budget.",
+    "Want to move within {timeline} months.",
+    "Require financing options for {property_type}.",
+    "Currently renting, want to buy a {property_type}.",
+    "Relocating to {location} area soon.",
+    "Investment opportunity in {location} area.",
+    "Need property with good schools nearby.",
+    "Looking for retirement home options."
+]
+
+# Add intent signals to some comments
+high_intent_signals = [
+    "urgent", "need immediately", "ready to purchase",
+    "pre-approved loan", "cash buyer", "looking to close quickly",
+    "very interested", "perfect match", "dream home", "must have"
+]
+
+low_intent_signals = [
+    "just browsing", "not sure yet", "might consider",
+    "too expensive", "not interested", "just checking",
+    "maybe next year", "not ready", "need to think", "too small"
+]
+
+# Faker user names and domains that emails are assembled from
+EMAIL_POOL_SIZE = 5000
+EMAIL_DOMAINS = ['example.com', 'example.org', 'example.net']
+
+_email_pools = {}
+
+def email_pool(seed):
+    """Build (once per process) the user name pool emails are drawn from."""
+    if seed not in _email_pools:
+        fake = Faker()
+        fake.seed_instance(seed)
+        _email_pools[seed] = np.array([fake.user_name() for _ in range(EMAIL_POOL_SIZE)], dtype=object)
+    return _email_pools[seed]
+
+def _choose(rng, values, weights, size):
+    """Draw category codes, and the values they stand for, with the given weights."""
+    codes = rng.choice(len(values), size=size, p=weights)
+    return codes, np.array(values, dtype=object)[codes]
+
+def _fill_template(template, fields, rows):
+    """Format one comment template for the given rows, column by column."""
+    text = np.full(len(rows), '', dtype=object)
+    for literal, name, _, _ in string.Formatter().parse(template):
+        text = text + literal
+        if name is not None:
+            text = text + fields[name][rows]
+    return text
+
+def generate_chunk(size, seed_sequence, pool_seed=DEFAULT_SEED, first_row=0):
+    """
+    Generate ``size`` synthetic leads, drawing every column at once with NumPy.
+
+    ``first_row`` is the position of the chunk's first lead in the whole
+    dataset; it goes into each email address, so emails never repeat.
+    """
+    rng = np.random.default_rng(seed_sequence)
+
+    # Generate basic contact info
+    phone = '+91-' + pd.Series(rng.integers(7000000000, 9999999999, size=size, endpoint=True)).astype(str)
+    pool = email_pool(pool_seed)
+    users = pool[rng.integers(len(pool), size=size)]
+    # Every address ends in its row number, so each lead is a distinct contact
+    suffixes = '.' + pd.Series(np.arange(first_row, first_row + size)).astype(str).to_numpy(dtype=object)
+    email = users + suffixes + '@' + np.array(EMAIL_DOMAINS, dtype=object)[rng.integers(len(EMAIL_DOMAINS), size=size)]
+
+    # Generate demographic info
+    age, age_group = _choose(rng, age_groups, age_group_weights, size)
+    family, family_background = _choose(rng, family_backgrounds, family_weights, size)
+
+    # Financial info with realistic patterns
+    # Credit score is higher for older age groups
+    credit_score = np.clip(np.trunc(300 + rng.normal(credit_means[age], 50)), 300, 850).astype(np.int64)
+
+    # Income is correlated with age and credit score
+    income_multiplier = rng.normal(income_multipliers[age, 0], income_multipliers[age, 1])
+    income_multiplier *= credit_score / 600
+    income = np.clip(np.trunc(100000 * income_multiplier), 100000, 1000000).astype(np.int64)
+
+    # Property preferences
+    prop, property_type = _choose(rng, property_types, property_weights, size)
+
+    # Budget is correlated with income (typically 3-7x annual income)
+    budget = np.trunc(income * rng.normal(5, 1, size=size)).astype(np.int64)
+
+    # Location preference
+    loc, location = _choose(rng, locations, location_weights, size)
+
+    # Behavioral features
+    previous_inquiries = rng.poisson(2, size=size)  # Most have 0-4 previous inquiries
+    time_on_market = np.maximum(1, np.trunc(rng.exponential(30, size=size))).astype(np.int64)  # Days
+    response_time_minutes = np.maximum(1, np.trunc(rng.exponential(60, size=size))).astype(np.int64)  # Minutes
+
+    # Determine intent (target variable)
+    # Factors that increase intent: higher income, faster response time, fewer days on market
+    intent_score = (
+        (income / 1000000) * 30  # 0-30 points
+        + (credit_score - 300) / 550 * 20  # 0-20 points
+        + np.maximum(0, 10 - previous_inquiries) * 2  # 0-20 points (fewer inquiries is better)
+        + np.maximum(0, 10 - (response_time_minutes / 10)) * 1.5  # 0-15 points (faster response is better)
+        + np.maximum(0, 10 - (time_on_market / 10)) * 1.5  # 0-15 points (newer listings get more interest)
+    )
+    intent_score = np.clip(intent_score, 0, 100)
+
+    # Convert to binary target (threshold at 60)
+    high_intent = (intent_score > 60).astype(np.int64)
+
+    # Generate comments from the templates, one template's rows at a time
+    fields = {
+        'property_type': np.array([v.lower() for v in property_types], dtype=object)[prop],
+        'location': np.array([v.lower() for v in locations], dtype=object)[loc],
+        'family_background': np.array([v.lower() for v in family_backgrounds], dtype=object)[family],
+        'budget': pd.Series(budget).map('{:,}'.format).to_numpy(dtype=object),
+        'timeline': pd.Series(rng.integers(1, 13, size=size)).astype(str).to_numpy(dtype=object),
     }
-    
-    # Define possible values for categorical variables
-    age_groups = ['18-25', '26-35', '36-50', '51+']
-    age_group_weights = [0.15, 0.40, 0.30, 0.15]  # Younger adults more likely to be looking
-    
-    family_backgrounds = ['Single', 'Married', 'Married with Kids', 'Divorced', 'Widowed']
-    family_weights = [0.30, 0.25, 0.30, 0.10, 0.05]
-    
-    property_types = ['Apartment', 'House', 'Villa', 'Penthouse', 'Studio']
-    property_weights = [0.40, 0.30, 0.10, 0.05, 0.15]
-    
-    locations = ['Urban', 'Suburban', 'Rural']
-    location_weights = [0.50, 0.40, 0.10]
-    
-    # Generate data
-    for _ in range(n_samples):
-        # Generate basic contact info
-        phone = f"+91-{random.randint(7000000000, 9999999999)}"
-        email = fake.email()
-        
-        # Generate demographic info
-        age_group = random.choices(age_groups, weights=age_group_weights)[0]
-        family_background = random.choices(family_backgrounds, weights=family_weights)[0]
-        
-        # Financial info with realistic patterns
-        # Credit score is higher for older age groups
-        base_credit = 300
-        if age_group == '18-25':
-            credit_score = base_credit + np.random.normal(200, 50)
-        elif age_group == '26-35':
-            credit_score = base_credit + np.random.normal(300, 50)
-        elif age_group == '36-50':
-            credit_score = base_credit + np.random.normal(350, 50)
-        else:  # 51+
-            credit_score = base_credit + np.random.normal(400, 50)
-        
-        credit_score = max(300, min(850, int(credit_score)))
-        
-        # Income is correlated with age and credit score
-        base_income = 100000
-        income_multiplier = 1.0
-        
-        if age_group == '18-25':
-            income_multiplier = np.random.normal(1.0, 0.2)
-        elif age_group == '26-35':
-            income_multiplier = np.random.normal(1.5, 0.3)
-        elif age_group == '36-50':
-            income_multiplier = np.random.normal(2.5, 0.5)
-        else:  # 51+
-            income_multiplier = np.random.normal(3.0, 0.7)
-            
-        # Credit score also affects income multiplier
-        income_multiplier *= (credit_score / 600)
-        
-        income = int(base_income * income_multiplier)
-        income = max(100000, min(1000000, income))
-        
-        # Property preferences
-        property_type = random.choices(property_types, weights=property_weights)[0]
-        
-        # Budget is correlated with income
-        budget_ratio = np.random.normal(5, 1)  # Budget is typically 3-7x annual income
-        budget = int(income * budget_ratio)
-        
-        # Location preference
-        location = random.choices(locations, weights=location_weights)[0]
-        
-        # Behavioral features
-        previous_inquiries = np.random.poisson(2)  # Most have 0-4 previous inquiries
-        
-        # Time on market - newer listings get more interest
-        time_on_market = max(1, int(np.random.exponential(30)))  # Days
-        
-        # Response time - faster responders are more serious buyers
-        response_time_minutes = max(1, int(np.random.exponential(60)))  # Minutes
-        
-        # Generate comments with intent signals
-        comment_templates = [
-            "Looking for a {property_type} in {location} area.",
-            "Need a {property_type} for my {family_background} family.",
-            "Interested in properties around {budget} budget.",
-            "Want to move within {timeline} months.",
-            "Require financing options for {property_type}.",
-            "Currently renting, want to buy a {property_type}.",
-            "Relocating to {location} area soon.",
-            "Investment opportunity in {location} area.",
-            "Need property with good schools nearby.",
-            "Looking for retirement home options."
-        ]
-        
-        # Add intent signals to some comments
-        high_intent_signals = [
-            "urgent", "need immediately", "ready to purchase", 
-            "pre-approved loan", "cash buyer", "looking to close quickly",
-            "very interested", "perfect match", "dream home", "must have"
-        ]
-        
-        low_intent_signals = [
-            "just browsing", "not sure yet", "might consider", 
-            "too expensive", "not interested", "just checking",
-            "maybe next year", "not ready", "need to think", "too small"
-        ]
-        
-        # Determine intent (target variable)
-        # Factors that increase intent: higher income, faster response time, fewer days on market
-        intent_score = 0
-        
-        # Financial factors
-        intent_score += (income / 1000000) * 30  # 0-30 points
-        intent_score += (credit_score - 300) / 550 * 20  # 0-20 points
-        
-        # Behavioral factors
-        intent_score += max(0, 10 - previous_inquiries) * 2  # 0-20 points (fewer inquiries is better)
-        intent_score += max(0, 10 - (response_time_minutes / 10)) * 1.5  # 0-15 points (faster response is better)
-        intent_score += max(0, 10 - (time_on_market / 10)) * 1.5  # 0-15 points (newer listings get more interest)
-        
-        # Normalize to 0-100
-        intent_score = min(100, max(0, intent_score))
-        
-        # Convert to binary target (threshold at 60)
-        high_intent = 1 if intent_score > 60 else 0
-        
-        # Generate comment
-        timeline = random.randint(1, 12)
-        comment = random.choice(comment_templates).format(
-            property_type=property_type.lower(),
-            location=location.lower(),
-            family_background=family_background.lower(),
-            budget=f"{budget:,}",
-            timeline=timeline
-        )
-        
-        # Add intent signals to comments based on the target
-        if high_intent == 1 and random.random() < 0.7:  # 70% of high intent leads have explicit signals
-            comment += f" {random.choice(high_intent_signals).capitalize()}."
-        elif high_intent == 0 and random.random() < 0.5:  # 50% of low intent leads have explicit signals
-            comment += f" {random.choice(low_intent_signals).capitalize()}."
-        
-        # Add data to dictionary
-        data['phone_number'].append(phone)
-        data['email'].append(email)
-        data['credit_score'].append(credit_score)
-        data['age_group'].append(age_group)
-        data['family_background'].append(family_background)
-        data['income'].append(income)
-        data['property_type'].append(property_type)
-        data['budget'].append(budget)
-        data['location'].append(location)
-        data['previous_inquiries'].append(previous_inquiries)
-        data['time_on_market'].append(time_on_market)
-        data['response_time_minutes'].append(response_time_minutes)
-        data['comments'].append(comment)
-        data['high_intent'].append(high_intent)
-    
-    # Convert to DataFrame
-    df = pd.DataFrame(data)
-    
-    # Save to CSV
-    os.makedirs('../data', exist_ok=True)
-    df.to_csv('../data/leads_data.csv', index=False)
-    
-    print(f"Generated {n_samples} synthetic lead records and saved to '../data/leads_data.csv'")
-    
+    template = rng.integers(len(comment_templates), size=size)
+    comments = np.empty(size, dtype=object)
+    for index, text in enumerate(comment_templates):
+        rows = np.flatnonzero(template == index)
+        comments[rows] = _fill_template(text, fields, rows)
+
+    # Add intent signals to comments based on the target
+    signal = rng.integers(len(high_intent_signals), size=size)
+    explicit = rng.random(size)
+    high = (high_intent == 1) & (explicit < 0.7)  # 70% of high intent leads have explicit signals
+    low = (high_intent == 0) & (explicit < 0.5)  # 50% of low intent leads have explicit signals
+    comments[high] += ' ' + np.array([s.capitalize() + '.' for s in high_intent_signals], dtype=object)[signal[high]]
+    comments[low] += ' ' + np.array([s.capitalize() + '.' for s in low_intent_signals], dtype=object)[signal[low]]
+
+    return pd.DataFrame({
+        'phone_number': phone.to_numpy(dtype=object),
+        'email': email,
+        'credit_score': credit_score,
+        'age_group': age_group,
+        'family_background': family_background,
+        'income': income,
+        'property_type': property_type,
+        'budget': budget,
+        'location': location,
+        'previous_inquiries': previous_inquiries,
+        'time_on_market': time_on_market,
+        'response_time_minutes': response_time_minutes,
+        'comments': comments,
+        'high_intent': high_intent,
+    })
+
+def output_format(path):
+    return 'parquet' if path.endswith(('.parquet', '.pq')) else 'csv'
+
+def encode_chunk(size, seed_sequence, pool_seed, first_row, file_format, header):
+    """
+    Generate a chunk and encode it for the output file, along with its statistics.
+
+    Encoding happens here, in the worker, so the writing process only
+    appends bytes (CSV) or Arrow tables (Parquet) and does not limit
+    throughput.
+    """
+    df = generate_chunk(size, seed_sequence, pool_seed, first_row)
+    stats = (
+        int(df['high_intent'].sum()),
+        df['age_group'].value_counts(),
+        df['family_background'].value_counts(),
+    )
+    if file_format == 'csv':
+        return df.to_csv(index=False, header=header).encode('utf-8'), stats
+
+    import pyarrow as pa
+    return pa.Table.from_pandas(df, preserve_index=False), stats
+
+class ChunkWriter:
+    """Appends encoded chunks, in order, to one CSV or Parquet file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.format = output_format(path)
+        self._file = open(path, 'wb') if self.format == 'csv' else None
+        self._parquet = None
+
+    def write(self, payload):
+        if self.format == 'csv':
+            self._file.write(payload)
+        else:
+            import pyarrow.parquet as pq
+
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, payload.schema)
+            self._parquet.write_table(payload)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        if self._parquet is not None:
+            self._parquet.close()
+
+def generate_synthetic_data(rows=n_samples, chunk_size=DEFAULT_CHUNK_SIZE, seed=DEFAULT_SEED,
+                            workers=1, output_path=DEFAULT_OUTPUT):
+    """
+    Generate synthetic lead data with meaningful relationships and patterns.
+
+    Rows are generated in chunks of ``chunk_size``, each seeded from
+    ``seed`` and its chunk number, so the output is the same for any
+    number of workers. Chunks are written to ``output_path`` (CSV, or
+    Parquet for a .parquet file) as they complete, in order.
+    """
+    start = time.perf_counter()
+    begins = range(0, rows, chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(begins))
+    file_format = output_format(output_path)
+    tasks = [
+        (min(chunk_size, rows - begin), chunk_seed, seed, begin, file_format, index == 0)
+        for index, (begin, chunk_seed) in enumerate(zip(begins, seeds))
+    ]
+
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    writer = ChunkWriter(output_path)
+
+    high_intent = 0
+    age_counts = pd.Series(dtype=np.int64)
+    family_counts = pd.Series(dtype=np.int64)
+
+    def record(result):
+        nonlocal high_intent, age_counts, family_counts
+        payload, (chunk_high_intent, chunk_ages, chunk_families) = result
+        writer.write(payload)
+        high_intent += chunk_high_intent
+        age_counts = age_counts.add(chunk_ages, fill_value=0)
+        family_counts = family_counts.add(chunk_families, fill_value=0)
+
+    try:
+        if workers <= 1:
+            for task in tasks:
+                record(encode_chunk(*task))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # Keep a couple of chunks per worker in flight and write them back in order
+                futures = deque()
+                for task in tasks:
+                    futures.append(pool.submit(encode_chunk, *task))
+                    if len(futures) >= 2 * workers:
+                        record(futures.popleft().result())
+                while futures:
+                    record(futures.popleft().result())
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"Generated {rows} synthetic lead records and saved to '{output_path}' "
+          f"in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+
     # Print some statistics
     print("\nData Statistics:")
-    print(f"High Intent Leads: {df['high_intent'].sum()} ({df['high_intent'].mean()*100:.1f}%)")
-    print(f"Age Group Distribution: {df['age_group'].value_counts(normalize=True).to_dict()}")
-    print(f"Family Background Distribution: {df['family_background'].value_counts(normalize=True).to_dict()}")
-    
-    return df
+    print(f"High Intent Leads: {high_intent} ({high_intent / max(rows, 1) * 100:.1f}%)")
+    print(f"Age Group Distribution: {(age_counts / rows).sort_values(ascending=False).to_dict()}")
+    print(f"Family Background Distribution: {(family_counts / rows).sort_values(ascending=False).to_dict()}")
 
 if __name__ == "__main__":
-    generate_synthetic_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate synthetic lead data")
+    parser.add_argument("--rows", type=int, default=n_samples)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--workers", type=int, default=1, help="Processes generating chunks in parallel")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="CSV file, or Parquet for a .parquet path")
+    args = parser.parse_args()
+    generate_synthetic_data(args.rows, args.chunk_size, args.seed, args.workers, args.output)
@@ -0,0 +1,244 @@
+import asyncio
+import csv
+import json
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+# Content types accepted for each import format
+CONTENT_TYPES = {
+    'text/csv': 'csv',
+    'application/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+}
+
+# Most rejected rows kept per job; further rejections are only counted
+MAX_REJECTIONS = 1000
+
+# Longest CSV record or NDJSON line; an unbalanced quote otherwise swallows the rest of the file
+MAX_RECORD_BYTES = 1 << 20
+
+# The csv module's own limit (128 KB per field) would fail records that MAX_RECORD_BYTES allows
+csv.field_size_limit(max(csv.field_size_limit(), MAX_RECORD_BYTES))
+
+# Finished jobs kept for GET /leads/import/{job_id}
+MAX_JOBS = 100
+
+# A parsed row: its 1-based data row number and either the record or why it could not be parsed
+ParsedRow = Tuple[int, Union[Dict[str, Any], str]]
+
+def import_format_for(content_type: str) -> Optional[str]:
+    """Return the import format for a Content-Type header, or None if it is not supported."""
+    return CONTENT_TYPES.get(content_type.split(';', 1)[0].strip().lower())
+
+async def iter_lines(body: AsyncIterator[bytes]) -> AsyncIterator[Optional[bytes]]:
+    """
+    Split a streamed body into lines without holding more than one partial line.
+
+    A line longer than MAX_RECORD_BYTES is dropped as it streams in and
+    yielded as None, so a body without newlines cannot grow without limit.
+    """
+    pieces: List[bytes] = []
+    size = 0
+    oversized = False
+    async for data in body:
+        lines = data.split(b'\n')
+        if len(lines) > 1:
+            # The partial line held so far ends in this chunk
+            first = lines[0]
+            if oversized or size + len(first) > MAX_RECORD_BYTES:
+                yield None
+            else:
+                yield b''.join(pieces) + first if pieces else first
+            pieces, size, oversized = [], 0, False
+            for line in lines[1:-1]:
+                yield line if len(line) <= MAX_RECORD_BYTES else None
+        partial = lines[-1]
+        if partial and not oversized:
+            pieces.append(partial)
+            size += len(partial)
+            if size > MAX_RECORD_BYTES:
+                pieces, size, oversized = [], 0, True
+    if oversized:
+        yield None
+    elif pieces:
+        yield b''.join(pieces)
+
+def _decode(line: bytes) -> Optional[str]:
+    try:
+        return line.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return None
+
+async def iter_csv_records(body: AsyncIterator[bytes]) -> AsyncIterator[Optional[bytes]]:
+    """Join lines into CSV records, keeping newlines that fall inside quoted fields; None stands for an oversized line."""
+    record = b''
+    async for line in iter_lines(body):
+        if line is None:
+            if record.strip():
+                yield record
+            record = b''
+            yield None
+            continue
+        record = record + b'\n' + line if record else line
+        # Quotes inside a field are doubled, so an odd count means an open quoted field
+        if record.count(b'"') % 2 == 0 or len(record) > MAX_RECORD_BYTES:
+            if record.strip():
+                yield record
+            record = b''
+    if record.strip():
+        yield record
+
+def parse_csv_record(record: Optional[bytes]) -> Union[List[str], str]:
+    """The fields of one CSV record, or why it could not be parsed."""
+    if record is None or len(record) > MAX_RECORD_BYTES:
+        return f"Row is longer than {MAX_RECORD_BYTES} bytes"
+    if record.count(b'"') % 2:
+        return "Row has a quoted field that is never closed"
+    text = _decode(record)
+    if text is None:
+        return "Row is not valid UTF-8"
+    try:
+        # A reader per record, so a malformed one cannot run into the records after it
+        return next(csv.reader([text]), [])
+    except csv.Error as e:
+        return f"Invalid CSV: {e}"
+
+def parse_csv_chunk(header: List[str], records: List[Optional[bytes]], first_row: int) -> List[ParsedRow]:
+    rows = []
+    for row, record in enumerate(records, first_row):
+        values = parse_csv_record(record)
+        if isinstance(values, str):
+            rows.append((row, values))
+        elif len(values) != len(header):
+            rows.append((row, f"Row has {len(values)} fields; the header has {len(header)}"))
+        else:
+            rows.append((row, dict(zip(header, values))))
+    return rows
+
+def parse_ndjson_chunk(lines: List[Optional[bytes]], first_row: int) -> List[ParsedRow]:
+    rows = []
+    for row, line in enumerate(lines, first_row):
+        if line is None:
+            rows.append((row, f"Line is longer than {MAX_RECORD_BYTES} bytes"))
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            rows.append((row, f"Invalid JSON: {e}"))
+            continue
+        if isinstance(record, dict):
+            rows.append((row, record))
+        else:
+            rows.append((row, f"Line is a JSON {type(record).__name__}, not an object"))
+    return rows
+
+async def iter_import_chunks(body: AsyncIterator[bytes], import_format: str,
+                             chunk_size: int) -> AsyncIterator[List[ParsedRow]]:
+    """
+    Parse a streamed CSV or NDJSON body into chunks of at most ``chunk_size`` rows.
+
+    CSV bodies start with a header row naming the lead fields. Rows that
+    cannot be parsed are yielded with an error message instead of a
+    record, so they can be reported without stopping the import. Chunks
+    are parsed on a worker thread to keep the event loop serving requests.
+    """
+    if import_format == 'csv':
+        records = iter_csv_records(body)
+        header = None
+        async for record in records:
+            header = parse_csv_record(record)
+            break
+        if header is None or isinstance(header, str):
+            return
+        header = [name.strip() for name in header]
+        parse = lambda chunk, first_row: parse_csv_chunk(header, chunk, first_row)
+    else:
+        records = (line async for line in iter_lines(body) if line is None or line.strip())
+        parse = parse_ndjson_chunk
+
+    chunk: List[Optional[bytes]] = []
+    first_row = 1
+    async for record in records:
+        chunk.append(record)
+        if len(chunk) == chunk_size:
+            yield await asyncio.to_thread(parse, chunk, first_row)
+            first_row += len(chunk)
+            chunk = []
+    if chunk:
+        yield await asyncio.to_thread(parse, chunk, first_row)
+
+class ImportJob:
+    """Progress counters and rejected rows of one bulk import."""
+
+    def __init__(self, import_format: str):
+        self.job_id = uuid.uuid4().hex
+        self.format = import_format
+        self.status = 'running'
+        self.error: Optional[str] = None
+        self.bytes_read = 0
+        self.rows_read = 0
+        self.scored = 0
+        self.rejected = 0
+        self.rejections: List[Dict[str, Any]] = []
+        self.started = time.perf_counter()
+        self.elapsed: Optional[float] = None
+
+    def count_bytes(self, body: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """Wrap a body stream so the bytes read so far are counted."""
+        async def counted():
+            async for data in body:
+                self.bytes_read += len(data)
+                yield data
+        return counted()
+
+    def reject(self, row: int, errors: Iterable[str]):
+        self.rejected += 1
+        if len(self.rejections) < MAX_REJECTIONS:
+            self.rejections.append({"row": row, "errors": list(errors)})
+
+    def finish(self, error: Optional[str] = None):
+        self.status = 'failed' if error else 'completed'
+        self.error = error
+        self.elapsed = time.perf_counter() - self.started
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "format": self.format,
+            "bytes_read": self.bytes_read,
+            "rows_read": self.rows_read,
+            "scored": self.scored,
+            "rejected": self.rejected,
+            "rejections": self.rejections,
+            "elapsed_seconds": round(self.elapsed if self.elapsed is not None else time.perf_counter() - self.started, 3),
+            "error": self.error,
+        }
+
+class ImportJobs:
+    """Registry of running imports and the most recent finished ones."""
+
+    def __init__(self, max_jobs: int = MAX_JOBS):
+        self.max_jobs = max_jobs
+        self._jobs: 'OrderedDict[str, ImportJob]' = OrderedDict()
+
+    def create(self, import_format: str) -> ImportJob:
+        job = ImportJob(import_format)
+        self._jobs[job.job_id] = job
+        # Forget the oldest finished jobs; running ones are always kept
+        finished = [i for i, j in self._jobs.items() if j.status != 'running']
+        for job_id in finished[:max(0, len(self._jobs) - self.max_jobs)]:
+            del self._jobs[job_id]
+        return job
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[ImportJob]:
+        return list(self._jobs.values())
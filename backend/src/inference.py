@@ -0,0 +1,145 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+INFERENCE_BACKENDS = ('inline', 'thread', 'process')
+
+class InferenceQueueFull(Exception):
+    """Raised when more predictions are pending than the configured queue depth."""
+
+# Predictor held by each process-pool worker
+_worker_predict: Optional[Callable[[List[Dict[str, Any]]], np.ndarray]] = None
+
+def load_predictor(model_path: str, use_compiled: bool = True) -> Callable[[List[Dict[str, Any]]], np.ndarray]:
+    """
+    Load the saved pipeline and return a function from feature records to scores (0-100).
+
+    The compiled arrays saved next to an archived model are memory-mapped
+    when present, so every worker shares their pages and skips unpickling.
+    """
+    from compiled_model import CompilationError, CompiledModel, compile_pipeline
+    from model_registry import COMPILED_DIR
+
+    if use_compiled:
+        try:
+            compiled = CompiledModel.load(os.path.join(os.path.dirname(model_path), COMPILED_DIR))
+            return lambda records: compiled.predict_proba(records)[:, 1] * 100
+        except (OSError, ValueError, KeyError, CompilationError):
+            pass
+
+    import joblib
+    pipeline = joblib.load(model_path)
+    if use_compiled:
+        try:
+            compiled = compile_pipeline(pipeline)
+            return lambda records: compiled.predict_proba(records)[:, 1] * 100
+        except CompilationError:
+            pass
+
+    import pandas as pd
+    return lambda records: pipeline.predict_proba(pd.DataFrame(records))[:, 1] * 100
+
+def _init_worker(model_path: str, use_compiled: bool):
+    global _worker_predict
+    _worker_predict = load_predictor(model_path, use_compiled)
+
+def _predict_in_worker(records: List[Dict[str, Any]]) -> np.ndarray:
+    return _worker_predict(records)
+
+def _worker_ready() -> int:
+    return os.getpid()
+
+class InferenceExecutor:
+    """
+    Runs model predictions inline, on a thread pool or on a process pool.
+
+    ``inline`` calls the predictor on the event loop thread. ``thread``
+    hands each call to a thread pool so the event loop keeps serving
+    other requests. ``process`` gives every worker its own copy of the
+    model, loaded from ``model_path``. At most ``max_queue_depth``
+    predictions may be pending; further calls raise InferenceQueueFull.
+
+    ``run`` can be given the predictor and model path of a specific model
+    version. The process backend keeps one pool per model path, so a new
+    version's workers can be started with ``prepare`` while the old pool
+    finishes its queued predictions after ``retire``.
+    """
+
+    def __init__(self, predict: Callable[[List[Dict[str, Any]]], np.ndarray], backend: str = 'thread',
+                 workers: Optional[int] = None, max_queue_depth: int = 1024,
+                 model_path: Optional[str] = None, use_compiled: bool = True):
+        if backend not in INFERENCE_BACKENDS:
+            raise ValueError(f"Inference backend must be one of {list(INFERENCE_BACKENDS)}")
+        self.predict = predict
+        self.backend = backend
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.max_queue_depth = max_queue_depth
+        self.model_path = model_path
+        self.use_compiled = use_compiled
+        self.pending = 0
+        self._pools: Dict[Optional[str], Executor] = {}
+
+    def _get_pool(self, model_path: Optional[str] = None) -> Executor:
+        key = None if self.backend == 'thread' else model_path or self.model_path
+        if key not in self._pools:
+            if self.backend == 'thread':
+                self._pools[key] = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='inference')
+            else:
+                if key is None:
+                    raise ValueError("The process backend needs a model_path to load in each worker")
+                self._pools[key] = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_init_worker,
+                    initargs=(key, self.use_compiled)
+                )
+        return self._pools[key]
+
+    async def prepare(self, model_path: str):
+        """Start process workers for ``model_path`` and wait until they have loaded it."""
+        if self.backend != 'process':
+            return
+        pool = self._get_pool(model_path)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(pool, _worker_ready) for _ in range(self.workers)])
+
+    def retire(self, model_path: str):
+        """Stop the workers of a replaced model once their queued predictions finish."""
+        pool = self._pools.pop(model_path, None) if self.backend == 'process' else None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    async def run(self, records: List[Dict[str, Any]],
+                  predict: Optional[Callable[[List[Dict[str, Any]]], np.ndarray]] = None,
+                  model_path: Optional[str] = None) -> np.ndarray:
+        """Predict scores (0-100) for feature records on the configured backend."""
+        predict = predict or self.predict
+        if self.backend == 'inline':
+            return predict(records)
+
+        if self.pending >= self.max_queue_depth:
+            raise InferenceQueueFull(f"{self.pending} predictions already pending")
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            if self.backend == 'thread':
+                return await loop.run_in_executor(self._get_pool(), predict, records)
+            return await loop.run_in_executor(self._get_pool(model_path), _predict_in_worker, records)
+        finally:
+            self.pending -= 1
+
+    def shutdown(self):
+        for pool in self._pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        self._pools = {}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "workers": 0 if self.backend == 'inline' else self.workers,
+            "pending": self.pending,
+            "max_queue_depth": self.max_queue_depth,
+        }
@@ -0,0 +1,216 @@
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
+
+import orjson
+
+# Milliseconds over which newly stored leads are collected into one message
+DEFAULT_WINDOW_MS = 250.0
+
+# Messages buffered per client before it counts as a slow consumer and is disconnected
+DEFAULT_BUFFER_SIZE = 64
+
+# Newest leads sent with each message; older ones in a larger burst are only counted
+DEFAULT_MAX_LEADS = 100
+
+# Seconds between keep-alive comments on an idle stream
+DEFAULT_HEARTBEAT_SECONDS = 15.0
+
+# Milliseconds an EventSource waits before reconnecting
+RECONNECT_MS = 3000
+
+def stats_delta(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The keys of ``after`` whose values differ from ``before``, recursing into dicts.
+
+    Keys that are gone map to None, so applying the delta key by key
+    (deleting on None) turns ``before`` into ``after``.
+    """
+    delta = {}
+    for key, value in after.items():
+        previous = before.get(key)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            changed = stats_delta(previous, value)
+            if changed:
+                delta[key] = changed
+        elif value != previous:
+            delta[key] = value
+    for key in before.keys() - after.keys():
+        delta[key] = None
+    return delta
+
+def sse_message(event: str, data: Dict[str, Any]) -> bytes:
+    return b'event: ' + event.encode() + b'\ndata: ' + orjson.dumps(data) + b'\n\n'
+
+class Subscriber:
+    """One connected stream client and the messages waiting to be sent to it."""
+
+    __slots__ = ('queue', 'dropped')
+
+    def __init__(self, buffer_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(buffer_size)
+        self.dropped = False
+
+class LeadEventStream:
+    """
+    Pushes newly stored leads and statistics changes to Server-Sent Events clients.
+
+    ``publish`` only records which leads are new and starts a timer of
+    ``window_ms``; when it fires, the leads stored meanwhile and the
+    change in the statistics are encoded once into a single message that
+    every client gets. The work per message grows with the size of the
+    burst and the number of clients, not with the number of stored leads.
+
+    Each client has a queue of ``buffer_size`` messages. A client that
+    falls that far behind is disconnected instead of buffering without
+    bound; its EventSource reconnects and starts again from a snapshot.
+
+    Leads overwritten in place (see ``update``) are sent again with the
+    next message.
+
+    ``leads(start, stop)`` returns the LeadResponse dicts of store rows
+    ``start:stop`` and ``stats()`` the current /leads/stats summary.
+    """
+
+    def __init__(self, leads: Callable[[int, int], List[Dict[str, Any]]], stats: Callable[[], Dict[str, Any]],
+                 window_ms: float = DEFAULT_WINDOW_MS, buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 max_leads: int = DEFAULT_MAX_LEADS, heartbeat_seconds: float = DEFAULT_HEARTBEAT_SECONDS):
+        self.leads = leads
+        self.stats = stats
+        self.window_ms = window_ms
+        self.buffer_size = buffer_size
+        self.max_leads = max_leads
+        self.heartbeat_seconds = heartbeat_seconds
+        self.subscribers: Set[Subscriber] = set()
+        self.messages_sent = 0
+        self.clients_dropped = 0
+        self._sent_stats: Dict[str, Any] = {}
+        self._first: Optional[int] = None
+        self._stop = 0
+        self._updated: Set[int] = set()
+        self._reset = False
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def publish(self, start: int, stop: int):
+        """Note that store rows ``start:stop`` were added; they are sent with the next message."""
+        if not self.subscribers:
+            return
+        if self._first is None:
+            self._first = start
+        self._stop = stop
+        self._schedule()
+
+    def update(self, row: int):
+        """Note that store row ``row`` was overwritten; it is sent again with the next message."""
+        if not self.subscribers:
+            return
+        self._updated.add(row)
+        self._schedule()
+
+    def reset(self):
+        """Note that every lead was dropped; clients are told to start over."""
+        if not self.subscribers:
+            return
+        # Pending leads and the stats deltas are taken against refer to the dropped leads
+        self._first = None
+        self._stop = 0
+        self._updated.clear()
+        self._sent_stats = self.stats()
+        self._reset = True
+        self._schedule()
+
+    def _schedule(self):
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window_ms / 1000, self._flush)
+
+    def _flush(self):
+        self._timer = None
+        messages = []
+        if self._reset:
+            # Leads stored since the reset follow in a message of their own
+            messages.append(sse_message('snapshot', {'reset': True, 'last_lead_id': 0, 'stats': self._sent_stats}))
+            self._reset = False
+        if self._first is not None or self._updated:
+            first = self._stop if self._first is None else self._first
+            leads = self.leads(max(first, self._stop - self.max_leads), self._stop)
+            # Updated leads that were stored before this burst
+            updated = sorted(row for row in self._updated if row < first)
+            room = self.max_leads - len(leads)
+            for row in (updated[-room:] if room > 0 else []):
+                leads.extend(self.leads(row, row + 1))
+            stats = self.stats()
+            messages.append(sse_message('leads', {
+                'new_leads': self._stop - first,
+                'updated_leads': len(updated),
+                'last_lead_id': self._stop,
+                'leads': leads,
+                'stats': stats_delta(self._sent_stats, stats),
+            }))
+            self._sent_stats = stats
+            self._first = None
+            self._updated.clear()
+        for message in messages:
+            self._broadcast(message)
+
+    def _broadcast(self, message: bytes):
+        self.messages_sent += 1
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._drop(subscriber)
+
+    def _drop(self, subscriber: Subscriber):
+        """Disconnect a slow consumer: discard what it has not read and end its stream."""
+        self.subscribers.discard(subscriber)
+        self.clients_dropped += 1
+        subscriber.dropped = True
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+
+    async def events(self, last_lead_id: int) -> AsyncIterator[bytes]:
+        """
+        The stream for one client: a snapshot of the statistics, then a message per burst of leads.
+
+        ``last_lead_id`` is the id of the newest stored lead, sent with the
+        snapshot so the client knows where the pushed leads continue.
+
+        The snapshot's statistics are the ones the next message's delta is
+        computed against, so changes still waiting for the timer are sent
+        to the other clients first.
+        """
+        subscriber = Subscriber(self.buffer_size)
+        if not self.subscribers:
+            # Nothing was tracked while nobody listened
+            self._sent_stats = self.stats()
+            self._stop = last_lead_id
+        elif self._timer is not None:
+            self._timer.cancel()
+            self._flush()
+        self.subscribers.add(subscriber)
+        # Encoded before the first yield, so no message can be broadcast in between
+        snapshot = sse_message('snapshot', {'reset': False, 'last_lead_id': last_lead_id, 'stats': self._sent_stats})
+        try:
+            yield b'retry: ' + str(RECONNECT_MS).encode() + b'\n\n'
+            yield snapshot
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle connection and notices clients that went away
+                    yield b': keep-alive\n\n'
+                    continue
+                if message is None:
+                    break
+                yield message
+        finally:
+            self.subscribers.discard(subscriber)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'clients': len(self.subscribers),
+            'messages_sent': self.messages_sent,
+            'clients_dropped': self.clients_dropped,
+            'window_ms': self.window_ms,
+            'buffer_size': self.buffer_size,
+        }
@@ -0,0 +1,17 @@
+# Known values of each categorical feature; the API, training and batch scoring accept only these
+CATEGORIES = {
+    'age_group': ['18-25', '26-35', '36-50', '51+'],
+    'family_background': ['Single', 'Married', 'Married with Kids', 'Divorced', 'Widowed'],
+    'property_type': ['Apartment', 'House', 'Villa', 'Penthouse', 'Studio'],
+    'location': ['Urban', 'Suburban', 'Rural'],
+}
+
+# Inclusive (minimum, maximum) of each integer feature; None leaves that side open
+NUMERIC_RANGES = {
+    'credit_score': (300, 850),
+    'income': (100000, 1000000),
+    'budget': (0, None),
+    'previous_inquiries': (0, None),
+    'time_on_market': (1, None),
+    'response_time_minutes': (1, None),
+}
@@ -0,0 +1,121 @@
+import numpy as np
+from typing import Any, Dict, List, Mapping, Tuple
+
+# Reranked score at or above which a lead counts as high intent
+DEFAULT_HIGH_INTENT_THRESHOLD = 70.0
+
+# Lead fields that get their own statistics breakdown
+SEGMENT_FIELDS = ('property_type', 'location')
+
+class ScoreTotals:
+    """Running count and score sums for a group of leads."""
+
+    __slots__ = ('total_leads', 'high_intent_leads', 'initial_score_sum', 'reranked_score_sum')
+
+    def __init__(self):
+        self.total_leads = 0
+        self.high_intent_leads = 0
+        self.initial_score_sum = 0.0
+        self.reranked_score_sum = 0.0
+
+    def add(self, initial_score: float, reranked_score: float, high_intent: bool, sign: int = 1):
+        self.total_leads += sign
+        self.high_intent_leads += sign * high_intent
+        self.initial_score_sum += sign * initial_score
+        self.reranked_score_sum += sign * reranked_score
+
+    def summary(self) -> Dict[str, Any]:
+        if self.total_leads == 0:
+            return {
+                "total_leads": 0,
+                "high_intent_leads": 0,
+                "avg_initial_score": 0.0,
+                "avg_reranked_score": 0.0
+            }
+        return {
+            "total_leads": self.total_leads,
+            "high_intent_leads": self.high_intent_leads,
+            "avg_initial_score": round(self.initial_score_sum / self.total_leads, 2),
+            "avg_reranked_score": round(self.reranked_score_sum / self.total_leads, 2)
+        }
+
+class LeadAggregates:
+    """
+    Lead statistics maintained at insert time.
+
+    Every stored lead is added once, so reading the statistics costs the
+    same regardless of how many leads are stored.
+    """
+
+    def __init__(self, high_intent_threshold: float = DEFAULT_HIGH_INTENT_THRESHOLD):
+        self.high_intent_threshold = high_intent_threshold
+        self.overall = ScoreTotals()
+        self.segments: Dict[str, Dict[str, ScoreTotals]] = {field: {} for field in SEGMENT_FIELDS}
+
+    def _apply(self, lead: Mapping[str, Any], sign: int):
+        initial_score = lead["initial_score"]
+        reranked_score = lead["reranked_score"]
+        high_intent = reranked_score >= self.high_intent_threshold
+
+        self.overall.add(initial_score, reranked_score, high_intent, sign)
+        for field, groups in self.segments.items():
+            totals = groups.get(lead[field])
+            if totals is None:
+                totals = groups[lead[field]] = ScoreTotals()
+            totals.add(initial_score, reranked_score, high_intent, sign)
+
+    def add(self, lead: Mapping[str, Any]):
+        """Count a newly stored lead."""
+        self._apply(lead, 1)
+
+    def remove(self, lead: Mapping[str, Any]):
+        """Stop counting a lead that is no longer stored."""
+        self._apply(lead, -1)
+
+    def add_columns(self, initial_scores: np.ndarray, reranked_scores: np.ndarray,
+                    segment_codes: Mapping[str, Tuple[np.ndarray, List[str]]]):
+        """
+        Count many leads at once from score columns.
+
+        ``segment_codes`` maps each segment field to its per-lead category
+        codes and the code-to-value table, as kept by the lead store.
+        """
+        high_intent = reranked_scores >= self.high_intent_threshold
+        self.overall.total_leads += len(initial_scores)
+        self.overall.high_intent_leads += int(high_intent.sum())
+        self.overall.initial_score_sum += float(initial_scores.sum())
+        self.overall.reranked_score_sum += float(reranked_scores.sum())
+
+        for field, groups in self.segments.items():
+            codes, categories = segment_codes[field]
+            n = len(categories)
+            counts = np.bincount(codes, minlength=n)
+            high = np.bincount(codes, weights=high_intent, minlength=n)
+            initial = np.bincount(codes, weights=initial_scores, minlength=n)
+            reranked = np.bincount(codes, weights=reranked_scores, minlength=n)
+            for code, value in enumerate(categories):
+                if counts[code] == 0:
+                    continue
+                totals = groups.get(value)
+                if totals is None:
+                    totals = groups[value] = ScoreTotals()
+                totals.total_leads += int(counts[code])
+                totals.high_intent_leads += int(high[code])
+                totals.initial_score_sum += float(initial[code])
+                totals.reranked_score_sum += float(reranked[code])
+
+    def clear(self):
+        self.overall = ScoreTotals()
+        self.segments = {field: {} for field in SEGMENT_FIELDS}
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the overall statistics with per-segment breakdowns."""
+        stats = self.overall.summary()
+        stats["high_intent_threshold"] = self.high_intent_threshold
+        for field, groups in self.segments.items():
+            stats[f"by_{field}"] = {
+                value: totals.summary()
+                for value, totals in sorted(groups.items())
+                if totals.total_leads > 0
+            }
+        return stats
@@ -0,0 +1,368 @@
+import numpy as np
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+# Fixed-width columns and their storage types
+NUMERIC_COLUMNS = {
+    'initial_score': np.float64,
+    'reranked_score': np.float64,
+    'credit_score': np.int16,
+    'income': np.int32,
+    'budget': np.int64,
+    'previous_inquiries': np.int64,
+    'time_on_market': np.int64,
+    'response_time_minutes': np.int64,
+}
+
+# Low-cardinality text columns stored as small integer codes
+CATEGORICAL_COLUMNS = ('age_group', 'family_background', 'property_type', 'location')
+
+# Free-text columns stored in a byte arena
+STRING_COLUMNS = ('email', 'phone_number', 'comments')
+
+LEAD_FIELDS = ('lead_id',) + STRING_COLUMNS + tuple(NUMERIC_COLUMNS) + CATEGORICAL_COLUMNS
+
+INITIAL_CAPACITY = 1024
+
+# Overwritten string bytes tolerated before an arena is compacted, besides up to as many as are live
+COMPACT_MIN_DEAD_BYTES = 1 << 20
+
+def _grow(array: np.ndarray, capacity: int) -> np.ndarray:
+    grown = np.zeros(capacity, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+def _pack(data: Union[bytes, bytearray], starts: np.ndarray, ends: np.ndarray) -> Tuple[bytes, np.ndarray]:
+    """Concatenate the byte ranges of rows in row order; return the bytes and ``len(starts) + 1`` offsets."""
+    # A row overwritten while a snapshot copied it can end before it starts; it is replayed later
+    ends = np.maximum(ends, starts)
+    view = memoryview(data)
+    try:
+        packed = b''.join([view[begin:end] for begin, end in zip(starts.tolist(), ends.tolist())])
+    finally:
+        view.release()
+    offsets = np.zeros(len(starts) + 1, dtype=np.int64)
+    np.cumsum(ends - starts, out=offsets[1:])
+    return packed, offsets
+
+class CategoricalColumn:
+    """Dictionary-encoded column: one uint8 code per row plus the code-to-value table."""
+
+    def __init__(self, capacity: int):
+        self.codes = np.zeros(capacity, dtype=np.uint8)
+        self.categories: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def encode(self, value: str) -> int:
+        code = self._index.get(value)
+        if code is None:
+            if len(self.categories) > np.iinfo(self.codes.dtype).max:
+                raise ValueError(f"too many distinct categories (> {len(self.categories)})")
+            code = self._index[value] = len(self.categories)
+            self.categories.append(value)
+        return code
+
+    def code_of(self, value: str) -> Optional[int]:
+        return self._index.get(value)
+
+    def resize(self, capacity: int):
+        self.codes = _grow(self.codes, capacity)
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes
+
+class StringColumn:
+    """
+    Strings packed as UTF-8 into one growable byte arena.
+
+    Each row records the start and end of its bytes. Overwriting a row
+    reuses its bytes when the new value fits and otherwise appends the
+    value and re-points the row; ``dead`` counts the bytes no row points
+    to any more, which ``compact`` reclaims.
+    """
+
+    def __init__(self, capacity: int):
+        self.data = bytearray()
+        self.starts = np.zeros(capacity, dtype=np.int64)
+        self.ends = np.zeros(capacity, dtype=np.int64)
+        self.dead = 0
+
+    def set(self, row: int, value: str):
+        encoded = value.encode('utf-8')
+        start = int(self.starts[row])
+        previous = int(self.ends[row]) - start
+        if len(encoded) <= previous:
+            self.data[start:start + len(encoded)] = encoded
+            self.ends[row] = start + len(encoded)
+            self.dead += previous - len(encoded)
+        else:
+            self.starts[row] = len(self.data)
+            self.data += encoded
+            self.ends[row] = len(self.data)
+            self.dead += previous
+
+    def compact(self, size: int):
+        """Rewrite the arena with only the bytes of rows ``0:size``, in row order."""
+        packed, offsets = _pack(self.data, self.starts[:size], self.ends[:size])
+        # New buffers rather than edits in place, so columns captured for a snapshot stay intact
+        starts = np.zeros_like(self.starts)
+        ends = np.zeros_like(self.ends)
+        starts[:size] = offsets[:-1]
+        ends[:size] = offsets[1:]
+        self.data, self.starts, self.ends, self.dead = bytearray(packed), starts, ends, 0
+
+    def extend(self, row: int, values: Sequence[str]):
+        encoded = [value.encode('utf-8') for value in values]
+        ends = len(self.data) + np.cumsum([len(value) for value in encoded], dtype=np.int64)
+        self.starts[row:row + len(values)] = ends - [len(value) for value in encoded]
+        self.ends[row:row + len(values)] = ends
+        self.data += b''.join(encoded)
+
+    def get(self, row: int) -> str:
+        return self.data[self.starts[row]:self.ends[row]].decode('utf-8')
+
+    def get_many(self, start: int, stop: int) -> List[str]:
+        data = self.data
+        return [
+            data[begin:end].decode('utf-8')
+            for begin, end in zip(self.starts[start:stop].tolist(), self.ends[start:stop].tolist())
+        ]
+
+    def packed(self, start: int, stop: int) -> Tuple[bytes, np.ndarray]:
+        """Return rows ``start:stop`` as one UTF-8 byte string and ``stop - start + 1`` offsets into it."""
+        starts = self.starts[start:stop]
+        ends = self.ends[start:stop]
+        if len(starts) == 0:
+            return b'', np.zeros(1, dtype=np.int64)
+        # Rows appended in order sit back to back in the arena and can be copied in one go
+        if np.array_equal(starts[1:], ends[:-1]):
+            offsets = np.append(starts, ends[-1]) - starts[0]
+            return bytes(self.data[starts[0]:ends[-1]]), offsets
+        return _pack(self.data, starts, ends)
+
+    def resize(self, capacity: int):
+        self.starts = _grow(self.starts, capacity)
+        self.ends = _grow(self.ends, capacity)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.data) + self.starts.nbytes + self.ends.nbytes
+
+class LeadStore:
+    """
+    Struct-of-arrays storage for scored leads.
+
+    Numeric fields and scores live in growable NumPy arrays, categorical
+    fields as uint8 codes and free text in byte arenas. Leads are numbered
+    from 1 in insertion order, so a lead's row is ``lead_id - 1``.
+    """
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self._size = 0
+        self._capacity = capacity
+        self._numeric = {name: np.zeros(capacity, dtype=dtype) for name, dtype in NUMERIC_COLUMNS.items()}
+        self._categorical = {name: CategoricalColumn(capacity) for name in CATEGORICAL_COLUMNS}
+        self._strings = {name: StringColumn(capacity) for name in STRING_COLUMNS}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _reserve(self, size: int):
+        if size <= self._capacity:
+            return
+        capacity = max(size, self._capacity * 2)
+        for name, array in self._numeric.items():
+            self._numeric[name] = _grow(array, capacity)
+        for column in self._categorical.values():
+            column.resize(capacity)
+        for column in self._strings.values():
+            column.resize(capacity)
+        self._capacity = capacity
+
+    def _write(self, row: int, lead: Mapping[str, Any]):
+        for name, array in self._numeric.items():
+            array[row] = lead[name]
+        for name, column in self._categorical.items():
+            column.codes[row] = column.encode(lead[name])
+        for name, column in self._strings.items():
+            column.set(row, lead[name])
+
+    def append(self, lead: Mapping[str, Any]) -> int:
+        """Store a scored lead and return its lead id."""
+        row = self._size
+        self._reserve(row + 1)
+        self._write(row, lead)
+        self._size = row + 1
+        return row + 1
+
+    def extend(self, leads: Sequence[Mapping[str, Any]]) -> range:
+        """Store several leads column by column and return their contiguous lead ids."""
+        first = self._size
+        stop = first + len(leads)
+        self._reserve(stop)
+        for name, array in self._numeric.items():
+            array[first:stop] = [lead[name] for lead in leads]
+        for name, column in self._categorical.items():
+            encode = column.encode
+            column.codes[first:stop] = [encode(lead[name]) for lead in leads]
+        for name, column in self._strings.items():
+            column.extend(first, [lead[name] for lead in leads])
+        self._size = stop
+        return range(first + 1, stop + 1)
+
+    def replace(self, lead_id: int, lead: Mapping[str, Any]):
+        """Overwrite a stored lead in place, keeping its lead id."""
+        if not 1 <= lead_id <= self._size:
+            raise KeyError(lead_id)
+        self._write(lead_id - 1, lead)
+        for column in self._strings.values():
+            # Reclaim overwritten bytes once they outnumber the live ones, so memory follows distinct leads
+            if column.dead > max(COMPACT_MIN_DEAD_BYTES, len(column.data) // 2):
+                column.compact(self._size)
+
+    def _row(self, row: int, fields: Iterable[str]) -> Dict[str, Any]:
+        record = {}
+        for name in fields:
+            if name == 'lead_id':
+                record[name] = row + 1
+            elif name in self._numeric:
+                record[name] = self._numeric[name][row].item()
+            elif name in self._categorical:
+                column = self._categorical[name]
+                record[name] = column.categories[column.codes[row]]
+            else:
+                record[name] = self._strings[name].get(row)
+        return record
+
+    def get(self, lead_id: int, fields: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+        """Return a stored lead as a dict, or None if the id does not exist."""
+        if not 1 <= lead_id <= self._size:
+            return None
+        return self._row(lead_id - 1, fields or LEAD_FIELDS)
+
+    def slice(self, start: int = 0, stop: Optional[int] = None,
+              fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Return the leads in rows ``start:stop`` as dicts.
+
+        Columns are materialized once for the whole range, which is much
+        cheaper than assembling each row separately.
+        """
+        start, stop, _ = slice(start, stop).indices(self._size)
+        if stop <= start:
+            return []
+        fields = list(fields or LEAD_FIELDS)
+        columns = []
+        for name in fields:
+            values = self.column(name, start, stop)
+            columns.append(values.tolist() if isinstance(values, np.ndarray) else values)
+        return [dict(zip(fields, values)) for values in zip(*columns)]
+
+    def column(self, name: str, start: int = 0, stop: Optional[int] = None):
+        """
+        Return one field for rows ``start:stop``.
+
+        Numeric columns are returned as read-only NumPy views; categorical
+        and string columns as lists of Python strings.
+        """
+        start, stop, _ = slice(start, stop).indices(self._size)
+        if name == 'lead_id':
+            return list(range(start + 1, stop + 1))
+        if name in self._numeric:
+            view = self._numeric[name][start:stop]
+            view.flags.writeable = False
+            return view
+        if name in self._categorical:
+            column = self._categorical[name]
+            categories = column.categories
+            return [categories[code] for code in column.codes[start:stop].tolist()]
+        if name in self._strings:
+            return self._strings[name].get_many(start, stop)
+        raise KeyError(name)
+
+    def strings(self, name: str, start: int = 0, stop: Optional[int] = None) -> Tuple[bytes, np.ndarray]:
+        """Return a string column for rows ``start:stop`` as UTF-8 bytes plus row offsets."""
+        start, stop, _ = slice(start, stop).indices(self._size)
+        return self._strings[name].packed(start, max(start, stop))
+
+    def codes(self, name: str) -> np.ndarray:
+        """Return the category codes of a categorical column as a read-only view."""
+        view = self._categorical[name].codes[:self._size]
+        view.flags.writeable = False
+        return view
+
+    def categories(self, name: str) -> List[str]:
+        """Return the values of a categorical column, indexed by code."""
+        return list(self._categorical[name].categories)
+
+    def clear(self):
+        self.__init__(INITIAL_CAPACITY)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Copy the stored rows into flat arrays, e.g. for ``np.savez``."""
+        return self.capture()()
+
+    def capture(self) -> Callable[[], Dict[str, np.ndarray]]:
+        """
+        Take hold of the stored rows now and return a function that copies them like ``to_arrays``.
+
+        The copy can run on another thread while the store keeps changing.
+        Rows appended meanwhile are left out, and a row overwritten meanwhile
+        may be copied partly old and partly new, so changes made after the
+        capture must be replayed over the copy (as the lead log does). Every
+        other row is copied whole: offsets are copied before the arenas they
+        point into, which are only appended to or swapped for new ones.
+        """
+        n = self._size
+        numeric = dict(self._numeric)
+        categorical = {name: (column.codes, list(column.categories)) for name, column in self._categorical.items()}
+        strings = {name: (column.data, column.starts, column.ends, column.dead) for name, column in self._strings.items()}
+
+        def copy() -> Dict[str, np.ndarray]:
+            arrays = {'size': np.array(n, dtype=np.int64)}
+            for name, array in numeric.items():
+                arrays[f'numeric.{name}'] = array[:n].copy()
+            for name, (codes, categories) in categorical.items():
+                arrays[f'codes.{name}'] = codes[:n].copy()
+                arrays[f'categories.{name}'] = np.array(categories, dtype=str)
+            for name, (data, starts, ends, dead) in strings.items():
+                starts = starts[:n].copy()
+                ends = ends[:n].copy()
+                data = bytes(data)
+                if dead:
+                    # Leave overwritten bytes out of the copy
+                    data, offsets = _pack(data, starts, ends)
+                    starts, ends = offsets[:-1], offsets[1:]
+                arrays[f'starts.{name}'] = starts
+                arrays[f'ends.{name}'] = ends
+                arrays[f'data.{name}'] = np.frombuffer(data, dtype=np.uint8)
+            return arrays
+        return copy
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, np.ndarray]) -> 'LeadStore':
+        """Rebuild a store from the output of ``to_arrays``."""
+        n = int(arrays['size'])
+        store = cls(max(n, INITIAL_CAPACITY))
+        for name in store._numeric:
+            store._numeric[name][:n] = arrays[f'numeric.{name}']
+        for name, column in store._categorical.items():
+            column.codes[:n] = arrays[f'codes.{name}']
+            for value in arrays[f'categories.{name}'].tolist():
+                column.encode(value)
+        for name, column in store._strings.items():
+            column.data = bytearray(arrays[f'data.{name}'].tobytes())
+            column.starts[:n] = arrays[f'starts.{name}']
+            column.ends[:n] = arrays[f'ends.{name}']
+            column.dead = len(column.data) - int((column.ends[:n] - column.starts[:n]).sum())
+        store._size = n
+        return store
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column buffers."""
+        return (
+            sum(array.nbytes for array in self._numeric.values())
+            + sum(column.nbytes for column in self._categorical.values())
+            + sum(column.nbytes for column in self._strings.values())
+        )
@@ -1,12 +1,34 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Body, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, EmailStr, Field, validator
-import joblib
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, EmailStr, Field, ValidationError, model_validator, validator
+from starlette.requests import ClientDisconnect
+import asyncio
 import os
-import pandas as pd
+import base64
+import json
 import numpy as np
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Iterator, Literal, Mapping, Optional, Any, Sequence, Tuple, Union
 import re
+import time
+from reranker import LLMReranker
+from lead_fields import CATEGORIES, NUMERIC_RANGES
+from lead_stats import DEFAULT_HIGH_INTENT_THRESHOLD, LeadAggregates
+from score_distribution import LeadDistributions
+from lead_store import LeadStore
+from score_index import SortedIndex
+from contact_index import DEDUP_POLICIES, ContactIndex
+from text_index import SearchQueryError, TextIndex
+from batching import ScoreBatcher
+from metrics import MetricsMiddleware, render_metric, request_metrics
+from inference import InferenceExecutor, InferenceQueueFull
+from model_registry import ModelLoadError, ModelRegistry, ModelReloadInProgress, ModelVersion
+from prediction_cache import PredictionCache
+from persistence import LeadLogError, open_lead_log
+from imports import ImportJobs, import_format_for, iter_import_chunks
+from export import MEDIA_TYPES, export_headers, iter_export
+from serialization import encode_lead_page, encode_leads, json_response, lead_rows
+from lead_events import LeadEventStream
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -30,159 +52,111 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Path to model and feature columns
-MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../model/lead_scoring_model.pkl')
-FEATURE_COLUMNS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../model/feature_columns.pkl')
-
-# In-memory storage for leads
-leads_storage = []
-
-# Load model and feature columns
-try:
-    model = joblib.load(MODEL_PATH)
-    feature_columns = joblib.load(FEATURE_COLUMNS_PATH)
-    print("Model and feature columns loaded successfully")
-except FileNotFoundError:
-    model = None
-    feature_columns = None
-    print("Model or feature columns not found. Please run setup_model.py first.")
-
-# LLM Re-ranker class
-class LLMReranker:
-    def __init__(self):
-        # Keywords that indicate high intent
-        self.positive_keywords = {
-            'urgent': 10,
-            'need immediately': 15,
-            'ready to purchase': 20,
-            'pre-approved loan': 15,
-            'cash buyer': 20,
-            'looking to close quickly': 15,
-            'very interested': 10,
-            'perfect match': 10,
-            'dream home': 8,
-            'must have': 12,
-            'excited': 5,
-            'ideal': 5,
-            'love': 5,
-            'perfect': 8,
-            'asap': 12,
-            'immediately': 10,
-            'today': 8,
-            'tomorrow': 5,
-            'this week': 5,
-            'approved': 10,
-            'financing ready': 15,
-            'down payment ready': 15,
-            'serious buyer': 15,
-            'ready to move': 10,
-            'ready to sign': 20,
-            'ready to commit': 15,
-            'ready to make an offer': 20,
-        }
-        
-        # Keywords that indicate low intent
-        self.negative_keywords = {
-            'just browsing': -15,
-            'not sure yet': -10,
-            'might consider': -8,
-            'too expensive': -12,
-            'not interested': -20,
-            'just checking': -10,
-            'maybe next year': -15,
-            'not ready': -15,
-            'need to think': -10,
-            'too small': -5,
-            'too big': -5,
-            'maybe': -5,
-            'possibly': -5,
-            'someday': -10,
-            'in the future': -8,
-            'not now': -12,
-            'just looking': -10,
-            'just curious': -10,
-            'out of budget': -15,
-            'too far': -8,
-            'too close': -5,
-            'not what I want': -12,
-            'not what I need': -12,
-            'not convinced': -10,
-            'need more options': -8,
-            'need more time': -10,
-            'need to discuss': -5,
-        }
-        
-        # Neutral keywords (minimal impact)
-        self.neutral_keywords = {
-            'information': 2,
-            'details': 2,
-            'question': 0,
-            'wondering': -2,
-            'considering': 0,
-            'thinking about': 0,
-            'interested in': 3,
-            'looking for': 2,
-            'searching': 2,
-            'exploring': 0,
-            'options': 0,
-            'alternatives': -2,
-            'features': 2,
-            'specifications': 2,
-            'price': 0,
-            'cost': 0,
-            'budget': 0,
-            'location': 0,
-            'area': 0,
-            'neighborhood': 0,
-            'size': 0,
-            'space': 0,
-            'rooms': 0,
-            'bedrooms': 0,
-            'bathrooms': 0,
-        }
-    
-    def rerank(self, initial_score: float, comments: str) -> float:
-        """
-        Adjust the initial ML score based on keywords in the comments.
-        
-        Args:
-            initial_score: The initial score from the ML model (0-100)
-            comments: The lead's comments text
-            
-        Returns:
-            Adjusted score (0-100)
-        """
-        if not comments:
-            return initial_score
-        
-        # Convert to lowercase for case-insensitive matching
-        comments_lower = comments.lower()
-        
-        # Initialize adjustment
-        score_adjustment = 0
-        
-        # Check for positive keywords
-        for keyword, value in self.positive_keywords.items():
-            if keyword.lower() in comments_lower:
-                score_adjustment += value
-        
-        # Check for negative keywords
-        for keyword, value in self.negative_keywords.items():
-            if keyword.lower() in comments_lower:
-                score_adjustment += value  # Value is already negative
-        
-        # Check for neutral keywords
-        for keyword, value in self.neutral_keywords.items():
-            if keyword.lower() in comments_lower:
-                score_adjustment += value
-        
-        # Apply adjustment to initial score
-        adjusted_score = initial_score + score_adjustment
-        
-        # Ensure score is within 0-100 range
-        adjusted_score = max(0, min(100, adjusted_score))
-        
-        return adjusted_score
+# Per-route request counters and latencies, switchable at runtime with POST /metrics/enabled
+request_metrics.enabled = os.getenv("METRICS_ENABLED", "1") != "0"
+app.add_middleware(MetricsMiddleware, metrics=request_metrics)
+
+# Directory of the published model, feature columns and archived model versions
+MODEL_DIR = os.getenv("MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), '../model'))
+MODEL_PATH = os.path.join(MODEL_DIR, 'lead_scoring_model.pkl')
+
+# Seconds between checks for a newly published model file (0 disables automatic reloads)
+MODEL_WATCH_SECONDS = float(os.getenv("MODEL_WATCH_SECONDS", "0"))
+
+# 'startup' loads the model while the app is imported; 'background' starts serving at once
+# and loads it on a worker thread, answering /score with 503 until it is ready
+MODEL_LOAD_MODES = ('startup', 'background')
+MODEL_LOAD_MODE = os.getenv("MODEL_LOAD_MODE", "startup")
+if MODEL_LOAD_MODE not in MODEL_LOAD_MODES:
+    raise ValueError(f"MODEL_LOAD_MODE must be one of {list(MODEL_LOAD_MODES)}")
+
+# In-memory columnar storage for leads
+lead_store = LeadStore()
+
+# Statistics over lead_store, updated as leads are stored
+lead_aggregates = LeadAggregates(
+    high_intent_threshold=float(os.getenv("HIGH_INTENT_THRESHOLD", DEFAULT_HIGH_INTENT_THRESHOLD))
+)
+
+# Score quantile sketches and histograms over lead_store, updated as leads are stored
+lead_distributions = LeadDistributions()
+
+# Sorted (score, lead_id) keys used to page through /leads by score
+SCORE_FIELDS = ('reranked_score', 'initial_score')
+score_indexes = {field: SortedIndex() for field in SCORE_FIELDS}
+
+# Durable lead log (none, ndjson or sqlite), replayed into lead_store on startup
+LEAD_DATA_DIR = os.getenv(
+    "LEAD_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '../data/leads')
+)
+lead_log = open_lead_log(
+    os.getenv("LEAD_PERSISTENCE", "none"),
+    LEAD_DATA_DIR,
+    commit_interval_ms=float(os.getenv("LEAD_LOG_COMMIT_MS", "10"))
+)
+
+# Number of logged leads after which a new snapshot is written; also bounds what a restart replays
+SNAPSHOT_EVERY = int(os.getenv("LEAD_SNAPSHOT_EVERY", "100000"))
+
+# Stored leads by normalized email and phone number, for deduplication and /leads/by-contact
+contact_index = ContactIndex()
+
+# Stored leads by the words of their comments, for /leads/search
+comment_index = TextIndex(lambda lead_id: lead_store.get(lead_id, ("comments",))["comments"])
+
+# What happens to a lead whose email or phone number is already stored: 'append' stores it
+# as another lead, 'replace' overwrites the stored lead with it, and 'max' overwrites the
+# stored lead only if the new reranked score is higher
+DEDUP_POLICY = os.getenv("DEDUP_POLICY", "append")
+if DEDUP_POLICY not in DEDUP_POLICIES:
+    raise ValueError(f"DEDUP_POLICY must be one of {list(DEDUP_POLICIES)}")
+if DEDUP_POLICY != 'append' and lead_log is not None and lead_log.shared:
+    # Workers only catch up on leads appended to the shared table, not on leads changed in place
+    raise ValueError("DEDUP_POLICY must be 'append' with LEAD_PERSISTENCE=shared")
+
+# Default and largest page sizes for /leads
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+# Largest number of leads accepted by a single /score/batch request
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "10000"))
+
+# Rows parsed, validated and scored together by /leads/import
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+
+# Fields that are collected with the lead but not used by the model
+NON_FEATURE_FIELDS = ('consent', 'comments', 'phone_number', 'email')
+
+# Model features of typical leads, predicted by each new model version before it is swapped in
+WARMUP_RECORDS = [
+    {'credit_score': 720, 'age_group': '26-35', 'family_background': 'Married', 'income': 600000,
+     'budget': 5000000, 'property_type': 'Apartment', 'location': 'Urban',
+     'previous_inquiries': 3, 'time_on_market': 30, 'response_time_minutes': 45},
+    {'credit_score': 580, 'age_group': '51+', 'family_background': 'Single', 'income': 250000,
+     'budget': 1500000, 'property_type': 'Villa', 'location': 'Rural',
+     'previous_inquiries': 0, 'time_on_market': 120, 'response_time_minutes': 600},
+]
+
+# Versioned models; the pipeline is compiled into NumPy arrays for DataFrame-free inference
+model_registry = ModelRegistry(
+    MODEL_DIR,
+    use_compiled=os.getenv("USE_COMPILED_MODEL", "1") != "0",
+    warmup_records=WARMUP_RECORDS
+)
+
+def report_model_loaded(model_version: ModelVersion):
+    print(f"Model version {model_version.version} loaded successfully in {model_version.load_seconds:.2f}s"
+          + (f" (compiled, {model_version.compiled.n_trees} trees)" if model_version.compiled is not None else ""))
+
+if MODEL_LOAD_MODE == 'startup':
+    try:
+        model_registry.activate(model_registry.load())
+        report_model_loaded(model_registry.current)
+    except FileNotFoundError:
+        print("Model or feature columns not found. Please run setup_model.py first.")
+    except ModelLoadError as e:
+        print(f"Model could not be loaded: {e}")
 
 # Initialize re-ranker
 reranker = LLMReranker()
@@ -191,16 +165,16 @@ reranker = LLMReranker()
 class LeadInput(BaseModel):
     phone_number: str = Field(..., description="Phone number in format +91-XXXXXXXXXX")
     email: EmailStr = Field(..., description="Email address")
-    credit_score: int = Field(..., ge=300, le=850, description="Credit score (300-850)")
+    credit_score: int = Field(..., ge=NUMERIC_RANGES['credit_score'][0], le=NUMERIC_RANGES['credit_score'][1], description="Credit score (300-850)")
     age_group: str = Field(..., description="Age group (18-25, 26-35, 36-50, 51+)")
     family_background: str = Field(..., description="Family background (Single, Married, Married with Kids, etc.)")
-    income: int = Field(..., ge=100000, le=1000000, description="Annual income (100,000-1,000,000 INR)")
+    income: int = Field(..., ge=NUMERIC_RANGES['income'][0], le=NUMERIC_RANGES['income'][1], description="Annual income (100,000-1,000,000 INR)")
     property_type: str = Field(..., description="Property type (Apartment, House, Villa, etc.)")
-    budget: int = Field(..., ge=0, description="Budget for property")
+    budget: int = Field(..., ge=NUMERIC_RANGES['budget'][0], description="Budget for property")
     location: str = Field(..., description="Location preference (Urban, Suburban, Rural)")
-    previous_inquiries: int = Field(..., ge=0, description="Number of previous inquiries")
-    time_on_market: int = Field(..., ge=1, description="Days property has been on market")
-    response_time_minutes: int = Field(..., ge=1, description="Response time in minutes")
+    previous_inquiries: int = Field(..., ge=NUMERIC_RANGES['previous_inquiries'][0], description="Number of previous inquiries")
+    time_on_market: int = Field(..., ge=NUMERIC_RANGES['time_on_market'][0], description="Days property has been on market")
+    response_time_minutes: int = Field(..., ge=NUMERIC_RANGES['response_time_minutes'][0], description="Response time in minutes")
     comments: str = Field("", description="Additional comments or requirements")
     consent: bool = Field(..., description="Consent to data processing")
     
@@ -212,28 +186,28 @@ class LeadInput(BaseModel):
     
     @validator('age_group')
     def validate_age_group(cls, v):
-        valid_age_groups = ['18-25', '26-35', '36-50', '51+']
+        valid_age_groups = CATEGORIES['age_group']
         if v not in valid_age_groups:
             raise ValueError(f'Age group must be one of {valid_age_groups}')
         return v
     
     @validator('family_background')
     def validate_family(cls, v):
-        valid_backgrounds = ['Single', 'Married', 'Married with Kids', 'Divorced', 'Widowed']
+        valid_backgrounds = CATEGORIES['family_background']
         if v not in valid_backgrounds:
             raise ValueError(f'Family background must be one of {valid_backgrounds}')
         return v
     
     @validator('property_type')
     def validate_property(cls, v):
-        valid_types = ['Apartment', 'House', 'Villa', 'Penthouse', 'Studio']
+        valid_types = CATEGORIES['property_type']
         if v not in valid_types:
             raise ValueError(f'Property type must be one of {valid_types}')
         return v
     
     @validator('location')
     def validate_location(cls, v):
-        valid_locations = ['Urban', 'Suburban', 'Rural']
+        valid_locations = CATEGORIES['location']
         if v not in valid_locations:
             raise ValueError(f'Location must be one of {valid_locations}')
         return v
@@ -243,12 +217,55 @@ class LeadInput(BaseModel):
         if not v:
             raise ValueError('Consent to data processing is required')
         return v
+    
+    @model_validator(mode='wrap')
+    @classmethod
+    def time_validation(cls, data, handler):
+        # Times the field checks and every validator above as the 'validate' stage;
+        # /leads/import validates on worker threads, so the stage is recorded under the lock
+        start = time.perf_counter()
+        try:
+            return handler(data)
+        finally:
+            request_metrics.thread_stage('validate', start)
 
 class LeadScore(BaseModel):
     initial_score: float
     reranked_score: float
     lead_id: int
 
+class BatchScoreItem(BaseModel):
+    index: int
+    initial_score: float
+    reranked_score: float
+    lead_id: int
+
+class BatchScoreError(BaseModel):
+    index: int
+    errors: List[str]
+
+class BatchScoreResponse(BaseModel):
+    scored: int
+    failed: int
+    results: List[BatchScoreItem]
+    errors: List[BatchScoreError]
+
+class ImportRejection(BaseModel):
+    row: int
+    errors: List[str]
+
+class ImportJobResponse(BaseModel):
+    job_id: str
+    status: Literal['running', 'completed', 'failed']
+    format: Literal['csv', 'ndjson']
+    bytes_read: int
+    rows_read: int
+    scored: int
+    rejected: int
+    rejections: List[ImportRejection]
+    elapsed_seconds: float
+    error: Optional[str]
+
 class LeadResponse(BaseModel):
     lead_id: int
     email: str
@@ -256,20 +273,512 @@ class LeadResponse(BaseModel):
     reranked_score: float
     comments: str
 
-class LeadStats(BaseModel):
+class SegmentStats(BaseModel):
     total_leads: int
     high_intent_leads: int
     avg_initial_score: float
     avg_reranked_score: float
 
-# Dependency to check if model is loaded
-async def get_model():
-    if model is None or feature_columns is None:
+class LeadPage(BaseModel):
+    items: List[LeadResponse]
+    next_cursor: Optional[str]
+
+class SearchPage(LeadPage):
+    total_matches: int
+
+class LeadStats(SegmentStats):
+    high_intent_threshold: float
+    by_property_type: Dict[str, SegmentStats]
+    by_location: Dict[str, SegmentStats]
+
+class ScoreDistributionStats(BaseModel):
+    count: int
+    p50: Optional[float]
+    p90: Optional[float]
+    p99: Optional[float]
+    rank_error: Optional[float]
+    histogram: List[int]
+
+class SegmentDistributions(BaseModel):
+    initial_score: ScoreDistributionStats
+    reranked_score: ScoreDistributionStats
+
+class LeadDistributionStats(SegmentDistributions):
+    histogram_edges: List[float]
+    by_property_type: Dict[str, SegmentDistributions]
+    by_location: Dict[str, SegmentDistributions]
+
+class ModelVersionInfo(BaseModel):
+    version: str
+    path: str
+    classifier: str
+    compiled: bool
+    n_trees: Optional[int]
+    loaded_at: str
+    activated_at: Optional[str]
+    load_seconds: float
+    warmup_seconds: float
+
+class ModelStatus(BaseModel):
+    current: Optional[ModelVersionInfo]
+    previous: List[ModelVersionInfo]
+    reloading: bool
+    last_error: Optional[str]
+    watch_seconds: float
+
+class ModelSwapResponse(BaseModel):
+    changed: bool
+    current: ModelVersionInfo
+    replaced: Optional[ModelVersionInfo]
+
+class ArchivedModelVersion(BaseModel):
+    version: str
+    archived_at: str
+    current: bool
+    in_memory: bool
+
+# Dependency returning the model version a request is scored with, even if another is swapped in meanwhile
+async def get_model() -> ModelVersion:
+    if model_registry.current is None and model_loading():
+        raise HTTPException(
+            status_code=503,
+            detail="Model is still loading",
+            headers={"Retry-After": "1"}
+        )
+    if model_registry.current is None:
         raise HTTPException(
             status_code=503, 
             detail="Model not loaded. Please run setup_model.py first."
         )
-    return model, feature_columns
+    return model_registry.current
+
+def lead_features(lead: LeadInput) -> Dict[str, Any]:
+    """Return the model input fields of a lead."""
+    lead_dict = lead.dict()
+    for field in NON_FEATURE_FIELDS:
+        lead_dict.pop(field, None)
+    return lead_dict
+
+# Initial scores of recently seen feature records, for leads that resubmit the same form
+prediction_cache = PredictionCache(
+    max_size=int(os.getenv("PREDICTION_CACHE_SIZE", "10000")),
+    ttl_seconds=float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "3600")),
+    version=model_registry.current.version if model_registry.current is not None else None
+)
+
+# Runs predictions off the event loop (inline, thread or process backend)
+inference_executor = InferenceExecutor(
+    lambda records: model_registry.current.predict(records),
+    backend=os.getenv("INFERENCE_BACKEND", "thread"),
+    workers=int(os.getenv("INFERENCE_WORKERS", "0")) or None,
+    max_queue_depth=int(os.getenv("INFERENCE_QUEUE_DEPTH", "1024")),
+    model_path=model_registry.current.path if model_registry.current is not None else MODEL_PATH,
+    use_compiled=model_registry.use_compiled
+)
+
+async def run_prediction(records: List[Dict[str, Any]], model_version: ModelVersion) -> np.ndarray:
+    """Predict initial scores with a model version, mapping a full inference queue to 503."""
+    try:
+        return await inference_executor.run(records, model_version.predict, model_version.path)
+    except InferenceQueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Inference queue is full: {e}")
+
+def rerank_leads(leads: List[LeadInput], features: List[Dict[str, Any]],
+                 initial_scores: np.ndarray) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Rerank predicted leads into their API results and the records to store."""
+    results = []
+    records = []
+    for lead, lead_dict, initial_score in zip(leads, features, initial_scores.tolist()):
+        reranked_score = reranker.rerank(initial_score, lead.comments)
+        results.append({
+            "initial_score": round(initial_score, 2),
+            "reranked_score": round(reranked_score, 2)
+        })
+        records.append(lead_record(lead, lead_dict, initial_score, reranked_score))
+    return results, records
+
+async def score_and_store(leads: List[LeadInput], model_version: ModelVersion,
+                          offload: bool = False) -> List[Union[Dict[str, Any], str]]:
+    """
+    Score validated leads with one prediction call, rerank and store them.
+
+    Returns each lead's scores and id, or why it was not stored (see
+    upsert_leads).
+
+    With ``offload``, features and reranking are computed on a worker
+    thread, so large batches do not hold up the event loop; only storing
+    runs on it.
+    """
+    if offload:
+        features = await asyncio.to_thread(lambda: [lead_features(lead) for lead in leads])
+    else:
+        features = [lead_features(lead) for lead in leads]
+    try:
+        initial_scores = await run_prediction(features, model_version)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error predicting score: {str(e)}")
+
+    if offload:
+        results, records = await asyncio.to_thread(rerank_leads, leads, features, initial_scores)
+    else:
+        results, records = rerank_leads(leads, features, initial_scores)
+    stored = []
+    for result, lead_id in zip(results, await save_leads(records)):
+        if isinstance(lead_id, str):
+            stored.append(lead_id)
+        else:
+            result["lead_id"] = lead_id
+            stored.append(result)
+    return stored
+
+# Tracks /leads/import progress and rejected rows
+import_jobs = ImportJobs()
+
+# Pushes newly stored leads and statistics changes to /leads/stream clients
+lead_events = LeadEventStream(
+    lambda start, stop: lead_rows(lead_store, start, stop),
+    lead_aggregates.summary,
+    window_ms=float(os.getenv("STREAM_WINDOW_MS", "250")),
+    buffer_size=int(os.getenv("STREAM_BUFFER_SIZE", "64")),
+    max_leads=int(os.getenv("STREAM_MAX_LEADS", "100"))
+)
+
+# Seconds between catching up on other workers' leads while /leads/stream clients are connected
+STREAM_SYNC_SECONDS = 1.0
+
+# Coalesces concurrent /score requests into one prediction call
+score_batcher = ScoreBatcher(
+    run_prediction,
+    window_ms=float(os.getenv("SCORE_BATCH_WINDOW_MS", "2")),
+    max_batch_size=int(os.getenv("SCORE_BATCH_MAX_SIZE", "64"))
+)
+
+def lead_record(lead: LeadInput, features: Dict[str, Any], initial_score: float, reranked_score: float) -> Dict[str, Any]:
+    """The stored fields of a scored lead."""
+    return {
+        "email": lead.email,
+        "phone_number": lead.phone_number,
+        "initial_score": initial_score,
+        "reranked_score": reranked_score,
+        "comments": lead.comments,
+        **{k: v for k, v in features.items()}
+    }
+
+def index_leads(records: List[Dict[str, Any]], lead_ids: range):
+    """Add stored leads to the statistics, distributions, score, contact and comment indexes, and announce them to stream clients."""
+    for lead_id, lead_data in zip(lead_ids, records):
+        lead_aggregates.add(lead_data)
+        lead_distributions.add(lead_data)
+        for field, index in score_indexes.items():
+            index.add((lead_data[field], lead_id))
+        contact_index.add(lead_id, lead_data["email"], lead_data["phone_number"])
+        comment_index.add(lead_id, lead_data["comments"])
+    lead_events.publish(lead_ids.start - 1, lead_ids.stop - 1)
+
+def replace_lead(lead_id: int, record: Dict[str, Any]):
+    """Overwrite a stored lead with a newer record for the same contact, keeping its id."""
+    previous = lead_store.get(lead_id)
+    lead_aggregates.remove(previous)
+    lead_aggregates.add(record)
+    lead_distributions.remove(previous)
+    lead_distributions.add(record)
+    for field, index in score_indexes.items():
+        index.remove((previous[field], lead_id))
+        index.add((record[field], lead_id))
+    contact_index.remove(lead_id, previous["email"], previous["phone_number"])
+    contact_index.add(lead_id, record["email"], record["phone_number"])
+    comment_index.remove(lead_id, previous["comments"])
+    comment_index.add(lead_id, record["comments"])
+    lead_store.replace(lead_id, record)
+    lead_events.update(lead_id - 1)
+    if lead_log is not None:
+        # Replaying the log applies the newer record over the older one
+        lead_log.append({"lead_id": lead_id, **record})
+
+def replaces(stored: Mapping[str, Any], record: Mapping[str, Any]) -> bool:
+    """Whether DEDUP_POLICY lets a new record for the same contact overwrite a stored one."""
+    return DEDUP_POLICY == 'replace' or record["reranked_score"] > stored["reranked_score"]
+
+def upsert_leads(records: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Union[int, str]]]:
+    """
+    Apply DEDUP_POLICY to records whose email or phone number is already stored.
+
+    Stored leads are updated in place; records repeating a contact seen
+    earlier in ``records`` are merged with it the same way. A record whose
+    email and phone number belong to two different leads is not stored:
+    updating either one would leave the other as a duplicate of it. Returns
+    the records to append as new leads and, for every record, its lead id
+    or why it was not stored.
+    """
+    first_id = len(lead_store) + 1
+    new_records: List[Dict[str, Any]] = []
+    lead_ids: List[Union[int, str]] = []
+    # Contacts of new_records, by position
+    batch = ContactIndex()
+    for record in records:
+        email, phone_number = record["email"], record["phone_number"]
+        # Contacts of new_records never match stored leads, so each key has at most one owner
+        (batch_email, batch_phone), (stored_email, stored_phone) = (
+            batch.match_each(email, phone_number), contact_index.match_each(email, phone_number))
+        by_email = first_id + batch_email if batch_email is not None else stored_email
+        by_phone = first_id + batch_phone if batch_phone is not None else stored_phone
+        if by_email is not None and by_phone is not None and by_email != by_phone:
+            lead_ids.append(f"Email matches lead {by_email} but phone number matches lead {by_phone}")
+            continue
+        position = batch_email if batch_email is not None else batch_phone
+        if position is not None:
+            if replaces(new_records[position], record):
+                batch.remove(position, new_records[position]["email"], new_records[position]["phone_number"])
+                batch.add(position, email, phone_number)
+                new_records[position] = record
+            lead_ids.append(first_id + position)
+            continue
+        lead_id = stored_email if stored_email is not None else stored_phone
+        if lead_id is not None:
+            if replaces(lead_store.get(lead_id, ("reranked_score",)), record):
+                replace_lead(lead_id, record)
+            lead_ids.append(lead_id)
+            continue
+        batch.add(len(new_records), email, phone_number)
+        lead_ids.append(first_id + len(new_records))
+        new_records.append(record)
+    return new_records, lead_ids
+
+def store_leads(records: List[Dict[str, Any]],
+                synced: Optional[Tuple[bool, List[Dict[str, Any]], int]] = None) -> Sequence[Union[int, str]]:
+    """
+    Store scored lead records and return their ids.
+
+    Every record becomes a new lead under DEDUP_POLICY 'append'; otherwise
+    a record for a stored contact updates that lead, and a record matching
+    two different leads gets why it was not stored instead of an id (see
+    upsert_leads).
+    Raises a 503 while the lead log is failing to commit what was already
+    logged, rather than accept leads that would not survive a restart.
+
+    With LEAD_PERSISTENCE=shared, ``synced`` is what appending the records
+    to the shared table returned (see save_leads); without it the table is
+    synced here, blocking until SQLite's write lock is free.
+    """
+    if lead_log is not None and not lead_log.shared:
+        try:
+            lead_log.check()
+        except LeadLogError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+    if lead_log is not None and lead_log.shared:
+        # Catch up with the other workers and append in one transaction, so ids follow the table's order
+        cleared, missing, _ = synced if synced is not None else lead_log.sync(len(lead_store), records)
+        apply_synced_leads(cleared, missing)
+    lead_ids = None
+    if DEDUP_POLICY != 'append':
+        records, lead_ids = upsert_leads(records)
+    appended = lead_store.extend(records)
+    index_leads(records, appended)
+
+    if lead_log is not None:
+        # Queue the leads for the background log writer; no disk I/O happens here
+        if not lead_log.shared:
+            for lead_id, lead_data in zip(appended, records):
+                lead_log.append({"lead_id": lead_id, **lead_data})
+        if lead_log.events_since_snapshot >= SNAPSHOT_EVERY:
+            # The columns are copied and written on the log's writer thread, not in this request
+            lead_log.snapshot(lead_store.capture())
+    return appended if lead_ids is None else lead_ids
+
+# Serializes syncs with the shared lead table, so each one starts from the leads the previous one applied
+shared_sync_lock = asyncio.Lock()
+
+async def save_leads(records: List[Dict[str, Any]]) -> Sequence[Union[int, str]]:
+    """
+    Store scored lead records from a request handler and return their ids.
+
+    With LEAD_PERSISTENCE=shared, the write transaction that catches up on
+    other workers' leads and appends these runs on a worker thread, since
+    it waits for whichever worker holds SQLite's write lock.
+    """
+    if lead_log is None or not lead_log.shared:
+        return store_leads(records)
+    async with shared_sync_lock:
+        synced = await asyncio.to_thread(lead_log.sync, len(lead_store), records)
+        return store_leads(records, synced)
+
+async def store_lead(lead: LeadInput, features: Dict[str, Any], initial_score: float, reranked_score: float) -> int:
+    """Store a scored lead and return its id; a contact conflict under DEDUP_POLICY is a 409."""
+    lead_id = (await save_leads([lead_record(lead, features, initial_score, reranked_score)]))[0]
+    if isinstance(lead_id, str):
+        raise HTTPException(status_code=409, detail=lead_id)
+    return lead_id
+
+def clear_leads():
+    lead_store.clear()
+    lead_aggregates.clear()
+    lead_distributions.clear()
+    for index in score_indexes.values():
+        index.clear()
+    contact_index.clear()
+    comment_index.clear()
+    lead_events.reset()
+
+def apply_synced_leads(cleared: bool, missing: List[Dict[str, Any]]):
+    """Apply what a shared lead log sync returned to this worker's copy."""
+    if cleared:
+        clear_leads()
+    if len(missing) > len(lead_store):
+        # Catching up on more leads than are stored: rebuilding in bulk is cheaper
+        lead_ids = lead_store.extend(missing)
+        rebuild_derived_state()
+        lead_events.publish(lead_ids.start - 1, lead_ids.stop - 1)
+    elif missing:
+        index_leads(missing, lead_store.extend(missing))
+
+async def sync_leads():
+    """
+    Bring this worker's leads up to date with those other workers stored.
+
+    Only LEAD_PERSISTENCE=shared has other workers' leads to read; read
+    routes depend on this so every worker answers from the same leads.
+    The SQLite read runs on a worker thread, so a worker holding the
+    table's write lock cannot stall this worker's event loop.
+    """
+    if lead_log is not None and lead_log.shared:
+        async with shared_sync_lock:
+            synced = await asyncio.to_thread(lead_log.sync, len(lead_store))
+            apply_synced_leads(*synced[:2])
+
+def reset_leads():
+    """Drop every stored lead along with the statistics and indexes built on them."""
+    clear_leads()
+    if lead_log is not None and lead_log.shared:
+        # Clears the table for every worker
+        lead_log.clear()
+    elif lead_log is not None:
+        # An empty snapshot supersedes everything logged so far
+        lead_log.snapshot(lead_store.capture())
+
+def rebuild_derived_state():
+    """Recompute the statistics, distributions and score indexes from the lead store columns in bulk."""
+    segment_codes = {field: (lead_store.codes(field), lead_store.categories(field)) for field in lead_aggregates.segments}
+    lead_aggregates.clear()
+    lead_aggregates.add_columns(lead_store.column('initial_score'), lead_store.column('reranked_score'), segment_codes)
+    lead_distributions.clear()
+    lead_distributions.add_columns(lead_store.column('initial_score'), lead_store.column('reranked_score'), segment_codes)
+    lead_ids = np.arange(1, len(lead_store) + 1)
+    for field, index in score_indexes.items():
+        scores = lead_store.column(field)
+        order = np.lexsort((lead_ids, scores))
+        index.load_sorted(list(zip(scores[order].tolist(), lead_ids[order].tolist())))
+    contact_index.clear()
+    contact_index.add_many(range(1, len(lead_store) + 1), lead_store.column('email'), lead_store.column('phone_number'))
+    comment_index.clear()
+    comment_index.add_many(range(1, len(lead_store) + 1), lead_store.column('comments'))
+
+def restore_leads(log) -> int:
+    """Rebuild lead_store from the log's snapshot and tail, then its derived state."""
+    global lead_store
+    arrays, event_chunks = log.replay()
+    store = LeadStore.from_arrays(arrays) if arrays is not None else LeadStore()
+    for events in event_chunks:
+        # New leads are appended a chunk at a time; events for stored leads overwrite them
+        appended = []
+        for event in events:
+            lead_id = event["lead_id"]
+            if lead_id == len(store) + len(appended) + 1:
+                appended.append(event)
+            elif lead_id > len(store) + len(appended):
+                raise RuntimeError(
+                    f"Lead log resumes at lead {lead_id} but {len(store) + len(appended)} leads are restored"
+                )
+            elif lead_id > len(store):
+                appended[lead_id - len(store) - 1] = event
+            else:
+                store.replace(lead_id, event)
+        store.extend(appended)
+    lead_store = store
+    rebuild_derived_state()
+    return len(lead_store)
+
+def format_lead(lead: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a stored lead for the /leads response."""
+    return {
+        "lead_id": lead["lead_id"],
+        "email": lead["email"],
+        "initial_score": round(lead["initial_score"], 2),
+        "reranked_score": round(lead["reranked_score"], 2),
+        "comments": lead["comments"]
+    }
+
+def encode_cursor(sort: str, key: Any) -> str:
+    """Encode the sort key of the last lead on a page as an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps([sort, key]).encode()).decode()
+
+def decode_cursor(cursor: str, sort: str) -> Any:
+    """Decode a cursor produced by encode_cursor for the same sort order."""
+    try:
+        cursor_sort, key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cursor_sort != sort:
+        raise HTTPException(status_code=400, detail=f"Cursor was issued for sort={cursor_sort}")
+    return tuple(key) if isinstance(key, list) else key
+
+def iter_lead_keys(sort: str, descending: bool, min_score: Optional[float],
+                   max_score: Optional[float], after: Any) -> Iterator[Any]:
+    """
+    Yield the sort keys of matching leads in page order, starting after a cursor key.
+    
+    Score sorts walk the score index between the score bounds; lead_id
+    order walks the ids and filters on reranked_score.
+    """
+    if sort == 'lead_id':
+        if descending:
+            ids = range((after or len(lead_store) + 1) - 1, 0, -1)
+        else:
+            ids = range((after or 0) + 1, len(lead_store) + 1)
+        if min_score is None and max_score is None:
+            yield from ids
+            return
+        scores = lead_store.column('reranked_score')
+        for lead_id in ids:
+            score = scores[lead_id - 1]
+            if (min_score is None or score >= min_score) and (max_score is None or score <= max_score):
+                yield lead_id
+        return
+    
+    minimum = None if min_score is None else (min_score, float('-inf'))
+    maximum = None if max_score is None else (max_score, float('inf'))
+    inclusive = [True, True]
+    if after is not None:
+        if descending:
+            maximum, inclusive[1] = after, False
+        else:
+            minimum, inclusive[0] = after, False
+    yield from score_indexes[sort].irange(minimum, maximum, tuple(inclusive), reverse=descending)
+
+def format_validation_errors(error: ValidationError) -> List[str]:
+    """Flatten a pydantic ValidationError into readable messages."""
+    return [
+        f"{'.'.join(str(part) for part in err['loc']) or 'lead'}: {err['msg']}"
+        for err in error.errors()
+    ]
+
+def start_lead_log(log) -> int:
+    """
+    Restore the leads in a lead log and start its writer; returns the number restored.
+
+    A replay of SNAPSHOT_EVERY or more logged leads (after a crash, or
+    from a log without a recent snapshot) is followed by a snapshot, so
+    the next start does not replay them again.
+    """
+    restored = restore_leads(log)
+    log.start()
+    if log.events_since_snapshot >= SNAPSHOT_EVERY:
+        log.snapshot(lead_store.capture())
+    return restored
+
+if lead_log is not None:
+    print(f"Restored {start_lead_log(lead_log)} leads from {LEAD_DATA_DIR} ({lead_log.backend})")
 
 # Routes
 @app.get("/")
@@ -277,53 +786,50 @@ async def root():
     return {"message": "Lead Scoring API is running", "status": "healthy"}
 
 @app.post("/score", response_model=LeadScore)
-async def score_lead(lead: LeadInput, model_data: tuple = Depends(get_model)):
+async def score_lead(lead: LeadInput, model_version: ModelVersion = Depends(get_model)):
     """
     Score a lead using the ML model and LLM-inspired re-ranker.
     
     Returns initial score from ML model and reranked score after applying
-    keyword-based adjustments to the comments.
+    keyword-based adjustments to the comments. A resubmitted lead whose
+    model features are unchanged reuses the cached initial score; its
+    comments are still reranked.
     """
-    model, feature_columns = model_data
-    
     # Check consent
     if not lead.consent:
         raise HTTPException(status_code=400, detail="Consent to data processing is required")
     
     # Prepare data for model
-    lead_dict = lead.dict()
-    
-    # Remove fields not used by the model
-    lead_dict.pop('consent', None)
-    lead_dict.pop('comments', None)
-    lead_dict.pop('phone_number', None)
-    lead_dict.pop('email', None)
+    start = time.perf_counter()
+    lead_dict = lead_features(lead)
+    request_metrics.stage('features', start)
     
-    # Convert to DataFrame
-    lead_df = pd.DataFrame([lead_dict])
-    
-    # Get prediction probability
-    try:
-        # Get probability of high intent (class 1)
-        initial_score = model.predict_proba(lead_df)[0, 1] * 100
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error predicting score: {str(e)}")
+    # Get prediction probability, unless this model already scored the same features
+    initial_score = prediction_cache.get(model_version.version, lead_dict)
+    if initial_score is None:
+        start = time.perf_counter()
+        try:
+            # Get probability of high intent (class 1)
+            if score_batcher.enabled:
+                initial_score = await score_batcher.submit(lead_dict, model_version)
+            else:
+                initial_score = float((await run_prediction([lead_dict], model_version))[0])
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error predicting score: {str(e)}")
+        request_metrics.stage('predict', start)
+        prediction_cache.put(model_version.version, lead_dict, initial_score)
     
     # Apply LLM-inspired re-ranking
+    start = time.perf_counter()
     reranked_score = reranker.rerank(initial_score, lead.comments)
+    request_metrics.stage('rerank', start)
     
     # Store lead in memory
-    lead_id = len(leads_storage) + 1
-    lead_data = {
-        "lead_id": lead_id,
-        "email": lead.email,
-        "phone_number": lead.phone_number,
-        "initial_score": initial_score,
-        "reranked_score": reranked_score,
-        "comments": lead.comments,
-        **{k: v for k, v in lead_dict.items()}
-    }
-    leads_storage.append(lead_data)
+    start = time.perf_counter()
+    lead_id = await store_lead(lead, lead_dict, initial_score, reranked_score)
+    request_metrics.stage('store', start)
     
     return {
         "initial_score": round(initial_score, 2),
@@ -331,55 +837,504 @@ async def score_lead(lead: LeadInput, model_data: tuple = Depends(get_model)):
         "lead_id": lead_id
     }
 
-@app.get("/leads", response_model=List[LeadResponse])
-async def get_leads():
-    """Get all scored leads."""
-    if not leads_storage:
-        return []
+@app.post("/score/batch", response_model=BatchScoreResponse)
+async def score_batch(leads: List[Any] = Body(...), model_version: ModelVersion = Depends(get_model)):
+    """
+    Score a batch of leads with a single model call.
     
+    Each lead is validated on its own; leads that fail validation are
+    reported in ``errors`` by their position in the request while the
+    remaining leads are scored and stored with contiguous lead ids
+    (unless DEDUP_POLICY merges some of them into stored leads, or finds
+    their email and phone number in two different leads, which is
+    reported in ``errors`` too).
+    """
+    if len(leads) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch contains {len(leads)} leads; the maximum is {MAX_BATCH_SIZE}"
+        )
+    
+    # Validate every lead, collecting per-item errors
+    valid_leads = []
+    errors = []
+    for index, item in enumerate(leads):
+        try:
+            valid_leads.append((index, LeadInput.parse_obj(item)))
+        except ValidationError as e:
+            errors.append({"index": index, "errors": format_validation_errors(e)})
+    
+    results = []
+    if valid_leads:
+        # One prediction call for the whole batch
+        scores = await score_and_store([lead for _, lead in valid_leads], model_version)
+        for (index, _), score in zip(valid_leads, scores):
+            if isinstance(score, str):
+                errors.append({"index": index, "errors": [score]})
+            else:
+                results.append({"index": index, **score})
+        errors.sort(key=lambda error: error["index"])
+    
+    return {
+        "scored": len(results),
+        "failed": len(errors),
+        "results": results,
+        "errors": errors
+    }
+
+def validate_import_rows(rows: List[Tuple[int, Union[Dict[str, Any], str]]],
+                         consent: bool) -> Tuple[List[Tuple[int, LeadInput]], List[Tuple[int, List[str]]]]:
+    """Validate parsed import rows like /score, returning each valid row's lead and each rejected row's errors."""
+    valid_leads = []
+    rejections = []
+    for row, record in rows:
+        if isinstance(record, str):
+            rejections.append((row, [record]))
+            continue
+        if consent:
+            record.setdefault('consent', True)
+        try:
+            valid_leads.append((row, LeadInput.parse_obj(record)))
+        except ValidationError as e:
+            rejections.append((row, format_validation_errors(e)))
+    return valid_leads, rejections
+
+@app.post("/leads/import", response_model=ImportJobResponse)
+async def import_leads(
+    request: Request,
+    format: Optional[Literal['csv', 'ndjson']] = Query(None, description="Defaults to the request Content-Type"),
+    consent: bool = Query(False, description="Record consent for rows without a consent field"),
+    model_version: ModelVersion = Depends(get_model)
+):
+    """
+    Import a CSV or NDJSON file of leads streamed in the request body.
+    
+    The body is parsed incrementally in chunks of IMPORT_CHUNK_SIZE rows;
+    each chunk is validated like /score, scored with one prediction call
+    and stored before the next one is read. Rows that fail to parse or
+    validate are reported by their 1-based data row number. Progress can
+    be followed with GET /leads/import/{job_id} while the upload runs.
+    """
+    import_format = format or import_format_for(request.headers.get('content-type', ''))
+    if import_format is None:
+        raise HTTPException(
+            status_code=415,
+            detail="Send text/csv or application/x-ndjson, or pass format=csv|ndjson"
+        )
+    
+    job = import_jobs.create(import_format)
+    try:
+        async for rows in iter_import_chunks(job.count_bytes(request.stream()), import_format, IMPORT_CHUNK_SIZE):
+            # Validating a chunk takes long enough to hold up other requests, so it runs on a worker thread
+            valid_leads, rejections = await asyncio.to_thread(validate_import_rows, rows, consent)
+            for row, errors in rejections:
+                job.reject(row, errors)
+            
+            if valid_leads:
+                scores = await score_and_store([lead for _, lead in valid_leads], model_version, offload=True)
+                for (row, _), score in zip(valid_leads, scores):
+                    if isinstance(score, str):
+                        job.reject(row, [score])
+                    else:
+                        job.scored += 1
+            job.rows_read += len(rows)
+    except ClientDisconnect:
+        job.finish(error="Client disconnected before the upload finished")
+        raise HTTPException(status_code=400, detail=job.error)
+    except HTTPException as e:
+        job.finish(error=str(e.detail))
+        raise
+    except Exception as e:
+        # Never leave a job running; ImportJobs only forgets finished ones
+        job.finish(error=f"Import failed: {e}")
+        raise
+
+    job.finish()
+    return job.summary()
+
+@app.get("/leads/import/{job_id}", response_model=ImportJobResponse)
+async def get_import_job(job_id: str):
+    job = import_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job.summary()
+
+@app.get("/leads/import", response_model=List[ImportJobResponse])
+async def list_import_jobs():
+    """List running and recently finished imports, oldest first."""
+    return [job.summary() for job in import_jobs.list()]
+
+@app.get("/leads", response_model=Union[LeadPage, List[LeadResponse]], dependencies=[Depends(sync_leads)])
+async def get_leads(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Number of leads per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor returned by the previous page"),
+    min_score: Optional[float] = Query(None, description="Lowest score to include"),
+    max_score: Optional[float] = Query(None, description="Highest score to include"),
+    sort: Literal['reranked_score', 'initial_score', 'lead_id'] = Query('reranked_score'),
+    order: Literal['asc', 'desc'] = Query('desc'),
+    all_leads: bool = Query(False, alias="all", description="Return every lead as a plain list (unpaginated)")
+):
+    """
+    Get scored leads one page at a time.
+    
+    Score filters apply to the sorted score, or to reranked_score when
+    sorting by lead_id. Pages sorted by score are read from a sorted
+    index, so a page costs O(log n + limit). Pass ``all=true`` for the
+    previous unpaginated list of every lead.
+    
+    Stored leads are trusted, so responses are encoded straight to JSON
+    without a pass through the response models, and compressed with br
+    or gzip when the client accepts it.
+    """
+    accept_encoding = request.headers.get("accept-encoding")
+    if all_leads:
+        return await json_response(encode_leads(lead_store), accept_encoding)
+    
+    after = decode_cursor(cursor, sort) if cursor else None
+    keys = iter_lead_keys(sort, order == 'desc', min_score, max_score, after)
+    
+    items = []
+    next_cursor = None
+    for key in keys:
+        if len(items) == limit:
+            # More leads match, so point the next page after the last one returned
+            next_cursor = encode_cursor(sort, last_key)
+            break
+        lead_id = key if sort == 'lead_id' else key[1]
+        items.append(format_lead(lead_store.get(lead_id, LeadResponse.__fields__)))
+        last_key = key
+    
+    return await json_response(encode_lead_page(items, next_cursor), accept_encoding)
+
+@app.get("/leads/export", dependencies=[Depends(sync_leads)])
+async def export_leads(
+    format: Literal['ndjson', 'csv', 'arrow'] = Query('ndjson'),
+    since_lead_id: int = Query(0, ge=0, description="Only export leads with a larger lead_id")
+):
+    """
+    Stream every stored lead with all of its fields as NDJSON, CSV or Arrow IPC.
+    
+    The export covers the leads stored when the request starts; the
+    X-Last-Lead-Id response header gives the since_lead_id to use for
+    the next incremental pull.
+    """
+    last_lead_id = len(lead_store)
+    media_type, _ = MEDIA_TYPES[format]
+    return StreamingResponse(
+        iter_export(lead_store, format, min(since_lead_id, last_lead_id), last_lead_id),
+        media_type=media_type,
+        headers=export_headers(format, last_lead_id)
+    )
+
+@app.get("/leads/by-contact", response_model=List[LeadResponse], dependencies=[Depends(sync_leads)])
+async def get_leads_by_contact(
+    email: Optional[str] = Query(None, description="Email address, matched case-insensitively"),
+    phone_number: Optional[str] = Query(None, description="Phone number, matched on its digits")
+):
+    """
+    Get the leads with an email address or phone number, oldest first.
+    
+    Looked up in the contact index, so the cost does not depend on the
+    number of stored leads. With DEDUP_POLICY 'replace' or 'max' a
+    contact has at most one lead.
+    """
+    if email is None and phone_number is None:
+        raise HTTPException(status_code=422, detail="Pass email, phone_number or both")
     return [
-        {
-            "lead_id": lead["lead_id"],
-            "email": lead["email"],
-            "initial_score": round(lead["initial_score"], 2),
-            "reranked_score": round(lead["reranked_score"], 2),
-            "comments": lead["comments"]
-        }
-        for lead in leads_storage
+        format_lead(lead_store.get(lead_id, LeadResponse.__fields__))
+        for lead_id in contact_index.find(email, phone_number)
     ]
 
-@app.get("/leads/stats", response_model=LeadStats)
-async def get_lead_stats():
-    """Get statistics about the leads."""
-    if not leads_storage:
-        return {
-            "total_leads": 0,
-            "high_intent_leads": 0,
-            "avg_initial_score": 0.0,
-            "avg_reranked_score": 0.0
-        }
-    
-    total_leads = len(leads_storage)
-    high_intent_leads = sum(1 for lead in leads_storage if lead["reranked_score"] >= 70)
-    avg_initial_score = sum(lead["initial_score"] for lead in leads_storage) / total_leads
-    avg_reranked_score = sum(lead["reranked_score"] for lead in leads_storage) / total_leads
+@app.get("/leads/search", response_model=SearchPage, dependencies=[Depends(sync_leads)])
+async def search_leads(
+    q: str = Query(..., description='Words to match in comments; "quoted phrases", OR between alternatives'),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Number of leads per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor returned by the previous page"),
+    min_score: Optional[float] = Query(None, description="Lowest reranked score to include"),
+    max_score: Optional[float] = Query(None, description="Highest reranked score to include"),
+    order: Literal['asc', 'desc'] = Query('desc', description="lead_id order")
+):
+    """
+    Search lead comments, e.g. ``q="pre-approved loan" OR "good schools"``.
+    
+    Every word must appear in a comment (case-insensitively, as a whole
+    word); quoted phrases must appear in order. Matches come from an
+    inverted index of the comments, so a query costs time in proportion
+    to the leads containing its rarest word, not to the number of stored
+    leads. total_matches counts every match after the score filters.
+    """
+    try:
+        lead_ids = comment_index.search(q)
+    except SearchQueryError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    if min_score is not None or max_score is not None:
+        scores = lead_store.column('reranked_score')[lead_ids - 1]
+        keep = np.ones(len(lead_ids), dtype=bool)
+        if min_score is not None:
+            keep &= scores >= min_score
+        if max_score is not None:
+            keep &= scores <= max_score
+        lead_ids = lead_ids[keep]
+    total_matches = len(lead_ids)
+    
+    if order == 'desc':
+        lead_ids = lead_ids[::-1]
+    if cursor:
+        after = decode_cursor(cursor, 'lead_id')
+        lead_ids = lead_ids[lead_ids < after] if order == 'desc' else lead_ids[lead_ids > after]
+    page = lead_ids[:limit].tolist()
     
     return {
-        "total_leads": total_leads,
-        "high_intent_leads": high_intent_leads,
-        "avg_initial_score": round(avg_initial_score, 2),
-        "avg_reranked_score": round(avg_reranked_score, 2)
+        "items": [format_lead(lead_store.get(lead_id, LeadResponse.__fields__)) for lead_id in page],
+        "next_cursor": encode_cursor('lead_id', page[-1]) if len(lead_ids) > limit else None,
+        "total_matches": total_matches
+    }
+
+@app.get("/leads/stream", dependencies=[Depends(sync_leads)])
+async def stream_leads():
+    """
+    Server-Sent Events with newly scored leads and statistics changes.
+    
+    The stream opens with a ``snapshot`` event holding the full /leads/stats
+    summary and the newest lead id. Leads stored within STREAM_WINDOW_MS of
+    each other are then pushed together as one ``leads`` event with the
+    newest STREAM_MAX_LEADS of them and only the statistics that changed.
+    A ``snapshot`` event with ``reset: true`` means every lead was dropped.
+    Clients that fall STREAM_BUFFER_SIZE events behind are disconnected and
+    reconnect to a fresh snapshot.
+    """
+    return StreamingResponse(
+        lead_events.events(len(lead_store)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/leads/stats", response_model=LeadStats, dependencies=[Depends(sync_leads)])
+async def get_lead_stats():
+    """Get statistics about the leads, maintained incrementally as leads are scored."""
+    return lead_aggregates.summary()
+
+@app.get("/leads/distribution", response_model=LeadDistributionStats, dependencies=[Depends(sync_leads)])
+async def get_lead_distribution():
+    """
+    Score percentiles and histograms, overall and per property type and location.
+
+    Percentiles come from quantile sketches updated as leads are scored, so
+    a read costs the same however many leads are stored. Each distribution
+    reports its rank_error: with 99% probability a reported p90 lies between
+    the true percentiles 90 - 100 * rank_error and 90 + 100 * rank_error.
+    That is 0.0165 until leads are replaced under DEDUP_POLICY, and grows
+    with each replacement. Histograms are exact counts per histogram_edges bin.
+    """
+    return lead_distributions.summary()
+
+@app.on_event("shutdown")
+async def shutdown_inference():
+    inference_executor.shutdown()
+
+@app.on_event("shutdown")
+async def shutdown_lead_log():
+    if lead_log is not None:
+        # A final snapshot keeps the next startup replay short
+        lead_log.snapshot(lead_store.capture())
+        lead_log.close()
+
+async def prepare_model(model_version: ModelVersion):
+    """Start inference workers for a model version before it is swapped in."""
+    await inference_executor.prepare(model_version.path)
+
+def model_swap_response(current: ModelVersion, replaced: Optional[ModelVersion]) -> Dict[str, Any]:
+    """Release what belonged to a replaced model version and describe the swap."""
+    if replaced is not None and replaced.path != current.path:
+        # Predictions already queued on the replaced version's workers still finish
+        inference_executor.retire(replaced.path)
+    prediction_cache.invalidate(current.version)
+    return {
+        "changed": replaced is not None,
+        "current": current.info(),
+        "replaced": replaced.info() if replaced is not None else None
     }
 
+async def watch_published_model():
+    """Reload the model whenever a new model file is published to MODEL_DIR."""
+    signature = model_registry.published_signature()
+    while True:
+        await asyncio.sleep(MODEL_WATCH_SECONDS)
+        latest = model_registry.published_signature()
+        if latest is None or latest == signature or model_registry.reloading:
+            continue
+        signature = latest
+        try:
+            current, replaced = await model_registry.reload(prepare=prepare_model)
+            model_swap_response(current, replaced)
+            if replaced is not None:
+                print(f"Model version {current.version} swapped in, replacing {replaced.version}")
+        except Exception as e:
+            # The registry keeps serving the current version and records the error
+            print(f"Automatic model reload failed: {e}")
+
+model_watch_task: Optional[asyncio.Task] = None
+model_load_task: Optional[asyncio.Task] = None
+stream_sync_task: Optional[asyncio.Task] = None
+
+async def sync_stream_leads():
+    """Pick up other workers' leads while stream clients are connected, so they are pushed without a read request."""
+    while True:
+        await asyncio.sleep(STREAM_SYNC_SECONDS)
+        if lead_events.subscribers:
+            await sync_leads()
+
+def model_loading() -> bool:
+    return model_load_task is not None and not model_load_task.done()
+
+async def load_model_in_background():
+    """Load, warm and swap in the published model while the server already answers requests."""
+    try:
+        current, replaced = await model_registry.reload(prepare=prepare_model)
+        model_swap_response(current, replaced)
+        report_model_loaded(current)
+    except FileNotFoundError:
+        print("Model or feature columns not found. Please run setup_model.py first.")
+    except Exception as e:
+        print(f"Model could not be loaded: {e}")
+
+@app.on_event("startup")
+async def start_background_model_load():
+    global model_load_task
+    if MODEL_LOAD_MODE == 'background' and model_registry.current is None:
+        model_load_task = asyncio.get_running_loop().create_task(load_model_in_background())
+
+@app.on_event("startup")
+async def start_model_watch():
+    global model_watch_task
+    if MODEL_WATCH_SECONDS > 0:
+        model_watch_task = asyncio.get_running_loop().create_task(watch_published_model())
+
+@app.on_event("shutdown")
+async def stop_model_watch():
+    if model_watch_task is not None:
+        model_watch_task.cancel()
+
+@app.on_event("startup")
+async def start_stream_sync():
+    global stream_sync_task
+    if lead_log is not None and lead_log.shared:
+        stream_sync_task = asyncio.get_running_loop().create_task(sync_stream_leads())
+
+@app.on_event("shutdown")
+async def stop_stream_sync():
+    if stream_sync_task is not None:
+        stream_sync_task.cancel()
+
+@app.get("/model", response_model=ModelStatus)
+async def get_model_status():
+    """Current model version with its load and warm-up times, and the versions available for rollback."""
+    return {**model_registry.status(), "watch_seconds": MODEL_WATCH_SECONDS}
+
+@app.get("/model/versions", response_model=List[ArchivedModelVersion])
+async def list_model_versions():
+    """Model versions archived under MODEL_DIR/versions, newest first."""
+    return await asyncio.to_thread(model_registry.versions)
+
+@app.post("/model/reload", response_model=ModelSwapResponse)
+async def reload_model():
+    """
+    Load the published model file and swap it in without downtime.
+    
+    The model is unpickled, compiled and warmed up on a worker thread
+    while /score keeps serving the current version; requests that
+    started before the swap finish on the version they started with.
+    The current version stays in place if the new one fails to load.
+    """
+    try:
+        current, replaced = await model_registry.reload(prepare=prepare_model)
+    except ModelReloadInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Model or feature columns file not found in the model directory")
+    except ModelLoadError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return model_swap_response(current, replaced)
+
+@app.post("/model/rollback", response_model=ModelSwapResponse)
+async def rollback_model(version: Optional[str] = Query(None, description="Archived version id; defaults to the previous version")):
+    """Swap the previous model version, or a given archived version, back in."""
+    try:
+        current, replaced = await model_registry.rollback(version, prepare=prepare_model)
+    except ModelReloadInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except (LookupError, FileNotFoundError) as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ModelLoadError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return model_swap_response(current, replaced)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Request, stage, store, cache and batching metrics in the Prometheus text format."""
+    cache = prediction_cache.stats()
+    current = model_registry.current
+    gauges = [
+        render_metric('lead_scoring_leads', 'gauge', 'Leads in the in-memory store',
+                      [('', {}, len(lead_store))]),
+        render_metric('lead_scoring_lead_store_bytes', 'gauge', 'Memory held by the lead store columns',
+                      [('', {}, lead_store.nbytes)]),
+        render_metric('lead_scoring_inference_pending', 'gauge', 'Predictions waiting on the inference executor',
+                      [('', {}, inference_executor.pending)]),
+        render_metric('lead_scoring_prediction_cache_entries', 'gauge', 'Initial scores held by the prediction cache',
+                      [('', {}, cache["size"])]),
+        render_metric('lead_scoring_prediction_cache_lookups_total', 'counter', 'Prediction cache lookups by result',
+                      [('', {'result': 'hit'}, cache["hits"]), ('', {'result': 'miss'}, cache["misses"])]),
+        render_metric('lead_scoring_prediction_cache_removals_total', 'counter', 'Prediction cache entries removed by reason',
+                      [('', {'reason': reason}, cache[key]) for reason, key in
+                       (('evicted', 'evictions'), ('expired', 'expirations'))]),
+        render_metric('lead_scoring_score_batch_size', 'histogram', 'Requests coalesced into one /score prediction',
+                      score_batcher.batch_sizes.samples()),
+        render_metric('lead_scoring_score_queue_wait_seconds', 'histogram', 'Time a /score request waits for its batch',
+                      score_batcher.queue_wait_seconds.samples()),
+        render_metric('lead_scoring_model_info', 'gauge', 'Model version being served',
+                      [('', {'version': current.version, 'compiled': str(current.compiled is not None).lower()}, 1)]
+                      if current is not None else []),
+    ]
+    return PlainTextResponse(
+        request_metrics.render() + ''.join(gauges),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+@app.post("/metrics/enabled")
+async def set_metrics_enabled(enabled: bool = Query(..., description="Record request and stage metrics")):
+    """Switch request instrumentation on or off without a restart."""
+    request_metrics.enabled = enabled
+    return {"enabled": request_metrics.enabled}
+
+@app.get("/score/batching")
+async def get_batching_stats():
+    """Batch-size and queue-wait histograms of the /score request coalescer."""
+    return {**score_batcher.stats(), "inference": inference_executor.stats()}
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
     return {
-        "status": "healthy",
-        "model_loaded": model is not None and feature_columns is not None,
-        "leads_count": len(leads_storage)
+        "status": "degraded" if lead_log is not None and lead_log.write_error is not None else "healthy",
+        "model_loaded": model_registry.current is not None,
+        "model_loading": model_loading(),
+        "model_version": model_registry.current.version if model_registry.current is not None else None,
+        "compiled_model": model_registry.current is not None and model_registry.current.compiled is not None,
+        "leads_count": len(lead_store),
+        "dedup_policy": DEDUP_POLICY,
+        "search_index": comment_index.stats(),
+        "lead_store_bytes": lead_store.nbytes,
+        "persistence": lead_log.stats() if lead_log is not None else None,
+        "prediction_cache": prediction_cache.stats(),
+        "lead_stream": lead_events.summary()
     }
 
+# Route templates for request labels on servers that do not record the matched route
+request_metrics.register_routes(app.routes)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
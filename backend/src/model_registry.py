@@ -0,0 +1,355 @@
+import asyncio
+import hashlib
+import io
+import os
+import re
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from metrics import request_metrics
+
+MODEL_FILE = 'lead_scoring_model.pkl'
+FEATURE_COLUMNS_FILE = 'feature_columns.pkl'
+VERSIONS_DIR = 'versions'
+# Memory-mappable CompiledModel arrays saved in each archived version
+COMPILED_DIR = 'compiled'
+
+# Versions are the first 12 hex digits of the model file's SHA-256
+VERSION_PATTERN = re.compile(r'[0-9a-f]{12}')
+
+# Batch sizes of the warm-up predictions run before a version is swapped in
+WARMUP_BATCH_SIZES = (1, 64)
+
+class ModelLoadError(Exception):
+    """Raised when a model version cannot be loaded or fails its warm-up predictions."""
+
+class ModelReloadInProgress(Exception):
+    """Raised when a reload or rollback is requested while another one is running."""
+
+class ModelVersion:
+    """
+    One loaded model version.
+
+    Holds the fitted pipeline, its feature lists and, when the pipeline
+    could be compiled, the CompiledModel used for scoring. A version is
+    never modified after loading: requests keep a reference to the
+    version they started with, so swapping in another version does not
+    change the model under a request that is already running.
+
+    A version loaded from its saved CompiledModel has no pipeline in
+    memory; ``pipeline`` unpickles it from ``path`` on first use.
+    """
+
+    def __init__(self, version: str, path: str, pipeline: Any, feature_columns: Dict[str, List[str]],
+                 compiled: Any = None, load_seconds: float = 0.0):
+        self.version = version
+        self.path = path
+        self._pipeline = pipeline
+        self.feature_columns = feature_columns
+        self.compiled = compiled
+        self.load_seconds = load_seconds
+        self.warmup_seconds = 0.0
+        self.loaded_at = datetime.now(timezone.utc)
+        self.activated_at: Optional[datetime] = None
+
+    @property
+    def pipeline(self) -> Any:
+        if self._pipeline is None:
+            import joblib
+            self._pipeline = joblib.load(self.path)
+        return self._pipeline
+
+    def predict(self, records: List[Mapping[str, Any]]) -> np.ndarray:
+        """Return the high intent probability (0-100) for each feature record."""
+        start = time.perf_counter()
+        if self.compiled is not None:
+            X = self.compiled.transform(records)
+            request_metrics.thread_stage('frame', start)
+            start = time.perf_counter()
+            scores = self.compiled.predict_proba_transformed(X)[:, 1] * 100
+        else:
+            import pandas as pd
+            frame = pd.DataFrame(records)
+            request_metrics.thread_stage('frame', start)
+            start = time.perf_counter()
+            scores = self.pipeline.predict_proba(frame)[:, 1] * 100
+        request_metrics.thread_stage('model', start)
+        return scores
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "path": self.path,
+            "classifier": (self.compiled.classifier if self.compiled is not None
+                           else type(self.pipeline.steps[-1][1]).__name__),
+            "compiled": self.compiled is not None,
+            "n_trees": self.compiled.n_trees if self.compiled is not None else None,
+            "loaded_at": self.loaded_at.isoformat(),
+            "activated_at": self.activated_at.isoformat() if self.activated_at else None,
+            "load_seconds": round(self.load_seconds, 4),
+            "warmup_seconds": round(self.warmup_seconds, 4),
+        }
+
+class ModelRegistry:
+    """
+    Versioned lead scoring models under ``model_dir``.
+
+    ``model_dir`` holds the model published by train_model.py. Every
+    distinct model file is archived under ``versions/<version>/``, where
+    the version is a hash of the file's bytes, so older versions can be
+    reloaded by id and process workers load an immutable copy.
+
+    ``reload`` reads, compiles and warms a version on a worker thread,
+    leaving the event loop free, then replaces ``current`` with a single
+    assignment. The replaced versions stay in memory, newest first, so
+    ``rollback`` is instant for the last ``keep`` of them.
+    """
+
+    def __init__(self, model_dir: str, use_compiled: bool = True,
+                 warmup_records: Optional[List[Mapping[str, Any]]] = None, keep: int = 3):
+        self.model_dir = os.path.normpath(model_dir)
+        self.use_compiled = use_compiled
+        self.warmup_records = warmup_records or []
+        self.keep = keep
+        self.current: Optional[ModelVersion] = None
+        self.previous: List[ModelVersion] = []
+        self.reloading = False
+        self.last_error: Optional[str] = None
+
+    @property
+    def model_path(self) -> str:
+        return os.path.join(self.model_dir, MODEL_FILE)
+
+    def version_dir(self, version: str) -> str:
+        if not VERSION_PATTERN.fullmatch(version):
+            raise LookupError(f"Invalid model version {version!r}")
+        return os.path.join(self.model_dir, VERSIONS_DIR, version)
+
+    def resolve(self, version: Optional[str] = None) -> Tuple[str, str]:
+        """
+        The version id and directory of an archived version, or of the published model.
+
+        The published model resolves to its archived copy when there is
+        one, whose saved CompiledModel can be memory-mapped.
+
+        Raises:
+            FileNotFoundError: If the version is not archived or no model is published
+            LookupError: If ``version`` is not a version id
+        """
+        if version is not None:
+            directory = self.version_dir(version)
+            if not os.path.exists(os.path.join(directory, MODEL_FILE)):
+                raise FileNotFoundError(f"Model version {version} is not archived in {self.model_dir}")
+            return version, directory
+        with open(self.model_path, 'rb') as f:
+            version = hashlib.sha256(f.read()).hexdigest()[:12]
+        directory = self.version_dir(version)
+        if not os.path.exists(os.path.join(directory, MODEL_FILE)):
+            directory = self.model_dir
+        return version, directory
+
+    def published_signature(self) -> Optional[Tuple[int, int]]:
+        """Size and mtime of the published model file, used to notice a new one."""
+        try:
+            stat = os.stat(self.model_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def versions(self) -> List[Dict[str, Any]]:
+        """Archived versions, newest first."""
+        root = os.path.join(self.model_dir, VERSIONS_DIR)
+        try:
+            names = os.listdir(root)
+        except FileNotFoundError:
+            return []
+        loaded = {v.version for v in [self.current, *self.previous] if v is not None}
+        result = []
+        for name in names:
+            path = os.path.join(root, name, MODEL_FILE)
+            if os.path.exists(path):
+                result.append({
+                    "version": name,
+                    "archived_at": datetime.fromtimestamp(os.path.getmtime(path), timezone.utc).isoformat(),
+                    "current": self.current is not None and self.current.version == name,
+                    "in_memory": name in loaded,
+                })
+        return sorted(result, key=lambda v: v["archived_at"], reverse=True)
+
+    def _archive(self, version: str, model_bytes: bytes, feature_bytes: bytes) -> str:
+        """Copy a version's files under versions/ and return its model path there."""
+        directory = self.version_dir(version)
+        path = os.path.join(directory, MODEL_FILE)
+        if os.path.exists(path):
+            return path
+        try:
+            os.makedirs(directory, exist_ok=True)
+            # The feature file goes first; the model file marks a complete archive
+            for name, data in ((FEATURE_COLUMNS_FILE, feature_bytes), (MODEL_FILE, model_bytes)):
+                temporary = os.path.join(directory, name + '.tmp')
+                with open(temporary, 'wb') as f:
+                    f.write(data)
+                os.replace(temporary, os.path.join(directory, name))
+        except OSError as e:
+            # A read-only model directory still serves the published files
+            print(f"Could not archive model version {version}: {e}")
+            return self.model_path
+        return path
+
+    def load(self, version: Optional[str] = None) -> ModelVersion:
+        """
+        Load the published model, or an archived version, without activating it.
+
+        Blocking; ``reload`` runs it on a worker thread. When the files hold
+        a version that is already in memory, that version is returned as is.
+
+        An archived version whose CompiledModel was saved is served from
+        those arrays, memory-mapped, without unpickling the pipeline, so
+        neither sklearn nor pandas is imported. Otherwise the pipeline is
+        unpickled and compiled, and the compiled arrays are saved for the
+        next load.
+
+        Raises:
+            FileNotFoundError: If the model or feature columns file is missing
+            LookupError: If ``version`` is not a version id
+            ModelLoadError: If the files cannot be unpickled or the model
+                fails its warm-up predictions
+        """
+        from compiled_model import CompilationError, CompiledModel, compile_pipeline
+
+        start = time.perf_counter()
+        directory = self.model_dir if version is None else self.version_dir(version)
+        with open(os.path.join(directory, MODEL_FILE), 'rb') as f:
+            model_bytes = f.read()
+        with open(os.path.join(directory, FEATURE_COLUMNS_FILE), 'rb') as f:
+            feature_bytes = f.read()
+
+        digest = hashlib.sha256(model_bytes).hexdigest()[:12]
+        for loaded in [self.current, *self.previous]:
+            if loaded is not None and loaded.version == digest:
+                return loaded
+
+        compiled_dir = os.path.join(self.version_dir(digest), COMPILED_DIR)
+        if self.use_compiled:
+            try:
+                compiled = CompiledModel.load(compiled_dir)
+                feature_columns = compiled.metadata['feature_columns']
+            except (OSError, ValueError, KeyError, CompilationError):
+                # Missing, partial or from another release: compile from the pipeline instead
+                pass
+            else:
+                path = self._archive(digest, model_bytes, feature_bytes)
+                loaded = ModelVersion(digest, path, None, feature_columns, compiled,
+                                      load_seconds=time.perf_counter() - start)
+                self._warm(loaded)
+                return loaded
+
+        import joblib
+
+        try:
+            pipeline = joblib.load(io.BytesIO(model_bytes))
+            feature_columns = joblib.load(io.BytesIO(feature_bytes))
+        except Exception as e:
+            raise ModelLoadError(f"Could not unpickle model version {digest}: {e}")
+
+        compiled = None
+        if self.use_compiled:
+            try:
+                compiled = compile_pipeline(pipeline)
+            except CompilationError as e:
+                print(f"Model {digest} could not be compiled, using the sklearn pipeline: {e}")
+
+        path = self._archive(digest, model_bytes, feature_bytes)
+        if compiled is not None and path != self.model_path:
+            try:
+                compiled.save(compiled_dir, {'feature_columns': feature_columns})
+            except (OSError, CompilationError) as e:
+                print(f"Could not save compiled model version {digest}: {e}")
+        loaded = ModelVersion(digest, path, pipeline, feature_columns, compiled,
+                              load_seconds=time.perf_counter() - start)
+        self._warm(loaded)
+        return loaded
+
+    def _warm(self, loaded: ModelVersion):
+        """Run a few predictions so the first request after the swap is not the slow one."""
+        start = time.perf_counter()
+        for size in WARMUP_BATCH_SIZES if self.warmup_records else ():
+            records = [self.warmup_records[i % len(self.warmup_records)] for i in range(size)]
+            try:
+                scores = np.asarray(loaded.predict(records))
+            except Exception as e:
+                raise ModelLoadError(f"Model version {loaded.version} failed its warm-up predictions: {e}")
+            if scores.shape != (size,) or not np.all(np.isfinite(scores)):
+                raise ModelLoadError(f"Model version {loaded.version} returned invalid warm-up scores")
+        loaded.warmup_seconds = time.perf_counter() - start
+
+    def activate(self, loaded: ModelVersion) -> Optional[ModelVersion]:
+        """Make a loaded version current and return the version it replaced."""
+        replaced = self.current
+        if loaded is replaced:
+            return None
+        self.previous = [v for v in self.previous if v is not loaded]
+        if replaced is not None:
+            self.previous = [replaced, *self.previous][:self.keep]
+        loaded.activated_at = datetime.now(timezone.utc)
+        self.current = loaded
+        return replaced
+
+    async def _swap(self, load: Callable[[], ModelVersion],
+                    prepare: Optional[Callable[[ModelVersion], Awaitable[None]]]
+                    ) -> Tuple[ModelVersion, Optional[ModelVersion]]:
+        if self.reloading:
+            raise ModelReloadInProgress("A model reload is already in progress")
+        self.reloading = True
+        try:
+            loaded = await asyncio.to_thread(load)
+            if loaded is not self.current and prepare is not None:
+                await prepare(loaded)
+            replaced = self.activate(loaded)
+            self.last_error = None
+            return loaded, replaced
+        except Exception as e:
+            self.last_error = str(e)
+            raise
+        finally:
+            self.reloading = False
+
+    async def reload(self, version: Optional[str] = None,
+                     prepare: Optional[Callable[[ModelVersion], Awaitable[None]]] = None
+                     ) -> Tuple[ModelVersion, Optional[ModelVersion]]:
+        """
+        Load and warm the published model (or an archived ``version``) off
+        the event loop, await ``prepare`` with it, then make it current.
+
+        Returns the new current version and the version it replaced (None
+        if the files were already being served). The current version is
+        left untouched when loading fails.
+        """
+        return await self._swap(lambda: self.load(version), prepare)
+
+    async def rollback(self, version: Optional[str] = None,
+                       prepare: Optional[Callable[[ModelVersion], Awaitable[None]]] = None
+                       ) -> Tuple[ModelVersion, Optional[ModelVersion]]:
+        """Make the previous version, or the given archived version, current again."""
+        if version is None:
+            if not self.previous:
+                raise LookupError("No previous model version to roll back to")
+            target = self.previous[0]
+            return await self._swap(lambda: target, prepare)
+        for loaded in self.previous:
+            if loaded.version == version:
+                return await self._swap(lambda: loaded, prepare)
+        if not os.path.exists(os.path.join(self.version_dir(version), MODEL_FILE)):
+            raise LookupError(f"Model version {version} not found")
+        return await self.reload(version, prepare)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "current": self.current.info() if self.current is not None else None,
+            "previous": [v.info() for v in self.previous],
+            "reloading": self.reloading,
+            "last_error": self.last_error,
+        }
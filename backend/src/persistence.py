@@ -0,0 +1,518 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+PERSISTENCE_BACKENDS = ('none', 'ndjson', 'sqlite', 'shared')
+
+# Events handed to the caller per replay chunk
+REPLAY_CHUNK_SIZE = 10000
+
+# Most events written and fsynced in one group commit
+MAX_COMMIT_BATCH = 10000
+
+# Seconds between attempts to write events whose commit failed
+RETRY_SECONDS = 1.0
+
+_FLUSH = 'flush'
+_SNAPSHOT = 'snapshot'
+_EVENT = 'event'
+_IDLE = (_FLUSH, None, None)
+
+# Store columns for a snapshot, or a function that copies them when the snapshot is written
+SnapshotArrays = Union[Dict[str, np.ndarray], Callable[[], Dict[str, np.ndarray]]]
+
+class LeadLogError(RuntimeError):
+    """Raised when new leads cannot be accepted because logged ones are failing to commit."""
+
+class LeadLog:
+    """
+    Append-only log of stored leads with snapshots, written by a background thread.
+
+    ``append`` only enqueues the event, so no disk write happens on the
+    request path. The writer thread drains everything queued, writes it
+    and fsyncs once per batch (group commit), waiting at most
+    ``commit_interval_ms`` between commits to let batches grow. Events
+    accepted but not yet committed are lost if the process crashes.
+
+    Every event carries a sequence number. A snapshot records the store
+    columns together with the last sequence number they include, after
+    which the log entries it covers are discarded. Restarting replays the
+    snapshot plus the events after it.
+
+    A batch whose write fails is kept and retried until it commits or a
+    snapshot covers it; meanwhile ``check`` raises, so callers can stop
+    accepting leads rather than lose them silently.
+    """
+
+    def __init__(self, directory: str, commit_interval_ms: float = 10.0):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.snapshot_path = os.path.join(directory, 'leads.snapshot.npz')
+        self.commit_interval = commit_interval_ms / 1000
+        self.last_seq = 0
+        self.snapshot_seq = 0
+        self.committed_seq = 0
+        self.commits = 0
+        self.error: Optional[BaseException] = None
+        # Set while logged events are failing to commit, cleared once they do
+        self.write_error: Optional[BaseException] = None
+        self.uncommitted = 0
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    # Whether every worker process reads and writes the leads in the log (see SharedLeadLog)
+    shared = False
+
+    @property
+    def events_since_snapshot(self) -> int:
+        return self.last_seq - self.snapshot_seq
+
+    # Request path (event loop thread)
+
+    def start(self):
+        """Start the writer thread; call after replay."""
+        self._thread = threading.Thread(target=self._run, name='lead-log-writer', daemon=True)
+        self._thread.start()
+
+    def append(self, lead: Mapping[str, Any]):
+        """Queue a stored lead for durable logging."""
+        self.last_seq += 1
+        self._queue.put((_EVENT, self.last_seq, lead))
+
+    def check(self):
+        """Raise LeadLogError while logged events are failing to commit."""
+        error = self.write_error
+        if error is not None:
+            raise LeadLogError(f"Lead log writes are failing ({self.uncommitted} events uncommitted): {error!r}") from error
+
+    def snapshot(self, arrays: SnapshotArrays):
+        """
+        Queue a snapshot of store columns that include every event appended so far.
+
+        ``arrays`` may be a function that copies the columns (see
+        ``LeadStore.capture``), in which case the copy is taken on the
+        writer thread rather than on the caller's.
+        """
+        self.snapshot_seq = self.last_seq
+        self._queue.put((_SNAPSHOT, self.last_seq, arrays))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued so far is committed."""
+        done = threading.Event()
+        self._queue.put((_FLUSH, done, None))
+        return done.wait(timeout)
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "last_seq": self.last_seq,
+            "committed_seq": self.committed_seq,
+            "snapshot_seq": self.snapshot_seq,
+            "commits": self.commits,
+            "uncommitted": self.uncommitted,
+            "error": repr(self.error) if self.error else None,
+            "write_error": repr(self.write_error) if self.write_error else None,
+        }
+
+    # Replay (before the writer starts)
+
+    def replay(self) -> Tuple[Optional[Dict[str, np.ndarray]], Iterator[List[Dict[str, Any]]]]:
+        """Return the latest snapshot arrays (or None) and an iterator of event chunks after it."""
+        arrays = None
+        if os.path.exists(self.snapshot_path):
+            with np.load(self.snapshot_path) as snapshot:
+                arrays = {name: snapshot[name] for name in snapshot.files}
+            self.snapshot_seq = self.last_seq = self.committed_seq = int(arrays.pop('last_seq'))
+        return arrays, self._replay_events()
+
+    def _replay_events(self) -> Iterator[List[Dict[str, Any]]]:
+        chunk = []
+        for event in self._read_events(self.snapshot_seq):
+            self.last_seq = self.committed_seq = event['seq']
+            chunk.append(event)
+            if len(chunk) == REPLAY_CHUNK_SIZE:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    # Writer thread
+
+    def _run(self):
+        self._open_writer()
+        last_commit = 0.0
+        # Events whose write failed, retried ahead of newer ones
+        failed: List[Tuple[int, Mapping[str, Any]]] = []
+        while True:
+            try:
+                item = self._queue.get(timeout=RETRY_SECONDS) if failed else self._queue.get()
+            except queue.Empty:
+                item = _IDLE
+            events, failed = failed, []
+            while item is not None and item[0] == _EVENT:
+                events.append((item[1], item[2]))
+                if len(events) >= MAX_COMMIT_BATCH:
+                    item = _IDLE
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    # Give the batch until the commit interval to grow
+                    wait = self.commit_interval - (time.monotonic() - last_commit)
+                    try:
+                        item = self._queue.get(timeout=wait) if wait > 0 else _IDLE
+                    except queue.Empty:
+                        item = _IDLE
+
+            if events:
+                try:
+                    self._write_events(events)
+                    self.committed_seq = events[-1][0]
+                    self.commits += 1
+                    self.write_error = None
+                except Exception as e:
+                    self.error = self.write_error = e
+                    failed = events
+                self.uncommitted = len(failed)
+                last_commit = time.monotonic()
+
+            if item is None:
+                self._close_writer()
+                return
+            kind, payload, arrays = item
+            if kind == _SNAPSHOT:
+                try:
+                    self._write_snapshot(payload, arrays() if callable(arrays) else arrays)
+                    self._discard_events(payload)
+                    # Events still failing were queued before the snapshot, so it holds them
+                    failed = [event for event in failed if event[0] > payload]
+                    if not failed:
+                        self.write_error = None
+                    self.uncommitted = len(failed)
+                except Exception as e:
+                    self.error = e
+            elif kind == _FLUSH and payload is not None:
+                payload.set()
+
+    def _write_snapshot(self, seq: int, arrays: Dict[str, np.ndarray]):
+        # Per-process name, since workers sharing the directory may snapshot at the same time
+        temporary = f"{self.snapshot_path}.{os.getpid()}.tmp.npz"
+        with open(temporary, 'wb') as f:
+            np.savez(f, last_seq=np.array(seq, dtype=np.int64), **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.snapshot_path)
+
+    # Backend hooks
+
+    backend = 'none'
+
+    def _open_writer(self):
+        raise NotImplementedError
+
+    def _close_writer(self):
+        raise NotImplementedError
+
+    def _write_events(self, events: List[Tuple[int, Mapping[str, Any]]]):
+        raise NotImplementedError
+
+    def _discard_events(self, upto_seq: int):
+        raise NotImplementedError
+
+    def _read_events(self, after_seq: int) -> Iterator[Dict[str, Any]]:
+        raise NotImplementedError
+
+class NDJSONLeadLog(LeadLog):
+    """Lead log stored as one JSON object per line in ``leads.log.ndjson``."""
+
+    backend = 'ndjson'
+
+    def __init__(self, directory: str, commit_interval_ms: float = 10.0):
+        super().__init__(directory, commit_interval_ms)
+        self.log_path = os.path.join(directory, 'leads.log.ndjson')
+        self._file = None
+
+    def _open_writer(self):
+        # Unbuffered, so a failed write leaves nothing behind to be flushed later
+        self._file = open(self.log_path, 'ab', buffering=0)
+
+    def _close_writer(self):
+        self._file.close()
+
+    def _write_events(self, events):
+        data = memoryview(b''.join(
+            json.dumps({"seq": seq, **lead}).encode('utf-8') + b'\n' for seq, lead in events
+        ))
+        position = self._file.seek(0, os.SEEK_END)
+        try:
+            while data:
+                data = data[self._file.write(data):]
+            os.fsync(self._file.fileno())
+        except Exception:
+            # Cut off a partly written batch, so its retry does not follow a torn line
+            try:
+                self._file.truncate(position)
+            except OSError:
+                pass
+            raise
+
+    def _discard_events(self, upto_seq):
+        # The writer thread is the only appender, so the log holds exactly the snapshotted events
+        self._file.truncate(0)
+        os.fsync(self._file.fileno())
+
+    def _read_events(self, after_seq):
+        if not os.path.exists(self.log_path):
+            return
+        good_bytes = 0
+        with open(self.log_path, 'rb') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    # A crash mid-write leaves a torn final line; drop it
+                    break
+                good_bytes += len(line)
+                if event['seq'] > after_seq:
+                    yield event
+        if good_bytes < os.path.getsize(self.log_path):
+            with open(self.log_path, 'r+b') as f:
+                f.truncate(good_bytes)
+
+class SQLiteLeadLog(LeadLog):
+    """Lead log stored in a SQLite database in WAL mode, one transaction per group commit."""
+
+    backend = 'sqlite'
+
+    def __init__(self, directory: str, commit_interval_ms: float = 10.0):
+        super().__init__(directory, commit_interval_ms)
+        self.db_path = os.path.join(directory, 'leads.sqlite3')
+        self._connection = None
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS lead_events (seq INTEGER PRIMARY KEY, record TEXT NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=FULL")
+        return connection
+
+    def _open_writer(self):
+        self._connection = self._connect()
+
+    def _close_writer(self):
+        self._connection.close()
+
+    def _write_events(self, events):
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO lead_events (seq, record) VALUES (?, ?)",
+                ((seq, json.dumps(lead)) for seq, lead in events)
+            )
+
+    def _discard_events(self, upto_seq):
+        with self._connection:
+            self._connection.execute("DELETE FROM lead_events WHERE seq <= ?", (upto_seq,))
+
+    def _read_events(self, after_seq):
+        connection = self._connect()
+        try:
+            cursor = connection.execute(
+                "SELECT seq, record FROM lead_events WHERE seq > ? ORDER BY seq", (after_seq,)
+            )
+            while True:
+                rows = cursor.fetchmany(REPLAY_CHUNK_SIZE)
+                if not rows:
+                    break
+                for seq, record in rows:
+                    event = json.loads(record)
+                    event['seq'] = seq
+                    yield event
+        finally:
+            connection.close()
+
+class SharedLeadLog(LeadLog):
+    """
+    Leads of every worker process in one SQLite table, with ids allocated by the database.
+
+    Each worker keeps its own columnar copy of the table and calls
+    ``sync`` to bring it up to date: before serving reads, and in the
+    same write transaction that appends its own leads. SQLite's write
+    lock serializes appends across processes, so lead ids are unique
+    and every copy holds the same leads in the same order. Clearing the
+    table bumps a generation number, which tells the other workers to
+    drop their copies.
+
+    Appends are committed synchronously in WAL mode with
+    ``synchronous=NORMAL``: a committed lead survives a worker crash but
+    not necessarily a power loss. The writer thread only writes
+    snapshots, which speed up restarts; rows are never discarded, since
+    other workers may not have read them yet.
+    """
+
+    backend = 'shared'
+    shared = True
+
+    def __init__(self, directory: str, commit_interval_ms: float = 10.0):
+        super().__init__(directory, commit_interval_ms)
+        self.db_path = os.path.join(directory, 'leads.shared.sqlite3')
+        self.snapshot_path = os.path.join(directory, 'leads.shared.snapshot.npz')
+        self.generation = 0
+        self.appends = 0
+        # sync and clear may be called from worker threads (so they do not block
+        # an event loop while another process holds the write lock), one at a time
+        self._connection = self._connect()
+        self._lock = threading.Lock()
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS leads (lead_id INTEGER PRIMARY KEY, record TEXT NOT NULL)"
+            )
+            self._connection.execute("CREATE TABLE IF NOT EXISTS generation (value INTEGER NOT NULL)")
+            self._connection.execute(
+                "INSERT INTO generation (value) SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM generation)"
+            )
+        self._connection.isolation_level = None
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _read_generation(self) -> int:
+        return self._connection.execute("SELECT value FROM generation").fetchone()[0]
+
+    def sync(self, store_size: int, leads: Sequence[Mapping[str, Any]] = ()) -> Tuple[bool, List[Dict[str, Any]], int]:
+        """
+        Fetch the leads a copy of ``store_size`` rows is missing, then append ``leads``, atomically.
+
+        Returns whether the table was cleared since the last sync (the
+        missing leads then start from lead 1), the missing leads in id
+        order, and the id of the first appended lead.
+        """
+        with self._lock:
+            return self._sync(store_size, leads)
+
+    def _sync(self, store_size: int, leads: Sequence[Mapping[str, Any]]) -> Tuple[bool, List[Dict[str, Any]], int]:
+        connection = self._connection
+        connection.execute("BEGIN IMMEDIATE" if leads else "BEGIN")
+        try:
+            generation = self._read_generation()
+            cleared = generation != self.generation
+            after = 0 if cleared else store_size
+            missing = []
+            for lead_id, record in connection.execute(
+                "SELECT lead_id, record FROM leads WHERE lead_id > ? ORDER BY lead_id", (after,)
+            ):
+                event = json.loads(record)
+                event['lead_id'] = lead_id
+                missing.append(event)
+            first = after + len(missing) + 1
+            if leads:
+                connection.executemany(
+                    "INSERT INTO leads (lead_id, record) VALUES (?, ?)",
+                    ((lead_id, json.dumps(lead)) for lead_id, lead in enumerate(leads, first))
+                )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        self.generation = generation
+        self.last_seq = self.committed_seq = first + len(leads) - 1
+        if cleared:
+            self.snapshot_seq = 0
+        self.appends += len(leads)
+        return cleared, missing, first
+
+    def clear(self):
+        """Delete every lead for all workers."""
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute("DELETE FROM leads")
+                connection.execute("UPDATE generation SET value = value + 1")
+                self.generation = self._read_generation()
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            self.last_seq = self.committed_seq = self.snapshot_seq = 0
+
+    def append(self, lead: Mapping[str, Any]):
+        raise NotImplementedError("Shared lead logs are appended to with sync()")
+
+    def snapshot(self, arrays: SnapshotArrays):
+        generation = np.array(self.generation, dtype=np.int64)
+        if callable(arrays):
+            super().snapshot(lambda: {**arrays(), 'generation': generation})
+        else:
+            super().snapshot({**arrays, 'generation': generation})
+
+    def replay(self) -> Tuple[Optional[Dict[str, np.ndarray]], Iterator[List[Dict[str, Any]]]]:
+        self.generation = self._read_generation()
+        arrays = None
+        if os.path.exists(self.snapshot_path):
+            with np.load(self.snapshot_path) as snapshot:
+                arrays = {name: snapshot[name] for name in snapshot.files}
+            # A snapshot taken before the table was last cleared is stale
+            if int(arrays.pop('generation')) == self.generation:
+                self.snapshot_seq = self.last_seq = self.committed_seq = int(arrays.pop('last_seq'))
+            else:
+                arrays = None
+        return arrays, self._replay_events()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "generation": self.generation, "appended_here": self.appends}
+
+    def close(self):
+        super().close()
+        self._connection.close()
+
+    def _open_writer(self):
+        pass
+
+    def _close_writer(self):
+        pass
+
+    def _discard_events(self, upto_seq):
+        pass
+
+    def _read_events(self, after_seq):
+        cursor = self._connection.execute(
+            "SELECT lead_id, record FROM leads WHERE lead_id > ? ORDER BY lead_id", (after_seq,)
+        )
+        while True:
+            rows = cursor.fetchmany(REPLAY_CHUNK_SIZE)
+            if not rows:
+                break
+            for lead_id, record in rows:
+                event = json.loads(record)
+                event['lead_id'] = event['seq'] = lead_id
+                yield event
+
+def open_lead_log(backend: str, directory: str, commit_interval_ms: float = 10.0) -> Optional[LeadLog]:
+    """Create the lead log for a persistence backend, or None for ``none``."""
+    if backend not in PERSISTENCE_BACKENDS:
+        raise ValueError(f"Lead persistence must be one of {list(PERSISTENCE_BACKENDS)}")
+    if backend == 'ndjson':
+        return NDJSONLeadLog(directory, commit_interval_ms)
+    if backend == 'sqlite':
+        return SQLiteLeadLog(directory, commit_interval_ms)
+    if backend == 'shared':
+        return SharedLeadLog(directory, commit_interval_ms)
+    return None
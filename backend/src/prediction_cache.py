@@ -0,0 +1,89 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Mapping, Optional, Tuple
+
+class PredictionCache:
+    """
+    Bounded cache of initial scores keyed on a lead's model features.
+
+    Leads that resubmit the same form differ only in fields the model
+    does not see, so their features map to the same score. Entries are
+    evicted least recently used first once ``max_size`` is reached, and
+    expire ``ttl_seconds`` after they were stored. Scores belong to one
+    model version: ``invalidate`` drops every entry when another version
+    is swapped in, and lookups for any other version always miss, so a
+    request still running on a replaced model neither reads nor stores
+    its scores. A ``max_size`` of 0 disables the cache.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 3600.0, version: Optional[str] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @staticmethod
+    def key(features: Mapping[str, Any]) -> Hashable:
+        """Order-independent key of a feature record; tuples hash by value."""
+        return tuple(sorted(features.items()))
+
+    def get(self, version: str, features: Mapping[str, Any]) -> Optional[float]:
+        """Return the cached score of ``features`` under model ``version``, or None."""
+        if not self.enabled or version != self.version:
+            return None
+        key = self.key(features)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        score, expires = entry
+        if expires <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return score
+
+    def put(self, version: str, features: Mapping[str, Any], score: float):
+        if not self.enabled or version != self.version:
+            return
+        key = self.key(features)
+        self._entries[key] = (score, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, version: Optional[str]):
+        """Drop every entry and cache scores of ``version`` from now on."""
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "model_version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,303 @@
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set
+
+# Texts longer than this are matched with one C-level substring search per
+# pattern: the automaton's per-byte interpreter loop stops being faster at
+# roughly 0.5-1 KB of text, depending on the machine (see benchmark_reranker.py)
+SCAN_THRESHOLD_CHARS = 512
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton that finds every pattern contained in a text.
+
+    Patterns and text are matched as UTF-8 bytes, which gives the same
+    answer as ``pattern in text`` for every pattern. The goto and failure
+    functions are folded into one dense transition table indexed by
+    ``state + byte_code``, so matching is a single pass over the text with
+    one list lookup per byte.
+
+    Texts longer than ``scan_threshold`` characters are instead searched
+    for each pattern with ``in``, which is faster there; None always uses
+    the automaton.
+    """
+
+    def __init__(self, patterns: Iterable[str], scan_threshold: Optional[int] = SCAN_THRESHOLD_CHARS):
+        self.patterns = list(patterns)
+        self.scan_threshold = scan_threshold
+        encoded = [pattern.encode('utf-8') for pattern in self.patterns]
+
+        # Bytes that never occur in a pattern share code 0
+        alphabet = sorted(set(b''.join(encoded)))
+        codes = {byte: i + 1 for i, byte in enumerate(alphabet)}
+        self._width = len(alphabet) + 1
+        self._codes = bytes(codes.get(byte, 0) for byte in range(256))
+
+        # Build the trie of pattern prefixes
+        goto: List[Dict[int, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        self._always: List[int] = []
+        for index, pattern in enumerate(encoded):
+            if not pattern:
+                # The empty pattern is contained in every text
+                self._always.append(index)
+                continue
+            state = 0
+            for byte in pattern:
+                code = codes[byte]
+                if code not in goto[state]:
+                    goto.append({})
+                    outputs.append([])
+                    goto[state][code] = len(goto) - 1
+                state = goto[state][code]
+            outputs[state].append(index)
+
+        # Breadth-first pass: failure links, merged outputs and dense transitions
+        width = self._width
+        delta = [0] * (len(goto) * width)
+        fail = [0] * len(goto)
+        self._outputs: List[Optional[tuple]] = [None] * (len(goto) * width)
+        queue = deque([0])
+        while queue:
+            state = queue.popleft()
+            row = state * width
+            if state:
+                fallback = fail[state] * width
+                delta[row:row + width] = delta[fallback:fallback + width]
+                outputs[state].extend(outputs[fail[state]])
+            if outputs[state]:
+                self._outputs[row] = tuple(outputs[state])
+            for code, child in goto[state].items():
+                fail[child] = delta[row + code] // width if state else 0
+                delta[row + code] = child * width
+                queue.append(child)
+        self._delta = delta
+
+    def find(self, text: str) -> Set[int]:
+        """Return the indices of all patterns that occur in ``text``."""
+        if self.scan_threshold is not None and len(text) > self.scan_threshold:
+            return {index for index, pattern in enumerate(self.patterns) if pattern in text}
+
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        terminal = []
+        for code in text.encode('utf-8').translate(self._codes):
+            state = delta[state + code]
+            if outputs[state] is not None:
+                terminal.append(state)
+
+        found = set(self._always)
+        for state in set(terminal):
+            found.update(outputs[state])
+        return found
+
+class KeywordTable(dict):
+    """Keyword-to-value dict that notifies its reranker whenever it is modified."""
+
+    def __init__(self, keywords: Dict[str, float], on_change):
+        super().__init__(keywords)
+        self._on_change = on_change
+
+    def _changed(self):
+        self._on_change()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._changed()
+
+    def setdefault(self, key, default=None):
+        value = super().setdefault(key, default)
+        self._changed()
+        return value
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._changed()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._changed()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def __ior__(self, other):
+        super().__ior__(other)
+        self._changed()
+        return self
+
+# LLM Re-ranker class
+class LLMReranker:
+    def __init__(self):
+        self._automaton = None
+        
+        # Keywords that indicate high intent
+        self.positive_keywords = {
+            'urgent': 10,
+            'need immediately': 15,
+            'ready to purchase': 20,
+            'pre-approved loan': 15,
+            'cash buyer': 20,
+            'looking to close quickly': 15,
+            'very interested': 10,
+            'perfect match': 10,
+            'dream home': 8,
+            'must have': 12,
+            'excited': 5,
+            'ideal': 5,
+            'love': 5,
+            'perfect': 8,
+            'asap': 12,
+            'immediately': 10,
+            'today': 8,
+            'tomorrow': 5,
+            'this week': 5,
+            'approved': 10,
+            'financing ready': 15,
+            'down payment ready': 15,
+            'serious buyer': 15,
+            'ready to move': 10,
+            'ready to sign': 20,
+            'ready to commit': 15,
+            'ready to make an offer': 20,
+        }
+        
+        # Keywords that indicate low intent
+        self.negative_keywords = {
+            'just browsing': -15,
+            'not sure yet': -10,
+            'might consider': -8,
+            'too expensive': -12,
+            'not interested': -20,
+            'just checking': -10,
+            'maybe next year': -15,
+            'not ready': -15,
+            'need to think': -10,
+            'too small': -5,
+            'too big': -5,
+            'maybe': -5,
+            'possibly': -5,
+            'someday': -10,
+            'in the future': -8,
+            'not now': -12,
+            'just looking': -10,
+            'just curious': -10,
+            'out of budget': -15,
+            'too far': -8,
+            'too close': -5,
+            'not what I want': -12,
+            'not what I need': -12,
+            'not convinced': -10,
+            'need more options': -8,
+            'need more time': -10,
+            'need to discuss': -5,
+        }
+        
+        # Neutral keywords (minimal impact)
+        self.neutral_keywords = {
+            'information': 2,
+            'details': 2,
+            'question': 0,
+            'wondering': -2,
+            'considering': 0,
+            'thinking about': 0,
+            'interested in': 3,
+            'looking for': 2,
+            'searching': 2,
+            'exploring': 0,
+            'options': 0,
+            'alternatives': -2,
+            'features': 2,
+            'specifications': 2,
+            'price': 0,
+            'cost': 0,
+            'budget': 0,
+            'location': 0,
+            'area': 0,
+            'neighborhood': 0,
+            'size': 0,
+            'space': 0,
+            'rooms': 0,
+            'bedrooms': 0,
+            'bathrooms': 0,
+        }
+    
+    def _keyword_property(name):
+        attribute = '_' + name
+        
+        def getter(self):
+            return getattr(self, attribute)
+        
+        def setter(self, keywords):
+            setattr(self, attribute, KeywordTable(keywords, self._invalidate))
+            self._invalidate()
+        
+        return property(getter, setter)
+    
+    positive_keywords = _keyword_property('positive_keywords')
+    negative_keywords = _keyword_property('negative_keywords')
+    neutral_keywords = _keyword_property('neutral_keywords')
+    
+    def _invalidate(self):
+        """Drop the compiled automaton so it is rebuilt from the current tables."""
+        self._automaton = None
+    
+    def _compile(self):
+        """Compile all keyword tables into one automaton over lowercased keywords."""
+        pattern_index = {}
+        values = []
+        for table in (self.positive_keywords, self.negative_keywords, self.neutral_keywords):
+            for keyword, value in table.items():
+                pattern = keyword.lower()
+                if pattern not in pattern_index:
+                    pattern_index[pattern] = len(values)
+                    values.append(0)
+                # Keywords that lowercase to the same pattern each contribute
+                values[pattern_index[pattern]] += value
+        self._automaton = (KeywordAutomaton(pattern_index), values)
+        return self._automaton
+    
+    def adjustment(self, comments: str) -> float:
+        """Return the total score adjustment of the keywords found in the comments."""
+        if not comments:
+            return 0
+        
+        automaton, values = self._automaton or self._compile()
+        
+        # Match every keyword in one pass over the lowercased comments
+        return sum(values[index] for index in automaton.find(comments.lower()))
+    
+    def rerank(self, initial_score: float, comments: str) -> float:
+        """
+        Adjust the initial ML score based on keywords in the comments.
+        
+        Args:
+            initial_score: The initial score from the ML model (0-100)
+            comments: The lead's comments text
+            
+        Returns:
+            Adjusted score (0-100)
+        """
+        if not comments:
+            return initial_score
+        
+        score_adjustment = self.adjustment(comments)
+        
+        # Apply adjustment to initial score
+        adjusted_score = initial_score + score_adjustment
+        
+        # Ensure score is within 0-100 range
+        adjusted_score = max(0, min(100, adjusted_score))
+        
+        return adjusted_score
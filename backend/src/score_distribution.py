@@ -0,0 +1,285 @@
+import math
+import random
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from lead_stats import SEGMENT_FIELDS
+
+# Score fields that get a distribution
+DISTRIBUTION_FIELDS = ('initial_score', 'reranked_score')
+
+# Quantiles reported by /leads/distribution
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Fixed histogram bins over the 0-100 score range
+HISTOGRAM_BINS = 20
+SCORE_RANGE = (0.0, 100.0)
+_BINS_PER_POINT = HISTOGRAM_BINS / (SCORE_RANGE[1] - SCORE_RANGE[0])
+
+# KLL accuracy parameter: the largest compactor holds k items
+DEFAULT_K = 200
+
+# Normalized rank error of a DEFAULT_K sketch: with 99% probability a quantile q
+# it reports lies between the true quantiles q - RANK_ERROR and q + RANK_ERROR
+# (ScoreDistribution.rank_error scales this up once values are removed)
+RANK_ERROR = 0.0165
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang and Liberty, 2016).
+
+    Values enter level 0; a level that reaches its capacity is sorted
+    and every other value, starting at a random offset, moves up a level
+    with twice the weight. Capacities shrink by 2/3 per level below the
+    top one, so fewer than 3k values are kept however many are added, and a
+    quantile's rank is off by roughly 1.65/k of the count with 99%
+    probability for k = 200. Two sketches merge by concatenating their
+    levels and compacting.
+
+    Queries sort the retained values once and reuse them until the next
+    update, so a read costs the same however many values were added.
+    """
+
+    def __init__(self, k: int = DEFAULT_K, rng: Optional[random.Random] = None):
+        self.k = k
+        self.n = 0
+        self.levels: List[List[float]] = [[]]
+        self._rng = rng or random.Random()
+        self._sorted: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._capacities = self._level_capacities()
+
+    def _level_capacities(self) -> List[int]:
+        top = len(self.levels) - 1
+        return [max(2, math.ceil(self.k * (2 / 3) ** (top - level))) for level in range(len(self.levels))]
+
+    def _add_level(self):
+        self.levels.append([])
+        self._capacities = self._level_capacities()
+
+    def update(self, value: float):
+        level = self.levels[0]
+        level.append(value)
+        self.n += 1
+        self._sorted = None
+        if len(level) >= self._capacities[0]:
+            self._compress()
+
+    def update_many(self, values: Sequence[float]):
+        """Add many values with the error of adding them one by one, or less."""
+        self.levels[0].extend(values)
+        self.n += len(values)
+        self._sorted = None
+        self._compress()
+
+    def merge(self, other: 'KLLSketch'):
+        """Add everything another sketch summarizes to this one."""
+        while len(self.levels) < len(other.levels):
+            self._add_level()
+        for level, values in enumerate(other.levels):
+            self.levels[level].extend(values)
+        self.n += other.n
+        self._sorted = None
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            values = self.levels[level]
+            if len(values) >= self._capacities[level]:
+                if level + 1 == len(self.levels):
+                    self._add_level()
+                ordered = np.sort(np.asarray(values, dtype=np.float64))
+                # An odd value out stays behind, so the weight kept is exact
+                kept = ordered[:1].tolist() if len(ordered) % 2 else []
+                ordered = ordered[len(kept):]
+                self.levels[level] = kept
+                self.levels[level + 1].extend(ordered[self._rng.getrandbits(1)::2].tolist())
+            level += 1
+
+    def weighted_values(self) -> Tuple[np.ndarray, np.ndarray]:
+        """The retained values in ascending order and the weight each stands for."""
+        if self._sorted is None:
+            values = np.concatenate([np.asarray(level, dtype=np.float64) for level in self.levels])
+            weights = np.concatenate([np.full(len(level), 2 ** h, dtype=np.int64) for h, level in enumerate(self.levels)])
+            order = np.argsort(values, kind='stable')
+            self._sorted = (values[order], weights[order])
+        return self._sorted
+
+    @property
+    def retained(self) -> int:
+        return sum(len(level) for level in self.levels)
+
+def signed_quantiles(added: KLLSketch, removed: Optional[KLLSketch], quantiles: Sequence[float]) -> List[Optional[float]]:
+    """
+    Quantiles of the values added and not removed, from a sketch of each.
+
+    Removed values count with negative weight, so the rank of any value
+    is off by the errors of both sketches added together: up to
+    RANK_ERROR * (added.n + removed.n), which can be several times
+    RANK_ERROR of the remaining count (see ScoreDistribution.rank_error).
+    """
+    values, weights = added.weighted_values()
+    count = added.n
+    if removed is not None and removed.n:
+        removed_values, removed_weights = removed.weighted_values()
+        values = np.concatenate([values, removed_values])
+        weights = np.concatenate([weights, -removed_weights])
+        order = np.argsort(values, kind='stable')
+        values, weights = values[order], weights[order]
+        count -= removed.n
+    if count <= 0:
+        return [None] * len(quantiles)
+    ranks = np.cumsum(weights)
+    result = []
+    for q in quantiles:
+        # Smallest value whose rank reaches q of the count
+        position = int(np.argmax(ranks >= max(1, math.ceil(q * count))))
+        result.append(round(float(values[position]), 2))
+    return result
+
+class ScoreDistribution:
+    """
+    Quantile sketch and fixed-bin histogram of one score for a group of leads.
+
+    The histogram is exact and supports removal directly. A sketch cannot
+    forget a value, so removed scores (leads replaced under DEDUP_POLICY)
+    go into a second sketch that is subtracted at query time, and the
+    quantiles' error grows with the number of removals (``rank_error``).
+    """
+
+    __slots__ = ('added', 'removed', 'counts', '_rng')
+
+    def __init__(self, rng: random.Random):
+        self._rng = rng
+        self.added = KLLSketch(rng=rng)
+        self.removed: Optional[KLLSketch] = None
+        self.counts = [0] * HISTOGRAM_BINS
+
+    @staticmethod
+    def bin_of(score: float) -> int:
+        index = int((score - SCORE_RANGE[0]) * _BINS_PER_POINT)
+        return index if 0 <= index < HISTOGRAM_BINS else (0 if index < 0 else HISTOGRAM_BINS - 1)
+
+    def add(self, score: float):
+        self.added.update(score)
+        self.counts[self.bin_of(score)] += 1
+
+    def remove(self, score: float):
+        if self.removed is None:
+            self.removed = KLLSketch(rng=self._rng)
+        self.removed.update(score)
+        self.counts[self.bin_of(score)] -= 1
+
+    def add_many(self, scores: np.ndarray):
+        self.added.update_many(scores.tolist())
+        bins = np.clip(((scores - SCORE_RANGE[0]) * _BINS_PER_POINT).astype(np.int64), 0, HISTOGRAM_BINS - 1)
+        for index, count in enumerate(np.bincount(bins, minlength=HISTOGRAM_BINS).tolist()):
+            self.counts[index] += count
+
+    @property
+    def count(self) -> int:
+        return self.added.n - (self.removed.n if self.removed is not None else 0)
+
+    @property
+    def rank_error(self) -> Optional[float]:
+        """
+        Normalized rank error of the quantiles, with 99% probability per sketch.
+
+        Both sketches' errors are relative to all the values they were fed,
+        so against the remaining count the bound is RANK_ERROR scaled by
+        (added + removed) / remaining: 0.0165 with no removals, 0.05 once
+        half the added values have been removed again.
+        """
+        count = self.count
+        if count <= 0:
+            return None
+        removed = self.removed.n if self.removed is not None else 0
+        return round(RANK_ERROR * (self.added.n + removed) / count, 4)
+
+    def summary(self) -> Dict[str, Any]:
+        quantiles = signed_quantiles(self.added, self.removed, QUANTILES)
+        return {
+            "count": self.count,
+            **{f"p{round(q * 100)}": value for q, value in zip(QUANTILES, quantiles)},
+            "rank_error": self.rank_error,
+            "histogram": list(self.counts),
+        }
+
+class LeadDistributions:
+    """
+    Score distributions maintained at insert time, overall and per segment.
+
+    Like LeadAggregates, every stored lead is added once; reading the
+    distributions only queries sketches of bounded size, so it costs the
+    same regardless of how many leads are stored.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self._rng = random.Random(seed)
+        self.overall = self._group()
+        self.segments: Dict[str, Dict[str, Dict[str, ScoreDistribution]]] = {field: {} for field in SEGMENT_FIELDS}
+
+    def _group(self) -> Dict[str, ScoreDistribution]:
+        return {field: ScoreDistribution(self._rng) for field in DISTRIBUTION_FIELDS}
+
+    def _groups(self, lead: Mapping[str, Any]) -> List[Dict[str, ScoreDistribution]]:
+        groups = [self.overall]
+        for field, by_value in self.segments.items():
+            group = by_value.get(lead[field])
+            if group is None:
+                group = by_value[lead[field]] = self._group()
+            groups.append(group)
+        return groups
+
+    def add(self, lead: Mapping[str, Any]):
+        """Count a newly stored lead."""
+        for group in self._groups(lead):
+            for field, distribution in group.items():
+                distribution.add(lead[field])
+
+    def remove(self, lead: Mapping[str, Any]):
+        """Stop counting a lead that is no longer stored."""
+        for group in self._groups(lead):
+            for field, distribution in group.items():
+                distribution.remove(lead[field])
+
+    def add_columns(self, initial_scores: np.ndarray, reranked_scores: np.ndarray,
+                    segment_codes: Mapping[str, Tuple[np.ndarray, List[str]]]):
+        """
+        Count many leads at once from score columns.
+
+        ``segment_codes`` maps each segment field to its per-lead category
+        codes and the code-to-value table, as kept by the lead store.
+        """
+        scores = dict(zip(DISTRIBUTION_FIELDS, (initial_scores, reranked_scores)))
+        for field, distribution in self.overall.items():
+            distribution.add_many(scores[field])
+        for segment, by_value in self.segments.items():
+            codes, categories = segment_codes[segment]
+            for code, value in enumerate(categories):
+                rows = np.flatnonzero(codes == code)
+                if len(rows) == 0:
+                    continue
+                group = by_value.get(value)
+                if group is None:
+                    group = by_value[value] = self._group()
+                for field, distribution in group.items():
+                    distribution.add_many(scores[field][rows])
+
+    def clear(self):
+        self.overall = self._group()
+        self.segments = {field: {} for field in SEGMENT_FIELDS}
+
+    def summary(self) -> Dict[str, Any]:
+        """Quantiles and histograms of each score, overall and per segment."""
+        low, high = SCORE_RANGE
+        distributions = {field: distribution.summary() for field, distribution in self.overall.items()}
+        distributions["histogram_edges"] = np.linspace(low, high, HISTOGRAM_BINS + 1).tolist()
+        for segment, by_value in self.segments.items():
+            distributions[f"by_{segment}"] = {
+                value: {field: distribution.summary() for field, distribution in group.items()}
+                for value, group in sorted(by_value.items())
+                if group[DISTRIBUTION_FIELDS[0]].count > 0
+            }
+        return distributions
@@ -0,0 +1,124 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Iterator, List, Tuple
+
+# Bucket size at which a bucket is split in two
+DEFAULT_LOAD = 512
+
+class SortedIndex:
+    """
+    Sorted multiset of keys kept as a list of bounded sorted buckets.
+
+    Inserting or removing a key touches one bucket, and a range query
+    bisects to its first key and then walks forward or backward, so
+    fetching k keys costs O(log n + k).
+    """
+
+    def __init__(self, load: int = DEFAULT_LOAD):
+        self._load = load
+        self._buckets: List[List[Any]] = []
+        self._maxes: List[Any] = []
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, key):
+        """Insert a key."""
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            return
+
+        position = bisect_right(self._maxes, key)
+        if position == len(self._maxes):
+            position -= 1
+            self._buckets[position].append(key)
+            self._maxes[position] = key
+        else:
+            insort(self._buckets[position], key)
+        self._len += 1
+
+        bucket = self._buckets[position]
+        if len(bucket) > 2 * self._load:
+            half = bucket[self._load:]
+            del bucket[self._load:]
+            self._maxes[position] = bucket[-1]
+            self._buckets.insert(position + 1, half)
+            self._maxes.insert(position + 1, half[-1])
+
+    def remove(self, key):
+        """Remove one occurrence of a key, raising ValueError if absent."""
+        position = bisect_left(self._maxes, key)
+        if position == len(self._maxes):
+            raise ValueError(f"{key!r} not in index")
+        bucket = self._buckets[position]
+        index = bisect_left(bucket, key)
+        if bucket[index] != key:
+            raise ValueError(f"{key!r} not in index")
+
+        del bucket[index]
+        self._len -= 1
+        if not bucket:
+            del self._buckets[position]
+            del self._maxes[position]
+        elif index == len(bucket):
+            self._maxes[position] = bucket[-1]
+
+    def load_sorted(self, keys: List[Any]):
+        """Replace the contents with keys that are already in ascending order."""
+        self._buckets = [keys[i:i + self._load] for i in range(0, len(keys), self._load)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._len = len(keys)
+
+    def clear(self):
+        self._buckets = []
+        self._maxes = []
+        self._len = 0
+
+    def _locate(self, key, right: bool) -> Tuple[int, int]:
+        """Return (bucket, offset) of the insertion point of key."""
+        find = bisect_right if right else bisect_left
+        position = find(self._maxes, key)
+        if position == len(self._maxes):
+            return position, 0
+        return position, find(self._buckets[position], key)
+
+    def irange(self, minimum=None, maximum=None, inclusive: Tuple[bool, bool] = (True, True),
+               reverse: bool = False) -> Iterator[Any]:
+        """
+        Iterate over keys between minimum and maximum (None means unbounded).
+
+        Keys are produced in ascending order, or descending if reverse is set.
+        """
+        if not self._buckets:
+            return
+
+        if minimum is None:
+            low = (0, 0)
+        else:
+            low = self._locate(minimum, right=not inclusive[0])
+        if maximum is None:
+            high = (len(self._buckets), 0)
+        else:
+            high = self._locate(maximum, right=inclusive[1])
+
+        if reverse:
+            bucket, offset = high
+            while (bucket, offset) > low:
+                if offset == 0:
+                    bucket -= 1
+                    offset = len(self._buckets[bucket])
+                    continue
+                offset -= 1
+                yield self._buckets[bucket][offset]
+        else:
+            bucket, offset = low
+            while (bucket, offset) < high:
+                if offset == len(self._buckets[bucket]):
+                    bucket += 1
+                    offset = 0
+                    continue
+                yield self._buckets[bucket][offset]
+                offset += 1
+
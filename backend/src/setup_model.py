@@ -30,6 +30,17 @@ def setup_model():
         print(f"Error training model: {e}")
         return False
     
+    # Archive the model with its compiled arrays, so the server starts without unpickling it
+    print("\n3. Preparing the compiled model artifact...")
+    try:
+        sys.path.insert(0, current_dir)
+        from model_registry import ModelLoadError, ModelRegistry
+        model_version = ModelRegistry(os.path.join(current_dir, '../model')).load()
+        print(f"Model version {model_version.version} prepared in {model_version.load_seconds:.2f}s")
+    except (FileNotFoundError, ModelLoadError) as e:
+        print(f"Error preparing the compiled model: {e}")
+        return False
+    
     print("\nSetup completed successfully!")
     print("You can now run the FastAPI application with 'uvicorn main:app --reload'")
     
@@ -0,0 +1,191 @@
+import re
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Set, Tuple
+
+import numpy as np
+
+_TOKEN = re.compile(r'[^\W_]+')
+_QUERY_PART = re.compile(r'"([^"]*)"|(\S+)')
+
+# Approximate bytes per indexed term besides its postings: the dict slot, the term string and an empty array
+TERM_OVERHEAD = sys.getsizeof(array('i')) + sys.getsizeof('schools') + 16
+
+class SearchQueryError(ValueError):
+    """Raised when a search query has no terms to match."""
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words and numbers; punctuation and hyphens separate tokens."""
+    return _TOKEN.findall(text.lower())
+
+def parse_query(query: str) -> List[List[Tuple[str, ...]]]:
+    """
+    Parse a query into OR-ed groups of AND-ed phrases, each a tuple of tokens.
+
+    Words are AND-ed, ``OR`` separates alternatives and ``"..."`` quotes a
+    phrase; ``AND`` is allowed but implied. A word that tokenizes to
+    several tokens, like ``pre-approved``, is matched as a phrase.
+    """
+    groups: List[List[Tuple[str, ...]]] = [[]]
+    for match in _QUERY_PART.finditer(query):
+        phrase, word = match.groups()
+        if word == 'OR':
+            groups.append([])
+        elif word != 'AND':
+            tokens = tuple(tokenize(phrase if phrase is not None else word))
+            if tokens:
+                groups[-1].append(tokens)
+    if any(not group for group in groups):
+        raise SearchQueryError("The query needs a word or phrase on each side of every OR")
+    return groups
+
+def index_terms(text: str) -> Set[str]:
+    """The distinct tokens of a text plus each pair of adjacent tokens, joined by a space."""
+    tokens = tokenize(text)
+    terms = set(tokens)
+    terms.update(f"{first} {second}" for first, second in zip(tokens, tokens[1:]))
+    return terms
+
+def phrase_terms(phrase: Tuple[str, ...]) -> List[str]:
+    """The indexed terms every text containing a phrase has: its word, or its adjacent pairs."""
+    if len(phrase) == 1:
+        return [phrase[0]]
+    return [f"{first} {second}" for first, second in zip(phrase, phrase[1:])]
+
+def contains_phrase(tokens: Sequence[str], phrase: Tuple[str, ...]) -> bool:
+    n = len(phrase)
+    return any(tuple(tokens[i:i + n]) == phrase for i in range(len(tokens) - n + 1))
+
+class TextIndex:
+    """
+    Inverted index from comment terms to the sorted ids of the leads containing them.
+
+    Terms are single tokens and pairs of adjacent tokens, so a two-word
+    phrase is one lookup. A query intersects the postings of its terms
+    starting from the shortest, probing the longer ones by binary search,
+    so its cost follows the rarest term's postings rather than the number
+    of stored leads. Longer phrases, whose pairs could appear apart, are
+    confirmed on the remaining comments, which ``text(lead_id)`` returns.
+
+    Postings are ``array('i')`` buffers, 4 bytes per (term, lead) pair.
+    """
+
+    def __init__(self, text: Callable[[int], str]):
+        self.text = text
+        self._postings: Dict[str, array] = {}
+        self._size = 0
+
+    def add(self, lead_id: int, text: str):
+        """Index a lead's text; ids added in increasing order are appended."""
+        for term in index_terms(text):
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = array('i')
+            if not postings or postings[-1] < lead_id:
+                postings.append(lead_id)
+            else:
+                position = bisect_left(postings, lead_id)
+                if position < len(postings) and postings[position] == lead_id:
+                    continue
+                postings.insert(position, lead_id)
+            self._size += 1
+
+    def remove(self, lead_id: int, text: str):
+        """Stop indexing a lead under the terms of its previous text."""
+        for term in index_terms(text):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            position = bisect_left(postings, lead_id)
+            if position < len(postings) and postings[position] == lead_id:
+                del postings[position]
+                self._size -= 1
+                if not postings:
+                    del self._postings[term]
+
+    def add_many(self, lead_ids: Iterable[int], texts: Iterable[str]):
+        """
+        Index many leads in increasing id order, building each term's postings at once.
+
+        Comments repeat heavily, so each distinct text is tokenized once and
+        the ids of all the leads sharing it are added to its terms as one
+        array; a term's arrays are merged with a single sort.
+        """
+        leads_by_text: Dict[str, List[int]] = {}
+        for lead_id, text in zip(lead_ids, texts):
+            ids = leads_by_text.get(text)
+            if ids is None:
+                leads_by_text[text] = [lead_id]
+            else:
+                ids.append(lead_id)
+        # Per term: ids of the leads whose text no other lead has (ascending), and arrays of shared texts' ids
+        single: Dict[str, List[int]] = {}
+        shared: Dict[str, List[np.ndarray]] = {}
+        for text, ids in leads_by_text.items():
+            if len(ids) == 1:
+                lead_id = ids[0]
+                for term in index_terms(text):
+                    term_ids = single.get(term)
+                    if term_ids is None:
+                        single[term] = [lead_id]
+                    else:
+                        term_ids.append(lead_id)
+            else:
+                ids = np.array(ids, dtype=np.int32)
+                for term in index_terms(text):
+                    runs = shared.get(term)
+                    if runs is None:
+                        shared[term] = [ids]
+                    else:
+                        runs.append(ids)
+        for term, runs in shared.items():
+            runs.append(np.array(single.pop(term, ()), dtype=np.int32))
+            merged = np.sort(np.concatenate(runs))
+            self._postings.setdefault(term, array('i')).frombytes(merged.tobytes())
+            self._size += len(merged)
+        for term, ids in single.items():
+            self._postings.setdefault(term, array('i')).extend(ids)
+            self._size += len(ids)
+
+    def clear(self):
+        self._postings = {}
+        self._size = 0
+
+    def _match_group(self, phrases: List[Tuple[str, ...]]) -> np.ndarray:
+        postings = [self._postings.get(term) for term in {term for phrase in phrases for term in phrase_terms(phrase)}]
+        if any(p is None for p in postings):
+            return np.zeros(0, dtype=np.int32)
+        postings.sort(key=len)
+        ids = np.array(postings[0], dtype=np.int32)
+        for other in postings[1:]:
+            if len(ids) == 0:
+                break
+            # A view of the buffer, dropped before the postings can be appended to again
+            view = np.frombuffer(other, dtype=np.int32)
+            positions = np.minimum(np.searchsorted(view, ids), len(view) - 1)
+            ids = ids[view[positions] == ids]
+            del view
+        multi = [phrase for phrase in phrases if len(phrase) > 2]
+        if multi and len(ids):
+            keep = [all(contains_phrase(tokenize(self.text(lead_id)), phrase) for phrase in multi)
+                    for lead_id in ids.tolist()]
+            ids = ids[np.array(keep, dtype=bool)]
+        return ids
+
+    def search(self, query: str) -> np.ndarray:
+        """
+        Ids of the leads matching a query (see ``parse_query``), in ascending order.
+
+        Raises:
+            SearchQueryError: If the query has nothing to match
+        """
+        matches = [self._match_group(group) for group in parse_query(query)]
+        return matches[0] if len(matches) == 1 else np.unique(np.concatenate(matches))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "terms": len(self._postings),
+            "postings": self._size,
+            "bytes": self._size * 4 + len(self._postings) * TERM_OVERHEAD + sys.getsizeof(self._postings),
+        }
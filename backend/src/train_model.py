@@ -1,65 +1,152 @@
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, OrdinalEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
-from sklearn.ensemble import GradientBoostingClassifier
+from sklearn.ensemble import GradientBoostingClassifier, HistGradientBoostingClassifier
 from sklearn.metrics import classification_report, accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
+import argparse
 import joblib
 import os
 import sys
+import time
+import tracemalloc
 
-def train_model(data_path='../data/leads_data.csv'):
+from lead_fields import CATEGORIES
+
+TRAINING_BACKENDS = ('gbc', 'hgb')
+
+# Define categorical and numerical features
+categorical_features = ['age_group', 'family_background', 'property_type', 'location']
+numerical_features = ['credit_score', 'income', 'budget', 'previous_inquiries',
+                      'time_on_market', 'response_time_minutes']
+
+# Storage types used when loading training data; contact and comment columns are never read
+TRAINING_DTYPES = {
+    'credit_score': np.int16,
+    'income': np.int32,
+    'budget': np.int64,
+    'previous_inquiries': np.int32,
+    'time_on_market': np.int32,
+    'response_time_minutes': np.int32,
+    'high_intent': np.int8,
+    **{name: pd.CategoricalDtype(values) for name, values in CATEGORIES.items()},
+}
+
+def load_training_data(data_path, chunk_size=None):
+    """
+    Load the feature and target columns of a CSV or Parquet file.
+
+    Only the model columns are read, with compact numeric types and
+    categorical dtypes. CSV files can be read ``chunk_size`` rows at a
+    time so the text of the whole file is never parsed at once.
+    """
+    columns = list(TRAINING_DTYPES)
+    if data_path.endswith(('.parquet', '.pq')):
+        df = pd.read_parquet(data_path, columns=columns)
+        return df.astype(TRAINING_DTYPES)
+    if chunk_size:
+        chunks = pd.read_csv(data_path, usecols=columns, dtype=TRAINING_DTYPES, chunksize=chunk_size)
+        return pd.concat(chunks, ignore_index=True)
+    return pd.read_csv(data_path, usecols=columns, dtype=TRAINING_DTYPES)
+
+def build_pipeline(backend):
+    """Return the untrained preprocessor and classifier pipeline for a training backend."""
+    if backend == 'gbc':
+        # Create preprocessor
+        preprocessor = ColumnTransformer(
+            transformers=[
+                ('num', StandardScaler(), numerical_features),
+                ('cat', OneHotEncoder(handle_unknown='ignore'), categorical_features)
+            ])
+        classifier = GradientBoostingClassifier(n_estimators=100, random_state=42)
+    else:
+        # Trees need no scaling; categories become ordinal codes split natively by the booster
+        preprocessor = ColumnTransformer(
+            transformers=[
+                ('num', 'passthrough', numerical_features),
+                ('cat', OrdinalEncoder(
+                    categories=[CATEGORIES[name] for name in categorical_features],
+                    handle_unknown='use_encoded_value',
+                    unknown_value=np.nan
+                ), categorical_features)
+            ])
+        classifier = HistGradientBoostingClassifier(
+            max_iter=500,
+            learning_rate=0.1,
+            categorical_features=list(range(len(numerical_features), len(numerical_features) + len(categorical_features))),
+            early_stopping=True,
+            validation_fraction=0.1,
+            n_iter_no_change=10,
+            random_state=42
+        )
+
+    # Create pipeline with preprocessor and model
+    return Pipeline(steps=[
+        ('preprocessor', preprocessor),
+        ('classifier', classifier)
+    ])
+
+def fit_backend(backend, X_train, y_train, X_test):
+    """Fit one backend, returning the pipeline, test probabilities, wall-clock seconds and peak traced bytes."""
+    pipeline = build_pipeline(backend)
+    tracemalloc.start()
+    start = time.perf_counter()
+    pipeline.fit(X_train, y_train)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return pipeline, pipeline.predict_proba(X_test)[:, 1], elapsed, peak
+
+def publish(obj, path):
+    """Write a pickle next to ``path`` and rename it into place, so readers never see a partial file."""
+    temporary = path + '.tmp'
+    joblib.dump(obj, temporary)
+    os.replace(temporary, path)
+
+def train_model(data_path='../data/leads_data.csv', backend='gbc', compare=False, chunk_size=None):
     """Train a gradient boosting model to predict lead intent."""
-    
+
     print("Loading data...")
+    start = time.perf_counter()
     try:
-        df = pd.read_csv(data_path)
+        df = load_training_data(data_path, chunk_size)
     except FileNotFoundError:
         print(f"Error: Data file not found at {data_path}")
         print("Please run generate_data.py first to create the dataset.")
         sys.exit(1)
-    
-    print(f"Loaded {len(df)} records from {data_path}")
-    
+
+    print(f"Loaded {len(df)} records from {data_path} in {time.perf_counter() - start:.1f}s "
+          f"({df.memory_usage(deep=True).sum() / 1e6:.1f} MB)")
+
     # Define features and target
-    X = df.drop(['high_intent', 'phone_number', 'email', 'comments'], axis=1)
+    X = df.drop(['high_intent'], axis=1)
     y = df['high_intent']
-    
+
     # Split data
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    
+
     print(f"Training set: {X_train.shape[0]} samples")
     print(f"Test set: {X_test.shape[0]} samples")
-    
-    # Define categorical and numerical features
-    categorical_features = ['age_group', 'family_background', 'property_type', 'location']
-    numerical_features = ['credit_score', 'income', 'budget', 'previous_inquiries', 
-                         'time_on_market', 'response_time_minutes']
-    
-    # Create preprocessor
-    preprocessor = ColumnTransformer(
-        transformers=[
-            ('num', StandardScaler(), numerical_features),
-            ('cat', OneHotEncoder(handle_unknown='ignore'), categorical_features)
-        ])
-    
-    # Create pipeline with preprocessor and model
-    pipeline = Pipeline(steps=[
-        ('preprocessor', preprocessor),
-        ('classifier', GradientBoostingClassifier(n_estimators=100, random_state=42))
-    ])
-    
-    # Train model
-    print("Training model...")
-    pipeline.fit(X_train, y_train)
-    
+
+    # Train every backend when comparing, the selected one last so its report is printed
+    backends = [b for b in TRAINING_BACKENDS if b != backend] + [backend] if compare else [backend]
+    results = {}
+    for name in backends:
+        print(f"Training model ({name})...")
+        pipeline, y_pred_proba, elapsed, peak = fit_backend(name, X_train, y_train, X_test)
+        results[name] = (elapsed, peak, roc_auc_score(y_test, y_pred_proba))
+
+    print(f"\n{'backend':>7} | {'fit time':>9} | {'peak memory':>11} | {'ROC AUC':>7}")
+    print("-" * 45)
+    for name, (elapsed, peak, auc) in results.items():
+        print(f"{name:>7} | {elapsed:>8.2f}s | {peak / 1e6:>8.1f} MB | {auc:>7.4f}")
+
     # Evaluate model
-    print("Evaluating model...")
+    print("\nEvaluating model...")
     y_pred = pipeline.predict(X_test)
-    y_pred_proba = pipeline.predict_proba(X_test)[:, 1]
-    
+
     # Print metrics
     print("\nModel Performance:")
     print(f"Accuracy: {accuracy_score(y_test, y_pred):.4f}")
@@ -67,38 +154,48 @@ def train_model(data_path='../data/leads_data.csv'):
     print(f"Recall: {recall_score(y_test, y_pred):.4f}")
     print(f"F1 Score: {f1_score(y_test, y_pred):.4f}")
     print(f"ROC AUC: {roc_auc_score(y_test, y_pred_proba):.4f}")
-    
+
     print("\nClassification Report:")
     print(classification_report(y_test, y_pred))
-    
-    # Feature importance
-    feature_names = (
-        numerical_features + 
-        pipeline.named_steps['preprocessor'].transformers_[1][1].get_feature_names_out(categorical_features).tolist()
-    )
-    
-    importances = pipeline.named_steps['classifier'].feature_importances_
-    indices = np.argsort(importances)[::-1]
-    
-    print("\nFeature Importance:")
-    for i in range(min(10, len(feature_names))):
-        print(f"{i+1}. {feature_names[indices[i]]}: {importances[indices[i]]:.4f}")
-    
-    # Save model and feature columns
+
+    classifier = pipeline.named_steps['classifier']
+    if backend == 'hgb':
+        print(f"Boosting iterations: {classifier.n_iter_} (early stopping)")
+    else:
+        # Feature importance
+        feature_names = (
+            numerical_features +
+            pipeline.named_steps['preprocessor'].transformers_[1][1].get_feature_names_out(categorical_features).tolist()
+        )
+
+        importances = classifier.feature_importances_
+        indices = np.argsort(importances)[::-1]
+
+        print("\nFeature Importance:")
+        for i in range(min(10, len(feature_names))):
+            print(f"{i+1}. {feature_names[indices[i]]}: {importances[indices[i]]:.4f}")
+
+    # Save feature columns for inference, then the model; a running server reloads on the model file
     print("\nSaving model...")
     os.makedirs('../model', exist_ok=True)
-    joblib.dump(pipeline, '../model/lead_scoring_model.pkl')
-    
-    # Save feature columns for inference
     feature_columns = {
         'categorical_features': categorical_features,
         'numerical_features': numerical_features
     }
-    joblib.dump(feature_columns, '../model/feature_columns.pkl')
-    
+    publish(feature_columns, '../model/feature_columns.pkl')
+    publish(pipeline, '../model/lead_scoring_model.pkl')
+
     print("Model and feature columns saved to '../model/' directory")
-    
+
     return pipeline, feature_columns
 
 if __name__ == "__main__":
-    train_model()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train the lead scoring model")
+    parser.add_argument("--data", default='../data/leads_data.csv', help="CSV or Parquet training data")
+    parser.add_argument("--backend", choices=TRAINING_BACKENDS, default='gbc',
+                        help="gbc: GradientBoostingClassifier; hgb: multi-core HistGradientBoostingClassifier "
+                             "with native categorical splits and early stopping")
+    parser.add_argument("--compare", action="store_true", help="Also train the other backend and compare them")
+    parser.add_argument("--chunk-size", type=int, help="Read CSV data this many rows at a time")
+    args = parser.parse_args()
+    train_model(args.data, args.backend, args.compare, args.chunk_size)
@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+# Synthetic leads the fixture model is trained on; enough for stable predictions, quick to fit
+FIXTURE_ROWS = 1000
+
+@pytest.fixture(scope='session')
+def main(tmp_path_factory):
+    """The API module, in memory and serving a fixture model, so tests need no trained artifacts."""
+    from benchmark_suite import build_fixture_model
+
+    model_dir = str(tmp_path_factory.mktemp('model'))
+    build_fixture_model(model_dir, rows=FIXTURE_ROWS)
+    os.environ.update({
+        "MODEL_DIR": model_dir,
+        "MODEL_WATCH_SECONDS": "0",
+        "LEAD_PERSISTENCE": "none",
+    })
+    import main
+
+    assert main.model_registry.current is not None, f"Model not loaded from {model_dir}"
+    yield main
+    main.inference_executor.shutdown()
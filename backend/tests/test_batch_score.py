@@ -0,0 +1,54 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from batch_score import MANIFEST_NAME, batch_score
+from model_registry import ModelRegistry
+
+COLUMNS = ("phone_number,email,credit_score,age_group,family_background,income,property_type,"
+           "budget,location,previous_inquiries,time_on_market,response_time_minutes,comments")
+
+@pytest.fixture
+def dump(tmp_path):
+    rows = [f"+91-98765432{i:02d},lead{i}@example.com,720,26-35,Married,600000,Apartment,"
+            f"5000000,Urban,3,30,45,urgent" for i in range(5)]
+    # An unknown category is written back without scores
+    rows.append("+91-9876543299,bad@example.com,720,26-35,Married,600000,Castle,5000000,Urban,3,30,45,")
+    path = tmp_path / 'leads.csv'
+    path.write_text('\n'.join([COLUMNS] + rows) + '\n')
+    return str(path)
+
+def test_model_resolves_to_the_archived_published_version(main):
+    registry = ModelRegistry(os.environ["MODEL_DIR"])
+    version, directory = registry.resolve()
+    assert version == main.model_registry.current.version
+    assert directory == registry.version_dir(version)
+    assert registry.resolve(version) == (version, directory)
+    with pytest.raises(FileNotFoundError):
+        registry.resolve('0' * 12)
+    with pytest.raises(LookupError):
+        registry.resolve('../model')
+
+def test_batch_score_uses_the_requested_version(main, dump, tmp_path):
+    version = main.model_registry.current.version
+    output = str(tmp_path / 'scored')
+    result = batch_score(dump, output, workers=1, model_dir=os.environ["MODEL_DIR"], version=version)
+    assert (result["rows"], result["unscored"], result["model_version"]) == (6, 1, version)
+    with open(os.path.join(output, MANIFEST_NAME)) as f:
+        assert json.load(f)["model_version"] == version
+
+    scored = pd.read_csv(os.path.join(output, 'part-000000.csv'))
+    assert scored["initial_score"].isna().tolist() == [False] * 5 + [True]
+    # The same score the API's model gives these features
+    model = main.model_registry.current
+    columns = model.feature_columns["numerical_features"] + model.feature_columns["categorical_features"]
+    expected = model.predict([scored.loc[0, columns].to_dict()])[0]
+    assert scored["initial_score"].iloc[0] == round(float(expected), 2)
+
+def test_unknown_version_stops_before_scoring(main, dump, tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        batch_score(dump, str(tmp_path / 'scored'), workers=1, model_dir=os.environ["MODEL_DIR"], version='0' * 12)
+    assert "is not archived" in capsys.readouterr().out
+    assert not os.path.exists(tmp_path / 'scored')
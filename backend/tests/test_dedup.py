@@ -0,0 +1,127 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+def record(i, reranked_score=50.0, email=None, phone=None):
+    """A scored lead record as store_leads receives it."""
+    return {
+        "email": email or f"lead{i}@example.com",
+        "phone_number": phone or f"+91-98765432{i:02d}",
+        "initial_score": 40.0,
+        "reranked_score": reranked_score,
+        "comments": f"comment {i}",
+        "credit_score": 720, "age_group": "26-35", "family_background": "Married", "income": 600000,
+        "property_type": "Apartment", "budget": 5000000, "location": "Urban",
+        "previous_inquiries": 3, "time_on_market": 30, "response_time_minutes": 45,
+    }
+
+def lead(i, **fields):
+    """A /score request body."""
+    return {
+        "phone_number": f"+91-98765432{i:02d}", "email": f"lead{i}@example.com", "credit_score": 720,
+        "age_group": "26-35", "family_background": "Married", "income": 600000,
+        "property_type": "Apartment", "budget": 5000000, "location": "Urban",
+        "previous_inquiries": 3, "time_on_market": 30, "response_time_minutes": 45,
+        "comments": "urgent", "consent": True, **fields,
+    }
+
+@pytest.fixture
+def dedup(main, monkeypatch):
+    """Set DEDUP_POLICY for one test, starting and ending with no stored leads."""
+    main.reset_leads()
+    yield lambda policy: monkeypatch.setattr(main, "DEDUP_POLICY", policy)
+    main.reset_leads()
+
+def stored(main, lead_id, field):
+    return main.lead_store.get(lead_id, (field,))[field]
+
+def test_append_stores_every_record(main, dedup):
+    dedup('append')
+    assert list(main.store_leads([record(1)])) == [1]
+    assert list(main.store_leads([record(1), record(1)])) == [2, 3]
+    assert main.contact_index.find(email="LEAD1@example.com") == [1, 2, 3]
+
+@pytest.mark.parametrize('policy', ['replace', 'max'])
+def test_matching_email_or_phone_updates_the_stored_lead(main, dedup, policy):
+    dedup(policy)
+    main.store_leads([record(1, 50.0), record(2, 50.0)])
+    by_email = record(1, 80.0, email=" Lead1@Example.com", phone="+91-9000000001")
+    by_phone = record(2, 90.0, email="new@example.com", phone="919876543202")
+    assert list(main.store_leads([by_email, by_phone])) == [1, 2]
+    assert len(main.lead_store) == 2
+    assert (stored(main, 1, "reranked_score"), stored(main, 2, "email")) == (80.0, "new@example.com")
+    # The indexes follow the lead's new contact details
+    assert main.contact_index.find(phone_number="+91-9876543201") == []
+    assert main.contact_index.find(email="new@example.com") == [2]
+    assert main.lead_aggregates.summary()["total_leads"] == 2
+
+def test_replace_keeps_the_newest_record_and_max_the_highest_score(main, dedup):
+    for policy, expected in (('replace', 30.0), ('max', 70.0)):
+        dedup(policy)
+        main.reset_leads()
+        main.store_leads([record(1, 70.0)])
+        assert list(main.store_leads([record(1, 30.0)])) == [1]
+        assert stored(main, 1, "reranked_score") == expected
+
+@pytest.mark.parametrize('policy', ['replace', 'max'])
+def test_records_repeating_a_contact_in_one_batch_are_merged(main, dedup, policy):
+    dedup(policy)
+    ids = main.store_leads([record(1, 60.0), record(2), record(1, 40.0, phone="+91-9000000001")])
+    assert list(ids) == [1, 2, 1]
+    assert len(main.lead_store) == 2
+    assert stored(main, 1, "reranked_score") == (40.0 if policy == 'replace' else 60.0)
+
+@pytest.mark.parametrize('policy', ['replace', 'max'])
+def test_email_and_phone_of_different_stored_leads_is_rejected(main, dedup, policy):
+    dedup(policy)
+    main.store_leads([record(1), record(2)])
+    split = record(3, 99.0, email="lead1@example.com", phone="+91-9876543202")
+    assert list(main.store_leads([split])) == ["Email matches lead 1 but phone number matches lead 2"]
+    # Neither lead changed, so the two contacts still each have one lead
+    assert len(main.lead_store) == 2
+    assert [stored(main, i, "reranked_score") for i in (1, 2)] == [50.0, 50.0]
+    assert main.contact_index.find(email="lead1@example.com", phone_number="+91-9876543202") == [1, 2]
+
+@pytest.mark.parametrize('policy', ['replace', 'max'])
+def test_split_match_within_a_batch_and_against_stored_leads_is_rejected(main, dedup, policy):
+    dedup(policy)
+    main.store_leads([record(1)])
+    ids = main.store_leads([
+        record(2),
+        record(3),
+        # Email of the batch's first record, phone number of the one after it
+        record(4, email="lead2@example.com", phone="+91-9876543203"),
+        # Email of a batch record, phone number of a stored lead
+        record(5, email="lead3@example.com", phone="+91-9876543201"),
+    ])
+    assert list(ids) == [2, 3, "Email matches lead 2 but phone number matches lead 3",
+                         "Email matches lead 3 but phone number matches lead 1"]
+    assert len(main.lead_store) == 3
+
+def test_routes_report_split_matches(main, dedup):
+    dedup('replace')
+    client = TestClient(main.app)
+    client.post("/score", json=lead(1))
+    client.post("/score", json=lead(2))
+
+    split = lead(3, email="lead1@example.com", phone_number="+91-9876543202")
+    response = client.post("/score", json=split)
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Email matches lead 1 but phone number matches lead 2"
+
+    batch = client.post("/score/batch", json=[{"consent": True}, split, lead(1, comments="cash buyer")]).json()
+    assert (batch["scored"], batch["failed"]) == (1, 2)
+    assert [error["index"] for error in batch["errors"]] == [0, 1]
+    assert batch["errors"][1]["errors"] == ["Email matches lead 1 but phone number matches lead 2"]
+    assert batch["results"][0]["lead_id"] == 1
+    assert len(main.lead_store) == 2
+
+def test_import_rejects_split_matches_by_row(main, dedup):
+    dedup('max')
+    client = TestClient(main.app)
+    lines = [lead(1), lead(2), lead(3, email="lead1@example.com", phone_number="+91-9876543202")]
+    body = '\n'.join(json.dumps(line) for line in lines).encode()
+    job = client.post("/leads/import", content=body, headers={"Content-Type": "application/x-ndjson"}).json()
+    assert (job["status"], job["scored"], job["rejected"]) == ("completed", 2, 1)
+    assert job["rejections"] == [{"row": 3, "errors": ["Email matches lead 1 but phone number matches lead 2"]}]
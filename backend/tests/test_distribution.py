@@ -0,0 +1,92 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from score_distribution import HISTOGRAM_BINS, RANK_ERROR, LeadDistributions, ScoreDistribution
+
+def lead(score, location="Urban", property_type="Apartment"):
+    return {"initial_score": score, "reranked_score": score, "location": location, "property_type": property_type}
+
+def histogram(*scores):
+    counts = [0] * HISTOGRAM_BINS
+    for score in scores:
+        counts[ScoreDistribution.bin_of(score)] += 1
+    return counts
+
+def test_scores_fall_in_fixed_bins():
+    assert [ScoreDistribution.bin_of(score) for score in (0.0, 4.99, 5.0, 99.99, 100.0)] == [0, 0, 1, 19, 19]
+    # Scores outside 0-100 count in the end bins
+    assert [ScoreDistribution.bin_of(score) for score in (-1.0, 120.0)] == [0, 19]
+
+def test_quantiles_and_histogram_after_removals():
+    distributions = LeadDistributions(seed=0)
+    for score in range(1, 101):
+        distributions.add(lead(float(score)))
+    for score in range(1, 51):
+        distributions.remove(lead(float(score)))
+
+    summary = distributions.summary()["reranked_score"]
+    # Fewer values than the sketch holds, so the quantiles of 51-100 are exact
+    assert (summary["count"], summary["p50"], summary["p90"], summary["p99"]) == (50, 75.0, 95.0, 100.0)
+    assert summary["histogram"] == histogram(*map(float, range(51, 101)))
+    assert summary["rank_error"] == round(RANK_ERROR * 150 / 50, 4)
+
+def test_lead_moved_to_another_segment_leaves_the_old_one():
+    distributions = LeadDistributions(seed=0)
+    distributions.add(lead(30.0, location="Urban"))
+    distributions.add(lead(60.0, location="Urban"))
+    distributions.remove(lead(30.0, location="Urban"))
+    distributions.add(lead(80.0, location="Rural"))
+    distributions.remove(lead(60.0, location="Urban"))
+    distributions.add(lead(60.0, location="Rural"))
+
+    summary = distributions.summary()
+    assert list(summary["by_location"]) == ["Rural"]
+    rural = summary["by_location"]["Rural"]["reranked_score"]
+    assert (rural["count"], rural["histogram"]) == (2, histogram(60.0, 80.0))
+    assert summary["reranked_score"]["histogram"] == histogram(60.0, 80.0)
+    assert summary["by_property_type"]["Apartment"]["reranked_score"]["count"] == 2
+
+def test_everything_removed_has_no_quantiles():
+    distributions = LeadDistributions(seed=0)
+    distributions.add(lead(50.0))
+    distributions.remove(lead(50.0))
+    summary = distributions.summary()["reranked_score"]
+    assert (summary["count"], summary["p50"], summary["rank_error"]) == (0, None, None)
+    assert summary["histogram"] == [0] * HISTOGRAM_BINS
+    assert distributions.summary()["by_location"] == {}
+
+def record(i, reranked_score, location):
+    """A scored lead record as store_leads receives it."""
+    return {
+        "email": f"lead{i}@example.com", "phone_number": f"+91-9{i:09d}",
+        "initial_score": 40.0, "reranked_score": reranked_score, "comments": f"comment {i}",
+        "credit_score": 720, "age_group": "26-35", "family_background": "Married", "income": 600000,
+        "property_type": "Apartment", "budget": 5000000, "location": location,
+        "previous_inquiries": 3, "time_on_market": 30, "response_time_minutes": 45,
+    }
+
+@pytest.fixture
+def client(main):
+    main.reset_leads()
+    yield TestClient(main.app)
+    main.reset_leads()
+
+def test_replaced_leads_are_removed_from_the_distribution(main, client, monkeypatch):
+    monkeypatch.setattr(main, "DEDUP_POLICY", "replace")
+    main.store_leads([record(1, 20.0, "Urban"), record(2, 40.0, "Urban"), record(3, 60.0, "Suburban")])
+    main.store_leads([record(1, 90.0, "Rural"), record(3, 65.0, "Suburban")])
+
+    distribution = client.get("/leads/distribution").json()
+    assert distribution["reranked_score"]["count"] == 3
+    assert distribution["reranked_score"]["histogram"] == histogram(40.0, 65.0, 90.0)
+    assert distribution["initial_score"]["histogram"] == histogram(40.0, 40.0, 40.0)
+    by_location = {value: group["reranked_score"]["histogram"] for value, group in distribution["by_location"].items()}
+    assert by_location == {"Rural": histogram(90.0), "Suburban": histogram(65.0), "Urban": histogram(40.0)}
+    assert distribution["reranked_score"]["rank_error"] == round(RANK_ERROR * 7 / 3, 4)
+
+    # A rebuild from the stored leads counts the same, without the removals
+    main.rebuild_derived_state()
+    rebuilt = client.get("/leads/distribution").json()
+    assert rebuilt["reranked_score"]["histogram"] == distribution["reranked_score"]["histogram"]
+    assert rebuilt["by_location"].keys() == distribution["by_location"].keys()
+    assert rebuilt["reranked_score"]["rank_error"] == RANK_ERROR
@@ -0,0 +1,124 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from imports import MAX_RECORD_BYTES, iter_import_chunks
+
+HEADER = ("phone_number,email,credit_score,age_group,family_background,income,property_type,"
+          "budget,location,previous_inquiries,time_on_market,response_time_minutes,comments,consent")
+
+def csv_row(i, comments='"urgent, good schools"'):
+    return (f"+91-98765432{i:02d},lead{i}@example.com,720,26-35,Married,600000,Apartment,"
+            f"5000000,Urban,3,30,45,{comments},true")
+
+def ndjson_line(i):
+    return json.dumps({
+        "phone_number": f"+91-98765432{i:02d}", "email": f"lead{i}@example.com", "credit_score": 720,
+        "age_group": "26-35", "family_background": "Married", "income": 600000,
+        "property_type": "Apartment", "budget": 5000000, "location": "Urban",
+        "previous_inquiries": 3, "time_on_market": 30, "response_time_minutes": 45,
+        "comments": "urgent", "consent": True,
+    })
+
+def parse(body, import_format, piece_size=65536, chunk_size=1000):
+    """Every (row, record or error) parsed from ``body``, streamed in pieces of ``piece_size`` bytes."""
+    async def stream():
+        for start in range(0, len(body), piece_size):
+            yield body[start:start + piece_size]
+
+    async def collect():
+        return [row async for rows in iter_import_chunks(stream(), import_format, chunk_size) for row in rows]
+
+    return asyncio.run(collect())
+
+def test_csv_rows_split_across_pieces_and_chunks():
+    body = '\n'.join([HEADER] + [csv_row(i) for i in range(5)]).encode()
+    rows = parse(body, 'csv', piece_size=7, chunk_size=2)
+    assert [row for row, _ in rows] == [1, 2, 3, 4, 5]
+    assert all(isinstance(record, dict) for _, record in rows)
+    assert rows[4][1]['email'] == 'lead4@example.com'
+    assert rows[0][1]['comments'] == 'urgent, good schools'
+
+def test_csv_field_over_the_csv_module_limit_is_parsed():
+    comments = 'x' * 200000
+    body = '\n'.join([HEADER, csv_row(0, comments), csv_row(1)]).encode()
+    rows = parse(body, 'csv')
+    assert rows[0][1]['comments'] == comments
+    assert rows[1][1]['email'] == 'lead1@example.com'
+
+def test_csv_record_over_the_limit_is_rejected():
+    body = '\n'.join([HEADER, csv_row(0, 'x' * (MAX_RECORD_BYTES + 1)), csv_row(1)]).encode()
+    rows = parse(body, 'csv')
+    assert rows[0] == (1, f"Row is longer than {MAX_RECORD_BYTES} bytes")
+    assert rows[1][0] == 2 and rows[1][1]['email'] == 'lead1@example.com'
+
+def test_csv_unbalanced_quote_is_rejected():
+    body = '\n'.join([HEADER, csv_row(0), csv_row(1, '"urgent')]).encode()
+    rows = parse(body, 'csv')
+    assert rows[0][1]['email'] == 'lead0@example.com'
+    assert rows[1] == (2, "Row has a quoted field that is never closed")
+
+def test_csv_unbalanced_quote_swallows_at_most_the_record_limit():
+    filler = [csv_row(i, 'no quotes here') for i in range(2, 2 + MAX_RECORD_BYTES // 100)]
+    body = '\n'.join([HEADER, csv_row(1, '"urgent')] + filler).encode()
+    rows = parse(body, 'csv')
+    assert rows[0] == (1, f"Row is longer than {MAX_RECORD_BYTES} bytes")
+    # Records after the oversized one are parsed again
+    assert isinstance(rows[-1][1], dict)
+
+def test_csv_field_count_must_match_the_header():
+    body = '\n'.join([HEADER, 'a,b,c']).encode()
+    assert parse(body, 'csv') == [(1, "Row has 3 fields; the header has 14")]
+
+def test_ndjson_lines_that_are_not_objects_are_rejected():
+    body = '\n'.join(['[1, 2]', '"lead"', ndjson_line(0), '{"email":', '', '42']).encode()
+    rows = parse(body, 'ndjson')
+    assert rows[0] == (1, "Line is a JSON list, not an object")
+    assert rows[1] == (2, "Line is a JSON str, not an object")
+    assert rows[2][1]['email'] == 'lead0@example.com'
+    assert rows[3][0] == 4 and rows[3][1].startswith("Invalid JSON")
+    # Blank lines are skipped without taking a row number
+    assert rows[4] == (5, "Line is a JSON int, not an object")
+
+def test_ndjson_line_over_the_limit_is_rejected():
+    huge = json.dumps({"comments": 'x' * MAX_RECORD_BYTES})
+    body = '\n'.join([huge, ndjson_line(1)]).encode()
+    rows = parse(body, 'ndjson', piece_size=4096)
+    assert rows[0] == (1, f"Line is longer than {MAX_RECORD_BYTES} bytes")
+    assert rows[1][1]['email'] == 'lead1@example.com'
+
+@pytest.fixture
+def client(main):
+    main.reset_leads()
+    yield TestClient(main.app, raise_server_exceptions=False)
+    main.reset_leads()
+
+def test_import_completes_and_reports_rejected_rows(client):
+    body = '\n'.join([HEADER, csv_row(0), csv_row(1), csv_row(2, '"urgent')]).encode()
+    response = client.post("/leads/import", content=body, headers={"Content-Type": "text/csv"})
+    assert response.status_code == 200
+    job = response.json()
+    assert (job["status"], job["rows_read"], job["scored"], job["rejected"]) == ("completed", 3, 2, 1)
+    assert job["rejections"] == [{"row": 3, "errors": ["Row has a quoted field that is never closed"]}]
+    assert client.get(f"/leads/import/{job['job_id']}").json()["status"] == "completed"
+    assert client.get("/leads/stats").json()["total_leads"] == 2
+
+def test_import_with_only_rejected_rows_completes(client):
+    body = '\n'.join(['[1]', '{"email": "lead@example.com"}']).encode()
+    job = client.post("/leads/import", content=body, headers={"Content-Type": "application/x-ndjson"}).json()
+    assert (job["status"], job["rows_read"], job["scored"], job["rejected"]) == ("completed", 2, 0, 2)
+
+def test_import_marks_the_job_failed_when_scoring_raises(client, main, monkeypatch):
+    async def fail(*args, **kwargs):
+        raise RuntimeError("model exploded")
+
+    monkeypatch.setattr(main, "score_and_store", fail)
+    body = '\n'.join([HEADER, csv_row(0)]).encode()
+    response = client.post("/leads/import", content=body, headers={"Content-Type": "text/csv"})
+    assert response.status_code == 500
+    job = main.import_jobs.list()[-1]
+    assert job.status == "failed"
+    assert job.error == "Import failed: model exploded"
+    assert job.elapsed is not None
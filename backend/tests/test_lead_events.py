@@ -0,0 +1,138 @@
+import asyncio
+import json
+
+from lead_events import LeadEventStream, stats_delta
+
+def parse(message):
+    """The (event, data) of an SSE message."""
+    event, data = message.decode().strip().split('\n')
+    return event[len('event: '):], json.loads(data[len('data: '):])
+
+class Store:
+    """Leads and statistics a stream reads, changed by hand."""
+
+    def __init__(self, size):
+        self.size = size
+        self.scores = {}
+        self.stats = {"total_leads": size, "by_location": {"Urban": size}}
+
+    def add(self, count, location="Urban"):
+        start = self.size
+        self.size += count
+        self.stats = {"total_leads": self.size,
+                      "by_location": {**self.stats["by_location"],
+                                      location: self.stats["by_location"].get(location, 0) + count}}
+        return start, self.size
+
+    def leads(self, start, stop):
+        return [{"lead_id": row + 1, "score": self.scores.get(row, 50.0)} for row in range(start, stop)]
+
+def stream(store, **options):
+    return LeadEventStream(store.leads, lambda: store.stats, window_ms=1, **options)
+
+def run(test):
+    asyncio.run(test())
+
+def test_stats_delta_holds_only_changes():
+    before = {"total_leads": 2, "average": 50.0, "by_location": {"Urban": 2}, "gone": 1}
+    after = {"total_leads": 3, "average": 50.0, "by_location": {"Urban": 2, "Rural": 1}}
+    delta = stats_delta(before, after)
+    assert delta == {"total_leads": 3, "by_location": {"Rural": 1}, "gone": None}
+    assert stats_delta(after, after) == {}
+
+def test_messages_carry_new_leads_and_the_stats_that_changed():
+    async def test():
+        store = Store(2)
+        events = stream(store)
+        client = events.events(2)
+        assert (await client.__anext__()).startswith(b'retry: ')
+        assert parse(await client.__anext__()) == (
+            'snapshot', {'reset': False, 'last_lead_id': 2, 'stats': store.stats})
+
+        events.publish(*store.add(2, location="Rural"))
+        event, data = parse(await client.__anext__())
+        assert event == 'leads'
+        assert (data['new_leads'], data['updated_leads'], data['last_lead_id']) == (2, 0, 4)
+        assert [lead['lead_id'] for lead in data['leads']] == [3, 4]
+        assert data['stats'] == {'total_leads': 4, 'by_location': {'Rural': 2}}
+
+        # The next delta is taken against the stats just sent
+        events.publish(*store.add(1))
+        _, data = parse(await client.__anext__())
+        assert data['stats'] == {'total_leads': 5, 'by_location': {'Urban': 3}}
+        await client.aclose()
+    run(test)
+
+def test_burst_is_capped_and_updated_leads_are_sent_again():
+    async def test():
+        store = Store(3)
+        events = stream(store, max_leads=3)
+        client = events.events(3)
+        await client.__anext__()
+        await client.__anext__()
+
+        # Leads published in several calls within one window make one message
+        events.publish(*store.add(2))
+        events.publish(*store.add(3))
+        store.scores[0] = 99.0
+        events.update(0)
+        _, data = parse(await client.__anext__())
+        assert (data['new_leads'], data['updated_leads'], data['last_lead_id']) == (5, 1, 8)
+        # The newest leads fill the message, leaving no room for the update
+        assert [lead['lead_id'] for lead in data['leads']] == [6, 7, 8]
+
+        events.update(1)
+        _, data = parse(await client.__anext__())
+        assert (data['new_leads'], data['updated_leads'], data['last_lead_id']) == (0, 1, 8)
+        assert data['leads'] == [{'lead_id': 2, 'score': 50.0}]
+        assert data['stats'] == {}
+        await client.aclose()
+    run(test)
+
+def test_slow_client_is_dropped():
+    async def test():
+        store = Store(0)
+        events = stream(store, buffer_size=1)
+        slow = events.events(0)
+        await slow.__anext__()
+        await slow.__anext__()
+        for _ in range(3):
+            events.publish(*store.add(1))
+            await asyncio.sleep(0.01)
+        # The stream ends once what was buffered is discarded
+        assert [message async for message in slow] == []
+        assert events.summary()['clients'] == 0
+        assert events.clients_dropped == 1
+    run(test)
+
+def test_reset_starts_over_from_the_empty_store():
+    async def test():
+        store = Store(5)
+        events = stream(store)
+        client = events.events(5)
+        await client.__anext__()
+        await client.__anext__()
+
+        events.publish(*store.add(1))
+        store.size, store.stats = 0, {"total_leads": 0, "by_location": {}}
+        events.reset()
+        # Stored after the reset, before the message about it is sent
+        events.publish(*store.add(2))
+        assert parse(await client.__anext__()) == (
+            'snapshot', {'reset': True, 'last_lead_id': 0, 'stats': {"total_leads": 0, "by_location": {}}})
+        _, data = parse(await client.__anext__())
+        assert (data['new_leads'], data['last_lead_id']) == (2, 2)
+        assert [lead['lead_id'] for lead in data['leads']] == [1, 2]
+        assert data['stats'] == {'total_leads': 2, 'by_location': {'Urban': 2}}
+
+        # A lead stored and then overwritten after another reset is sent once, as new
+        store.size, store.stats = 0, {"total_leads": 0, "by_location": {}}
+        events.reset()
+        assert parse(await client.__anext__())[1]['last_lead_id'] == 0
+        events.publish(*store.add(1))
+        events.update(0)
+        _, data = parse(await client.__anext__())
+        assert (data['new_leads'], data['updated_leads'], data['last_lead_id']) == (1, 0, 1)
+        assert [lead['lead_id'] for lead in data['leads']] == [1]
+        await client.aclose()
+    run(test)
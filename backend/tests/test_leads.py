@@ -0,0 +1,87 @@
+import pytest
+from fastapi.testclient import TestClient
+
+def record(i, reranked_score, initial_score=40.0):
+    """A scored lead record as store_leads receives it."""
+    return {
+        "email": f"lead{i}@example.com", "phone_number": f"+91-9{i:09d}",
+        "initial_score": initial_score, "reranked_score": reranked_score, "comments": f"comment {i}",
+        "credit_score": 720, "age_group": "26-35", "family_background": "Married", "income": 600000,
+        "property_type": "Apartment", "budget": 5000000, "location": "Urban",
+        "previous_inquiries": 3, "time_on_market": 30, "response_time_minutes": 45,
+    }
+
+@pytest.fixture
+def client(main):
+    main.reset_leads()
+    yield TestClient(main.app)
+    main.reset_leads()
+
+def pages(client, **params):
+    """Every page of /leads as (lead ids, next_cursor), following the cursors."""
+    result, cursor = [], None
+    while True:
+        page = client.get("/leads", params={**params, **({"cursor": cursor} if cursor else {})}).json()
+        cursor = page["next_cursor"]
+        result.append(([lead["lead_id"] for lead in page["items"]], cursor))
+        if cursor is None:
+            return result
+
+def test_score_pages_break_ties_by_lead_id(main, client):
+    main.store_leads([record(i, score) for i, score in enumerate([50, 70, 50, 90, 70, 50, 10], 1)])
+    assert [ids for ids, _ in pages(client, limit=3)] == [[4, 5, 2], [6, 3, 1], [7]]
+    assert [ids for ids, _ in pages(client, limit=3, order='asc')] == [[7, 1, 3], [6, 2, 5], [4]]
+
+@pytest.mark.parametrize('limit', [2, 3])
+def test_last_page_has_no_cursor(main, client, limit):
+    # 6 leads fill the last page exactly, which must still end the pages
+    main.store_leads([record(i, 10.0 * i) for i in range(1, 7)])
+    result = pages(client, limit=limit)
+    assert [len(ids) for ids, _ in result] == [limit] * (6 // limit)
+    assert all(cursor is not None for _, cursor in result[:-1])
+    # Filters that match nothing give one empty page
+    assert pages(client, limit=limit, min_score=100) == [([], None)]
+
+def test_leads_stored_between_pages_keep_the_order_stable(main, client):
+    main.store_leads([record(i, score) for i, score in enumerate([80, 60, 40, 20], 1)])
+    first = client.get("/leads", params={"limit": 2}).json()
+    assert [lead["lead_id"] for lead in first["items"]] == [1, 2]
+
+    # One lead sorts before the cursor, one after it and one ties the last lead returned
+    main.store_leads([record(5, 90), record(6, 30), record(7, 60)])
+    rest = client.get("/leads", params={"limit": 10, "cursor": first["next_cursor"]}).json()
+    # The tie has a larger lead_id, so it sorts before lead 2 and belongs to the page already read
+    assert [lead["lead_id"] for lead in rest["items"]] == [3, 6, 4]
+    assert rest["next_cursor"] is None
+
+@pytest.mark.parametrize('order, expected', [('asc', [[1, 2], [3, 4], [5]]), ('desc', [[5, 4], [3, 2], [1]])])
+def test_lead_id_pages_continue_past_new_leads(main, client, order, expected):
+    main.store_leads([record(i, 50.0) for i in range(1, 6)])
+    assert [ids for ids, _ in pages(client, limit=2, sort='lead_id', order=order)] == expected
+
+    first = client.get("/leads", params={"limit": 2, "sort": "lead_id", "order": order}).json()
+    main.store_leads([record(6, 50.0)])
+    rest = [ids for ids, _ in pages(client, limit=10, sort='lead_id', order=order, cursor=first["next_cursor"])]
+    # Ascending pages reach the new lead; descending ones started below it
+    assert rest == ([[3, 4, 5, 6]] if order == 'asc' else [[3, 2, 1]])
+
+def test_lead_id_pages_filter_on_reranked_score(main, client):
+    main.store_leads([record(i, 10.0 * i) for i in range(1, 9)])
+    result = pages(client, limit=2, sort='lead_id', order='asc', min_score=30, max_score=60)
+    assert [ids for ids, _ in result] == [[3, 4], [5, 6]]
+
+def test_cursor_is_checked_against_the_sort(main, client):
+    main.store_leads([record(i, 50.0) for i in range(1, 4)])
+    cursor = client.get("/leads", params={"limit": 1}).json()["next_cursor"]
+    response = client.get("/leads", params={"cursor": cursor, "sort": "lead_id"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cursor was issued for sort=reranked_score"
+    assert client.get("/leads", params={"cursor": "not-a-cursor"}).status_code == 400
+
+def test_all_returns_every_lead_as_a_plain_list(main, client):
+    main.store_leads([record(i, 100.0 / 3 * i) for i in range(1, 4)])
+    leads = client.get("/leads", params={"all": "true", "limit": 1}).json()
+    assert [lead["lead_id"] for lead in leads] == [1, 2, 3]
+    assert leads[0] == {"lead_id": 1, "email": "lead1@example.com", "initial_score": 40.0,
+                        "reranked_score": 33.33, "comments": "comment 1"}
+    assert client.get("/leads", params={"all": "true"}, headers={"Accept-Encoding": "gzip"}).json() == leads
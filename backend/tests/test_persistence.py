@@ -0,0 +1,139 @@
+import os
+
+import pytest
+
+import persistence
+from lead_store import LeadStore
+from persistence import LeadLogError, NDJSONLeadLog
+
+def event(i, reranked_score=50.0, comments=None):
+    """A lead as store_leads logs it."""
+    return {
+        "lead_id": i, "email": f"lead{i}@example.com", "phone_number": f"+91-98765432{i:02d}",
+        "initial_score": 40.0, "reranked_score": reranked_score, "comments": comments or f"comment {i}",
+        "credit_score": 720, "age_group": "26-35", "family_background": "Married", "income": 600000,
+        "property_type": "Apartment", "budget": 5000000, "location": "Urban",
+        "previous_inquiries": 3, "time_on_market": 30, "response_time_minutes": 45,
+    }
+
+def write_log(directory, events, snapshot_after=None):
+    """Log ``events``, snapshotting the store they build after the first ``snapshot_after``."""
+    log = NDJSONLeadLog(directory, commit_interval_ms=0)
+    log.start()
+    store = LeadStore()
+    for position, lead in enumerate(events, 1):
+        log.append(lead)
+        if lead["lead_id"] > len(store):
+            store.append(lead)
+        else:
+            store.replace(lead["lead_id"], lead)
+        if position == snapshot_after:
+            log.snapshot(store.to_arrays())
+    assert log.flush(5)
+    log.close()
+
+def replayed(directory):
+    arrays, chunks = NDJSONLeadLog(directory).replay()
+    return arrays, [lead for chunk in chunks for lead in chunk]
+
+@pytest.fixture
+def restored(main):
+    """Restore main's leads from a log directory, dropping them after the test."""
+    yield lambda directory: main.restore_leads(NDJSONLeadLog(directory))
+    main.reset_leads()
+
+def test_torn_final_line_is_dropped_and_cut_off(tmp_path):
+    write_log(str(tmp_path), [event(1), event(2)])
+    log_path = os.path.join(tmp_path, 'leads.log.ndjson')
+    good_bytes = os.path.getsize(log_path)
+    with open(log_path, 'ab') as f:
+        f.write(b'{"seq": 3, "lead_id": 3, "email": "le')
+
+    _, leads = replayed(str(tmp_path))
+    assert [lead["seq"] for lead in leads] == [1, 2]
+    assert os.path.getsize(log_path) == good_bytes
+
+    # New events follow the last whole line
+    log = NDJSONLeadLog(str(tmp_path), commit_interval_ms=0)
+    for _ in log.replay()[1]:
+        pass
+    log.start()
+    log.append(event(3))
+    assert log.flush(5)
+    log.close()
+    _, leads = replayed(str(tmp_path))
+    assert [(lead["seq"], lead["lead_id"]) for lead in leads] == [(1, 1), (2, 2), (3, 3)]
+
+def test_failed_group_commit_is_retried_and_reported_meanwhile(tmp_path, monkeypatch):
+    log = NDJSONLeadLog(str(tmp_path), commit_interval_ms=0)
+    log.start()
+    try:
+        log.check()
+        def fail(fd):
+            raise OSError(28, "No space left on device")
+        monkeypatch.setattr(persistence.os, "fsync", fail)
+        log.append(event(1))
+        log.append(event(2))
+        assert log.flush(5)
+        with pytest.raises(LeadLogError, match="2 events uncommitted"):
+            log.check()
+        assert log.committed_seq == 0
+        assert isinstance(log.write_error, OSError)
+
+        monkeypatch.undo()
+        # The failed batch is written again ahead of the next one, with nothing torn left behind
+        log.append(event(3))
+        assert log.flush(5)
+        log.check()
+        assert (log.committed_seq, log.uncommitted, log.write_error) == (3, 0, None)
+    finally:
+        log.close()
+    _, leads = replayed(str(tmp_path))
+    assert [(lead["seq"], lead["lead_id"]) for lead in leads] == [(1, 1), (2, 2), (3, 3)]
+
+def test_snapshot_and_tail_restore_the_same_leads_as_the_full_log(main, restored, tmp_path):
+    events = [event(i) for i in range(1, 9)]
+    # Overwrites of leads inside and outside the snapshot, after it
+    events += [event(3, 90.0, "cash buyer, ready to move"), event(7, 10.0, "just browsing")]
+    full, split = str(tmp_path / 'full'), str(tmp_path / 'split')
+    write_log(full, events)
+    write_log(split, events, snapshot_after=5)
+
+    arrays, tail = replayed(split)
+    assert int(arrays['size']) == 5
+    assert [lead["seq"] for lead in tail] == [6, 7, 8, 9, 10]
+
+    def state():
+        return ([main.lead_store.get(i) for i in range(1, len(main.lead_store) + 1)],
+                main.lead_aggregates.summary(),
+                main.comment_index.search("cash").tolist(),
+                main.comment_index.search("comment").tolist(),
+                main.contact_index.find(email="lead3@example.com"))
+
+    assert restored(full) == 8
+    expected = state()
+    assert restored(split) == 8
+    assert state() == expected
+    assert expected[2:] == ([3], [1, 2, 4, 5, 6, 8], [3])
+    assert main.lead_store.get(7, ("reranked_score",)) == {"reranked_score": 10.0}
+
+def test_long_replay_is_followed_by_a_snapshot(main, restored, tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "SNAPSHOT_EVERY", 5)
+    short, long = str(tmp_path / 'short'), str(tmp_path / 'long')
+    write_log(short, [event(i) for i in range(1, 5)])
+    write_log(long, [event(i) for i in range(1, 7)])
+
+    for directory, snapshot_seq in ((short, 0), (long, 6)):
+        log = NDJSONLeadLog(directory, commit_interval_ms=0)
+        try:
+            main.start_lead_log(log)
+            assert log.flush(5)
+            assert log.snapshot_seq == snapshot_seq
+        finally:
+            log.close()
+        main.reset_leads()
+
+    # The next start of the long log restores the snapshot and replays nothing
+    arrays, tail = replayed(long)
+    assert (int(arrays['size']), tail) == (6, [])
+    assert restored(long) == 6
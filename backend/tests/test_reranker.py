@@ -0,0 +1,34 @@
+import pytest
+
+from reranker import SCAN_THRESHOLD_CHARS, KeywordAutomaton, LLMReranker
+
+PATTERNS = ['not ready', 'ready to sign', 'ready', 'perfect', 'perfect match', 'love', 'café', '']
+
+@pytest.mark.parametrize('text', [
+    'not ready to sign',
+    'a perfect match, would love it',
+    'lovely café near the station',
+    'nothing relevant',
+    '',
+])
+@pytest.mark.parametrize('padding', [0, SCAN_THRESHOLD_CHARS])
+def test_automaton_finds_every_contained_pattern(text, padding):
+    # Padding pushes the text over the threshold, where substring scans take over
+    padded = text + ' ' * padding
+    expected = {index for index, pattern in enumerate(PATTERNS) if pattern in padded}
+    assert KeywordAutomaton(PATTERNS).find(padded) == expected
+    assert KeywordAutomaton(PATTERNS, scan_threshold=None).find(padded) == expected
+
+def test_rerank_matches_long_and_short_comments_alike():
+    reranker = LLMReranker()
+    comment = 'Urgent: cash buyer, but not ready to sign. '
+    long_comment = comment + 'x' * SCAN_THRESHOLD_CHARS
+    assert reranker.adjustment(comment) == reranker.adjustment(long_comment) == 10 + 20 - 15 + 20
+
+def test_keyword_changes_rebuild_the_automaton():
+    reranker = LLMReranker()
+    assert reranker.adjustment('a lovely porch') == 5
+    reranker.positive_keywords['porch'] = 7
+    assert reranker.adjustment('a lovely porch') == 12
+    del reranker.positive_keywords['love']
+    assert reranker.adjustment('a lovely porch') == 7
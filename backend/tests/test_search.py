@@ -0,0 +1,89 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from text_index import TextIndex, index_terms
+
+def record(i, comments, reranked_score=50.0, email=None):
+    """A scored lead record as store_leads receives it."""
+    return {
+        "email": email or f"lead{i}@example.com", "phone_number": f"+91-9{i:09d}",
+        "initial_score": 40.0, "reranked_score": reranked_score, "comments": comments,
+        "credit_score": 720, "age_group": "26-35", "family_background": "Married", "income": 600000,
+        "property_type": "Apartment", "budget": 5000000, "location": "Urban",
+        "previous_inquiries": 3, "time_on_market": 30, "response_time_minutes": 45,
+    }
+
+def postings(index):
+    return {term: list(ids) for term, ids in index._postings.items()}
+
+def test_terms_are_tokens_and_adjacent_pairs():
+    assert index_terms("Pre-approved loan; good schools!") == {
+        "pre", "approved", "loan", "good", "schools",
+        "pre approved", "approved loan", "loan good", "good schools",
+    }
+
+def test_add_many_builds_the_same_postings_as_add():
+    texts = ["good schools", "cash buyer", "good schools", "", "schools good", "cash buyer", "good schools"]
+    one_by_one, bulk = TextIndex(texts.__getitem__), TextIndex(texts.__getitem__)
+    for lead_id, text in enumerate(texts, 1):
+        one_by_one.add(lead_id, text)
+    bulk.add_many(range(1, len(texts) + 1), texts)
+    assert postings(bulk) == postings(one_by_one)
+    assert postings(bulk)["good schools"] == [1, 3, 7]
+    assert bulk.stats() == one_by_one.stats()
+
+def test_removed_text_leaves_no_empty_postings():
+    index = TextIndex(lambda lead_id: "")
+    index.add(1, "good schools")
+    index.add(2, "good location")
+    index.remove(1, "good schools")
+    assert postings(index) == {"good": [2], "location": [2], "good location": [2]}
+    assert index.stats()["postings"] == 3
+
+@pytest.fixture
+def client(main):
+    main.reset_leads()
+    yield TestClient(main.app)
+    main.reset_leads()
+
+def search(client, q, **params):
+    response = client.get("/leads/search", params={"q": q, **params})
+    assert response.status_code == 200, response.text
+    return [lead["lead_id"] for lead in response.json()["items"]]
+
+def test_replaced_comments_move_between_postings(main, client, monkeypatch):
+    monkeypatch.setattr(main, "DEDUP_POLICY", "replace")
+    main.store_leads([record(1, "Pre-approved loan, good schools"), record(2, "good schools nearby")])
+    assert search(client, '"good schools"') == [2, 1]
+
+    main.store_leads([record(1, "Cash buyer, ready to move")])
+    assert search(client, '"good schools"') == [2]
+    assert search(client, "approved") == []
+    assert search(client, '"cash buyer"') == [1]
+    # Only the replacement's terms hold the lead
+    assert {term for term, ids in postings(main.comment_index).items() if 1 in ids} == index_terms(
+        "Cash buyer, ready to move")
+
+    # Rebuilding from the stored comments gives the same index
+    before = postings(main.comment_index)
+    main.rebuild_derived_state()
+    assert postings(main.comment_index) == before
+
+def test_max_policy_keeps_the_comments_of_the_higher_score(main, client, monkeypatch):
+    monkeypatch.setattr(main, "DEDUP_POLICY", "max")
+    main.store_leads([record(1, "good schools", 70.0)])
+    main.store_leads([record(1, "cash buyer", 30.0), record(1, "urgent cash buyer", 90.0, email="other@example.com")])
+    assert search(client, "schools") == []
+    assert search(client, '"urgent cash"') == [1]
+    assert search(client, '"cash buyer" OR schools') == [1]
+    assert len(main.lead_store) == 1
+
+def test_search_pages_and_filters(main, client):
+    main.store_leads([record(i, f"good schools {i}", reranked_score=10.0 * i) for i in range(1, 8)])
+    main.store_leads([record(8, "schools good")])
+    assert search(client, '"good schools"', limit=3) == [7, 6, 5]
+    page = client.get("/leads/search", params={"q": '"good schools"', "limit": 3}).json()
+    assert page["total_matches"] == 7
+    assert search(client, '"good schools"', limit=3, cursor=page["next_cursor"]) == [4, 3, 2]
+    assert search(client, '"good schools"', order="asc", min_score=30, max_score=50) == [3, 4, 5]
+    assert client.get("/leads/search", params={"q": "OR schools"}).status_code == 422
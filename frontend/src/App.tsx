@@ -1,16 +1,27 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import LeadForm from './components/LeadForm';
 import LeadsTable from './components/LeadsTable';
 import StatsCard from './components/StatsCard';
 import { Lead, LeadScore, LeadStats } from './types';
-import { getLeads, getLeadStats, checkHealth } from './services/api';
+import { getLeads, getLeadStats, checkHealth, subscribeToLeads, applyStatsDelta } from './services/api';
+
+// Number of leads fetched per /leads page
+const LEADS_PAGE_SIZE = 50;
+
+// Leads already shown followed by the other ones, so a lead is never listed twice
+const mergeLeads = (leads: Lead[], more: Lead[]): Lead[] => {
+  const shown = new Set(leads.map((lead) => lead.lead_id));
+  return [...leads, ...more.filter((lead) => !shown.has(lead.lead_id))];
+};
 
 const App: React.FC = () => {
   const [leads, setLeads] = useState<Lead[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [stats, setStats] = useState<LeadStats | null>(null);
   const [loading, setLoading] = useState<boolean>(false);
   const [apiStatus, setApiStatus] = useState<{ status: string; model_loaded: boolean } | null>(null);
   const [apiError, setApiError] = useState<string | null>(null);
+  const streamConnected = useRef<boolean>(false);
   
   // Load leads and stats from localStorage on initial render
   useEffect(() => {
@@ -36,6 +47,36 @@ const App: React.FC = () => {
     checkApiHealth();
   }, []);
   
+  // Keep leads and stats current with updates pushed by the server instead of refetching them
+  useEffect(() => {
+    if (apiStatus?.status !== 'healthy') {
+      return;
+    }
+    
+    const unsubscribe = subscribeToLeads({
+      onSnapshot: (snapshot) => {
+        if (snapshot.reset) {
+          setLeads([]);
+          setNextCursor(null);
+        } else if (streamConnected.current) {
+          // Reconnected: leads pushed while the stream was down were missed
+          fetchLeadsAndStats();
+        }
+        streamConnected.current = true;
+        setStats(snapshot.stats);
+      },
+      onLeads: (update) => {
+        setLeads((current) => mergeLeads(update.leads, current));
+        setStats((current) => current && applyStatsDelta(current, update.stats));
+      },
+    });
+    
+    return () => {
+      unsubscribe();
+      streamConnected.current = false;
+    };
+  }, [apiStatus?.status]);
+  
   // Save leads and stats to localStorage when they change
   useEffect(() => {
     if (leads.length > 0) {
@@ -68,12 +109,13 @@ const App: React.FC = () => {
     
     try {
       // Fetch leads and stats in parallel
-      const [leadsData, statsData] = await Promise.all([
-        getLeads(),
+      const [leadsPage, statsData] = await Promise.all([
+        getLeads({ limit: LEADS_PAGE_SIZE }),
         getLeadStats()
       ]);
       
-      setLeads(leadsData);
+      setLeads(leadsPage.items);
+      setNextCursor(leadsPage.next_cursor);
       setStats(statsData);
       setApiError(null);
     } catch (error) {
@@ -84,9 +126,26 @@ const App: React.FC = () => {
     }
   };
   
+  const loadMoreLeads = async () => {
+    if (!nextCursor) {
+      return;
+    }
+    
+    try {
+      const leadsPage = await getLeads({ limit: LEADS_PAGE_SIZE, cursor: nextCursor });
+      setLeads((current) => mergeLeads(current, leadsPage.items));
+      setNextCursor(leadsPage.next_cursor);
+    } catch (error) {
+      console.error('Error fetching more leads:', error);
+      setApiError('Failed to fetch data from the API.');
+    }
+  };
+  
   const handleLeadScored = (score: LeadScore) => {
-    // Fetch updated leads and stats after scoring
-    fetchLeadsAndStats();
+    // The lead stream delivers the new lead and stats; refetch only without it
+    if (!streamConnected.current) {
+      fetchLeadsAndStats();
+    }
   };
   
   return (
@@ -147,7 +206,12 @@ const App: React.FC = () => {
         </div>
         
         {/* Leads Table */}
-        <LeadsTable leads={leads} loading={loading} />
+        <LeadsTable
+          leads={leads}
+          loading={loading}
+          hasMore={nextCursor !== null}
+          onLoadMore={loadMoreLeads}
+        />
       </main>
       
       <footer className="bg-white shadow mt-8 py-4">
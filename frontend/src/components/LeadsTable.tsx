@@ -4,9 +4,11 @@ import { Lead } from '../types';
 interface LeadsTableProps {
   leads: Lead[];
   loading: boolean;
+  hasMore: boolean;
+  onLoadMore: () => void;
 }
 
-const LeadsTable: React.FC<LeadsTableProps> = ({ leads, loading }) => {
+const LeadsTable: React.FC<LeadsTableProps> = ({ leads, loading, hasMore, onLoadMore }) => {
   const [sortedLeads, setSortedLeads] = useState<Lead[]>([]);
   const [sortConfig, setSortConfig] = useState<{ key: keyof Lead; direction: 'ascending' | 'descending' } | null>(null);
   
@@ -150,6 +152,17 @@ const LeadsTable: React.FC<LeadsTableProps> = ({ leads, loading }) => {
               ))}
             </tbody>
           </table>
+          
+          {hasMore && (
+            <div className="flex justify-center mt-4">
+              <button
+                onClick={onLoadMore}
+                className="px-4 py-2 text-sm font-medium text-blue-600 hover:text-blue-500"
+              >
+                Load more leads
+              </button>
+            </div>
+          )}
         </div>
       )}
     </div>
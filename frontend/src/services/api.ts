@@ -1,13 +1,18 @@
 import axios from 'axios';
-import { LeadFormData, LeadScore, Lead, LeadStats } from '../types';
+import {
+  LeadFormData, LeadScore, LeadPage, LeadQuery, LeadStats,
+  LeadStreamSnapshot, LeadStreamUpdate, StatsDelta
+} from '../types';
+
+const API_URL =
+  import.meta.env.VITE_API_URL ||
+  (import.meta.env.DEV
+    ? 'http://localhost:8000' // Local development
+    : 'https://YOUR-BACKEND.vercel.app'); // Production fallback (Vercel)
 
 // Create axios instance with base URL
 const api = axios.create({
-  baseURL:
-    import.meta.env.VITE_API_URL ||
-    (import.meta.env.DEV
-      ? 'http://localhost:8000' // Local development
-      : 'https://YOUR-BACKEND.vercel.app'), // Production fallback (Vercel)
+  baseURL: API_URL,
 });
 
 // API functions
@@ -21,9 +26,9 @@ export const scoreLead = async (leadData: LeadFormData): Promise<LeadScore> => {
   }
 };
 
-export const getLeads = async (): Promise<Lead[]> => {
+export const getLeads = async (query: LeadQuery = {}): Promise<LeadPage> => {
   try {
-    const response = await api.get<Lead[]>('/leads');
+    const response = await api.get<LeadPage>('/leads', { params: query });
     return response.data;
   } catch (error) {
     console.error('Error fetching leads:', error);
@@ -49,4 +54,37 @@ export const checkHealth = async (): Promise<{ status: string; model_loaded: boo
     console.error('Error checking API health:', error);
     throw error;
   }
+};
+
+export interface LeadStreamHandlers {
+  onSnapshot: (snapshot: LeadStreamSnapshot) => void;
+  onLeads: (update: LeadStreamUpdate) => void;
+}
+
+// Subscribe to pushed lead and stats updates; returns a function that closes the stream
+export const subscribeToLeads = ({ onSnapshot, onLeads }: LeadStreamHandlers): (() => void) => {
+  // EventSource reconnects by itself and the server opens every connection with a snapshot
+  const source = new EventSource(`${API_URL}/leads/stream`);
+  source.addEventListener('snapshot', (event) => {
+    onSnapshot(JSON.parse((event as MessageEvent).data));
+  });
+  source.addEventListener('leads', (event) => {
+    onLeads(JSON.parse((event as MessageEvent).data));
+  });
+  return () => source.close();
+};
+
+// Apply a stats delta from the lead stream to the current stats
+export const applyStatsDelta = <T extends object>(stats: T, delta: StatsDelta): T => {
+  const updated: Record<string, unknown> = { ...stats };
+  for (const [key, value] of Object.entries(delta)) {
+    if (value === null) {
+      delete updated[key];
+    } else if (typeof value === 'object') {
+      updated[key] = applyStatsDelta((updated[key] as object) || {}, value);
+    } else {
+      updated[key] = value;
+    }
+  }
+  return updated as T;
 };
\ No newline at end of file
@@ -29,9 +29,45 @@ export interface Lead {
   comments: string;
 }
 
-export interface LeadStats {
+export interface LeadPage {
+  items: Lead[];
+  next_cursor: string | null;
+}
+
+export interface LeadQuery {
+  limit?: number;
+  cursor?: string;
+  min_score?: number;
+  max_score?: number;
+  sort?: 'reranked_score' | 'initial_score' | 'lead_id';
+  order?: 'asc' | 'desc';
+}
+
+export interface SegmentStats {
   total_leads: number;
   high_intent_leads: number;
   avg_initial_score: number;
   avg_reranked_score: number;
+}
+
+export interface LeadStats extends SegmentStats {
+  high_intent_threshold: number;
+  by_property_type: Record<string, SegmentStats>;
+  by_location: Record<string, SegmentStats>;
+}
+
+// Changed /leads/stats fields; nested segments hold only their changed fields, null marks a removed segment
+export type StatsDelta = { [key: string]: number | StatsDelta | null };
+
+export interface LeadStreamSnapshot {
+  reset: boolean;
+  last_lead_id: number;
+  stats: LeadStats;
+}
+
+export interface LeadStreamUpdate {
+  new_leads: number;
+  last_lead_id: number;
+  leads: Lead[];
+  stats: StatsDelta;
 }
\ No newline at end of file